@@ -2,9 +2,15 @@
 
 import sys
 
-from .pc_lib_api     import PrismaCloudAPI
-from .pc_lib_utility import PrismaCloudUtility
-from .version        import version as api_version
+from .pc_lib_api        import PrismaCloudAPI
+from .pc_lib_collection import IndexedCollection
+from .pc_lib_jobs       import PrismaCloudReportJobs
+from .pc_lib_packages   import PrismaCloudPackageIndex
+from .pc_lib_pool       import PrismaCloudAPIPool
+from .pc_lib_sink       import PrismaCloudBatchSink
+from .pc_lib_snapshot   import PrismaCloudSnapshotStore
+from .pc_lib_utility    import PrismaCloudUtility
+from .version           import version as api_version
 
 __author__  = 'Palo Alto Networks CSE/SE/SA Teams'
 __version__ = api_version
@@ -1,5 +1,9 @@
 """ Prisma Cloud API Endpoints Class """
 
+import copy
+
+from ..pc_lib_rql import rql_cache_key
+
 # TODO: Split into multiple files, one per endpoint ...
 
 # pylint: disable=too-many-public-methods
@@ -38,7 +42,16 @@ class EndpointsPrismaCloudAPIMixin():
     def alert_list_read(self, query_params=None, body_params=None):
         return self.execute('POST', 'alert', query_params=query_params, body_params=body_params)
 
-    def alert_v2_list_read(self, query_params=None, body_params=None):
+    # Optionally, split the time range into (concurrently paginated) shards: see alert_v2_list_read_stream().
+    # The body is sent as specified, unless the page size is configured (via the 'page_limits' setting) or tuned (via the 'page_size_tuning' setting).
+
+    def alert_v2_list_read(self, query_params=None, body_params=None, shards=None, max_workers=None):
+        if shards:
+            return list(self.alert_v2_list_read_stream(query_params=query_params, body_params=body_params, shards=shards, max_workers=max_workers))
+        page_limits = self.page_limits or {}
+        page_size_configured = self.page_size_tuner or 'v2/alert' in page_limits or 'alert' in page_limits
+        if body_params is not None and 'limit' not in body_params and page_size_configured:
+            body_params = dict(body_params, limit=self.page_limit('v2/alert', 'alert'))
         return self.execute('POST', 'v2/alert', query_params=query_params, body_params=body_params, paginated=True)
 
     def alert_csv_create(self, body_params=None):
@@ -47,7 +60,11 @@ class EndpointsPrismaCloudAPIMixin():
     def alert_csv_status(self, csv_report_id):
         return self.execute('GET', 'alert/csv/%s/status' % csv_report_id)
 
-    def alert_csv_download(self, csv_report_id):
+    # Optionally, stream the download to a file (and return the file name).
+
+    def alert_csv_download(self, csv_report_id, file_name=None):
+        if file_name:
+            return self.execute_download('alert/csv/%s/download' % csv_report_id, file_name)
         return self.execute('GET', 'alert/csv/%s/download' % csv_report_id)
     
 
@@ -514,16 +531,13 @@ class EndpointsPrismaCloudAPIMixin():
     def compliance_report_delete(self, report_id):
         return self.execute('DELETE', 'report/%s' % report_id)
 
-    def compliance_report_download(self, report_id):
+    # Returns None while the report is pending (the endpoint responds with a 204), and the report when it is ready.
+    # Optionally, stream the download to a file (and return the file name).
+
+    def compliance_report_download(self, report_id, file_name=None):
+        if file_name:
+            return self.execute_download('report/%s/download' % report_id, file_name)
         return self.execute('GET', 'report/%s/download' % report_id)
-        # TODO:
-        # if response_status == 204:
-        #    # download pending
-        #    pass
-        # elif response_status == 200:
-        #    # download ready
-        #    pass
-        # else:
 
     """
     Search
@@ -535,62 +549,79 @@ class EndpointsPrismaCloudAPIMixin():
     [ ] DELETE
     """
 
-    def search_config_read(self, search_params):
-        result = []
+    # Yield each page of search results, following 'nextPageToken'.
+    # With resource_json False, resource JSON is not requested (a smaller and faster response, when resource JSON is not needed).
+    # With page_resource_json None, page requests do not specify 'withResourceJson'.
+
+    # pylint: disable=too-many-arguments
+    def search_read_pages(self, search_url, page_url, search_params, resource_json=True, page_resource_json=True):
+        if not resource_json:
+            search_params = dict(search_params, withResourceJson=False)
         next_page_token = None
         api_response = self.execute(
-            'POST', 'search/config', body_params=search_params)
-        if 'data' in api_response and 'items' in api_response['data']:
-            result = api_response['data']['items']
+            'POST', search_url, body_params=search_params)
+        if api_response and 'data' in api_response and 'items' in api_response['data']:
+            yield api_response['data']['items']
             next_page_token = api_response['data'].pop('nextPageToken', None)
         while next_page_token:
+            page_params = {'limit': self.page_limit(page_url, 'rql'), 'pageToken': next_page_token}
+            if page_resource_json is not None:
+                page_params['withResourceJson'] = 'true' if resource_json and page_resource_json else 'false'
             api_response = self.execute(
-                'POST', 'search/config/page', body_params={'limit': 1000, 'pageToken': next_page_token, 'withResourceJson': 'true'})
+                'POST', page_url, body_params=page_params)
             if 'items' in api_response:
-                result.extend(api_response['items'])
+                yield api_response['items']
             next_page_token = api_response.pop('nextPageToken', None)
-        return result
 
-    def search_network_read(self, search_params, filtered=False):
+    # Return a cached search result, or run (and cache) the search, when the RQL cache is enabled (via the 'rql_cache_ttl' setting).
+    # Pass cache=False to bypass the cache.
+    # Searches with the same normalized query, parameters, and (bucketed, when relative) time range share a cached result.
+
+    def search_cache_read(self, search_url, search_params, search, cache=True):
+        rql_cache = getattr(self, 'rql_cache', None)
+        if not cache or rql_cache is None:
+            return search()
+        key = rql_cache_key(search_url, search_params, getattr(self, 'rql_cache_bucket', 60))
+        result = rql_cache.get(key)
+        if result is None:
+            result = search()
+            if result is not None:
+                rql_cache.set(key, result)
+        # Return a (deep) copy of cached results, so that callers that modify the result (or its records) do not modify the cached result.
+        return copy.deepcopy(result)
+
+    def search_config_read(self, search_params, resource_json=True, cache=True):
+        def search():
+            result = []
+            for page in self.search_read_pages('search/config', 'search/config/page', search_params, resource_json):
+                result.extend(page)
+            return result
+        return self.search_cache_read('search/config', dict(search_params, resourceJson=resource_json), search, cache)
+
+    def search_network_read(self, search_params, filtered=False, cache=True):
         search_url = 'search'
         if filtered:
             search_url = 'search/filtered'
-        return self.execute('POST', search_url, body_params=search_params)
+        return self.search_cache_read(search_url, search_params, lambda: self.execute('POST', search_url, body_params=search_params), cache)
 
-    def search_event_read(self, search_params, subsearch=None):
-        result = []
-        next_page_token = None
+    def search_event_read(self, search_params, subsearch=None, cache=True):
         search_url = 'search/event'
         if subsearch and subsearch in ['aggregate', 'filtered']:
             search_url = 'search/event/%s' % subsearch
-        api_response = self.execute(
-            'POST', search_url, body_params=search_params)
-        if 'data' in api_response and 'items' in api_response['data']:
-            result = api_response['data']['items']
-            next_page_token = api_response['data'].pop('nextPageToken', None)
-        while next_page_token:
-            api_response = self.execute(
-                'POST', 'search/config/page', body_params={'limit': 1000, 'pageToken': next_page_token})
-            if 'items' in api_response:
-                result.extend(api_response['items'])
-            next_page_token = api_response.pop('nextPageToken', None)
-        return result
-
-    def search_iam_read(self, search_params):
-        result = []
-        next_page_token = None
-        api_response = self.execute(
-            'POST', 'api/v1/permission', body_params=search_params)
-        if 'data' in api_response and 'items' in api_response['data']:
-            result = api_response['data']['items']
-            next_page_token = api_response['data'].pop('nextPageToken', None)
-        while next_page_token:
-            api_response = self.execute(
-                'POST', 'api/v1/permission/page', body_params={'limit': 1000, 'pageToken': next_page_token, 'withResourceJson': 'true'})
-            if 'items' in api_response:
-                result.extend(api_response['items'])
-            next_page_token = api_response.pop('nextPageToken', None)
-        return result
+        def search():
+            result = []
+            for page in self.search_read_pages(search_url, 'search/config/page', search_params, page_resource_json=None):
+                result.extend(page)
+            return result
+        return self.search_cache_read(search_url, search_params, search, cache)
+
+    def search_iam_read(self, search_params, resource_json=True, cache=True):
+        def search():
+            result = []
+            for page in self.search_read_pages('api/v1/permission', 'api/v1/permission/page', search_params, resource_json):
+                result.extend(page)
+            return result
+        return self.search_cache_read('api/v1/permission', dict(search_params, resourceJson=resource_json), search, cache)
 
     def search_iam_source_to_granter(self, search_params):
         search_url = 'api/v1/permission/graph/source_to_granter'
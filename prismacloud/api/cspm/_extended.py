@@ -1,6 +1,11 @@
 """ Prisma Cloud API Endpoints Aggregation Class """
 
 import concurrent.futures
+import queue
+import threading
+
+from ..pc_lib_rql        import RQL_IAM_SHARD_FIELDS, RQL_SEARCH_ENDPOINTS, rql_item_key, rql_shard_search_params
+from ..pc_lib_time_range import absolute_time_range, split_time_bounds, time_range_bounds
 
 # TODO: Rename this class ...
 
@@ -65,3 +70,120 @@ class ExtendedPrismaCloudAPIMixin():
                 result.append(resource)
         self.progress('Done.')
         return result
+
+    # Alerts (v2), sharded by time.
+    # Split the 'timeRange' of an alert_v2_list_read() query into sub-windows, and paginate the sub-windows concurrently,
+    # yielding alerts (without duplicates, by alert id) as each sub-window completes: alerts are not yielded in time order.
+    # Dense sub-windows (with more than 'split_threshold' alerts, via a single-alert probe) are split in half, down to 'min_window' milliseconds.
+    # Queries with a time range that cannot be resolved (for example: 'to_now' the start of the current week) are paginated without sharding.
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def alert_v2_list_read_stream(self, query_params=None, body_params=None, shards=4, max_workers=None, split_threshold=None, min_window=3600000):
+        body_params = dict(body_params or {})
+        if 'limit' not in body_params:
+            body_params['limit'] = self.page_limit('v2/alert', 'alert')
+        if split_threshold is None:
+            split_threshold = body_params['limit'] * 5
+        bounds = time_range_bounds(body_params.get('timeRange'))
+        if not bounds:
+            yield from self.execute('POST', 'v2/alert', query_params=query_params, body_params=body_params, paginated=True) or []
+            return
+        alert_ids = set()
+        with concurrent.futures.ThreadPoolExecutor(max_workers or self.max_workers) as executor:
+            pending = {executor.submit(self.alert_v2_shard_read, query_params, body_params, start, end, split_threshold, min_window) for start, end in split_time_bounds(bounds[0], bounds[1], shards)}
+            try:
+                while pending:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        sub_windows, alerts = future.result()
+                        for start, end in sub_windows:
+                            self.progress('Splitting Alert Time Range: %s to %s' % (start, end))
+                            pending.add(executor.submit(self.alert_v2_shard_read, query_params, body_params, start, end, split_threshold, min_window))
+                        for alert in alerts:
+                            # Alerts at the boundary of two sub-windows may be returned by both.
+                            alert_id = alert.get('id')
+                            if alert_id is not None:
+                                if alert_id in alert_ids:
+                                    continue
+                                alert_ids.add(alert_id)
+                            yield alert
+            finally:
+                # When the consumer stops early (or on error), do not start the sub-windows that are still waiting.
+                for future in pending:
+                    future.cancel()
+
+    # Return ([sub-windows], []) for a dense sub-window that should be split, or ([], [alerts]) for the alerts in the sub-window.
+
+    # pylint: disable=too-many-arguments
+    def alert_v2_shard_read(self, query_params, body_params, start, end, split_threshold, min_window):
+        shard_body_params = dict(body_params, timeRange=absolute_time_range(start, end))
+        if end - start >= 2 * min_window:
+            probe = self.execute('POST', 'v2/alert', query_params=query_params, body_params=dict(shard_body_params, limit=1))
+            if probe and probe.get('totalRows', 0) > split_threshold:
+                return split_time_bounds(start, end, 2), []
+        return [], self.execute('POST', 'v2/alert', query_params=query_params, body_params=shard_body_params, paginated=True) or []
+
+    # RQL search, sharded by cloud account, region (or any RQL attribute), and/or time window.
+    # Shards are run concurrently, and results are yielded (without duplicates) as each page of each shard arrives, rather than collected in one list.
+    # Search types: 'config', 'event', and 'iam' (sharded by 'account' as 'source.cloud.account', or by an IAM RQL attribute).
+    # When sharding by 'account' without shard values, the names of all onboarded cloud accounts are used.
+    # Example: for resource in pc_api.search_read_sharded('config', {'query': rql}, shard_by='account', resource_json=False): ...
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def search_read_sharded(self, search_type, search_params, shard_by=None, shard_values=None, time_shards=None, resource_json=True, max_workers=None):
+        search_url, page_url = RQL_SEARCH_ENDPOINTS[search_type]
+        page_resource_json = None if search_type == 'event' else True
+        if shard_by == 'account' and shard_values is None:
+            shard_values = [cloud_account['name'] for cloud_account in self.cloud_accounts_list_read() or []]
+        shards = rql_shard_search_params(search_params, shard_by, shard_values, time_shards, RQL_IAM_SHARD_FIELDS if search_type == 'iam' else None)
+        max_workers = max_workers or self.max_workers
+        # A bounded queue of pages, so that shards do not run ahead of the consumer.
+        pages = queue.Queue(maxsize=max_workers * 2)
+        stop = threading.Event()
+
+        def put(page):
+            while not stop.is_set():
+                try:
+                    pages.put(page, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def run_shard(shard_search_params):
+            try:
+                if stop.is_set():
+                    return
+                for page in self.search_read_pages(search_url, page_url, shard_search_params, resource_json, page_resource_json):
+                    if not put(page):
+                        return
+            # Including the SystemExit raised by error_and_exit, which is raised again by the consumer.
+            # pylint: disable=broad-except
+            except BaseException as ex:
+                put(ex)
+            finally:
+                put(None)
+
+        item_keys = set()
+        with concurrent.futures.ThreadPoolExecutor(min(max_workers, len(shards)) or 1) as executor:
+            for shard_search_params in shards:
+                executor.submit(run_shard, shard_search_params)
+            remaining = len(shards)
+            try:
+                while remaining:
+                    page = pages.get()
+                    if page is None:
+                        remaining -= 1
+                        continue
+                    if isinstance(page, BaseException):
+                        raise page
+                    for item in page:
+                        item_key = rql_item_key(item)
+                        if item_key is not None:
+                            if item_key in item_keys:
+                                continue
+                            item_keys.add(item_key)
+                        yield item
+            finally:
+                # When the consumer stops early (or on error), stop the shards that are still running or waiting.
+                stop.set()
@@ -1,9 +1,14 @@
 """ Requests and Output """
 
+import gzip
 import json
+import os
 import time
 
 import requests
+from urllib3.util.request import ACCEPT_ENCODING
+
+from ..pc_lib_tuner import PAGE_LIMIT_DEFAULTS, PAGE_LIMIT_MAXIMUMS
 
 class PrismaCloudAPIMixin():
     """ Requests and Output """
@@ -68,44 +73,147 @@ class PrismaCloudAPIMixin():
         if self.debug:
             print('Extending API Token')
 
+    # Login, or extend the API token if it has expired, and return the current API token.
+    # Serialized via a lock, so that concurrent threads refresh the token once, and use a consistent token.
+
+    def token_check(self, login_method=None, extend_login_method=None):
+        if not login_method:
+            login_method = self.login
+        if not extend_login_method:
+            extend_login_method = self.extend_login
+        with self._token_lock:
+            if not self.token:
+                login_method()
+            elif int(time.time() - self.token_timer) > self.token_limit:
+                extend_login_method()
+            return self.token
+
+    # Return a new dictionary of request headers, rather than modifying the caller's dictionary, which may be shared between threads.
+
+    def build_request_headers(self, request_headers=None, auth_headers=None):
+        if request_headers:
+            headers = dict(request_headers)
+        else:
+            headers = {'Content-Type': 'application/json'}
+        if auth_headers:
+            headers.update(auth_headers)
+        # Negotiate compression, limited to the encodings that urllib3 can decode (gzip and deflate, plus br and zstd when installed).
+        if 'Accept-Encoding' not in headers:
+            headers['Accept-Encoding'] = ACCEPT_ENCODING
+        # Add User-Agent to the headers
+        headers['User-Agent'] = self.user_agent
+        return headers
+
+    # Return the page size (limit) for a paginated endpoint: as configured for the endpoint (or its family) via the 'page_limits' setting,
+    # or as chosen by the page size tuner (when enabled via the 'page_size_tuning' setting), or the default for its family.
+    # Families: 'compute', 'code_security', 'rql', and 'alert'.
+
+    def page_limit(self, endpoint, family='compute'):
+        endpoint = endpoint.split('?')[0]
+        maximum = PAGE_LIMIT_MAXIMUMS[family]
+        page_limits = getattr(self, 'page_limits', None) or {}
+        for key in [endpoint, family]:
+            if key in page_limits:
+                return max(1, min(int(page_limits[key]), maximum))
+        page_size_tuner = getattr(self, 'page_size_tuner', None)
+        if page_size_tuner:
+            return page_size_tuner.choose(self.page_size_key(endpoint, family), maximum)
+        return PAGE_LIMIT_DEFAULTS[family]
+
+    # Record the records, elapsed time, and size of a page, for the page size tuner (when enabled).
+
+    def record_page(self, endpoint, limit, records, seconds, size=0, family='compute'):
+        page_size_tuner = getattr(self, 'page_size_tuner', None)
+        if page_size_tuner:
+            page_size_tuner.record(self.page_size_key(endpoint.split('?')[0], family), limit, records, seconds, size)
+
+    # Measurements of the page size tuner are keyed by console (the Compute console, or the CSPM API) and endpoint.
+
+    def page_size_key(self, endpoint, family='compute'):
+        return '%s/%s' % (self.api_compute if family == 'compute' else self.api, endpoint)
+
+    # Optionally gzip large request bodies, when the body (in bytes) exceeds the 'request_compression_threshold' setting.
+    # Returns the (possibly compressed) body, and headers with the corresponding 'Content-Encoding'.
+
+    def compress_request_body(self, body_params_json, request_headers):
+        threshold = getattr(self, 'request_compression_threshold', None)
+        if not body_params_json or threshold is None:
+            return body_params_json, request_headers
+        body_bytes = body_params_json.encode('utf-8') if isinstance(body_params_json, str) else body_params_json
+        if len(body_bytes) <= threshold:
+            return body_params_json, request_headers
+        request_headers = dict(request_headers)
+        request_headers['Content-Encoding'] = 'gzip'
+        return gzip.compress(body_bytes), request_headers
+
+    # Record bytes sent, bytes received on the wire (possibly compressed), and bytes received after decoding, per endpoint.
+    # Call once per attempt: attempts retried within a session (via a urllib3 Retry) are counted from the retry history of the response,
+    # as requests that resent the body (their responses are discarded by urllib3, so are not counted as received).
+
+    def record_transfer(self, endpoint, api_response, body=None, decoded_bytes=None):
+        endpoint = endpoint.split('?')[0]
+        retry_history = getattr(getattr(api_response.raw, 'retries', None), 'history', None) or ()
+        if decoded_bytes is None:
+            decoded_bytes = len(api_response.content) if api_response.content else 0
+        try:
+            wire_bytes = api_response.raw.tell()
+        # pylint: disable=broad-except
+        except Exception:
+            wire_bytes = 0
+        if not wire_bytes:
+            wire_bytes = int(api_response.headers.get('Content-Length', decoded_bytes))
+        requests_sent = 1 + len(retry_history)
+        sent_bytes = len(body) if body else 0
+        with self._transfer_stats_lock:
+            stats = self.transfer_stats.setdefault(endpoint, {'requests': 0, 'bytes_sent': 0, 'bytes_received_wire': 0, 'bytes_received_decoded': 0})
+            stats['requests'] += requests_sent
+            stats['bytes_sent'] += sent_bytes * requests_sent
+            stats['bytes_received_wire'] += wire_bytes
+            stats['bytes_received_decoded'] += decoded_bytes
+
+    # Output bytes transferred per endpoint.
+
+    def transfer_report(self):
+        with self._transfer_stats_lock:
+            transfer_stats = {endpoint: dict(stats) for endpoint, stats in self.transfer_stats.items()}
+        for endpoint, stats in sorted(transfer_stats.items()):
+            ratio = stats['bytes_received_decoded'] / stats['bytes_received_wire'] if stats['bytes_received_wire'] else 1
+            print('%s: %s request(s), %s bytes sent, %s bytes received on the wire, %s bytes decoded (%.1fx)' % (
+                endpoint, stats['requests'], stats['bytes_sent'], stats['bytes_received_wire'], stats['bytes_received_decoded'], ratio))
+        return transfer_stats
+
     # pylint: disable=too-many-arguments, too-many-branches, too-many-locals
     def execute(self, action, endpoint, query_params=None, body_params=None, request_headers=None, force=False, paginated=False):
         self.suppress_warnings_when_verify_false()
-        if not self.token:
-            self.login()
-        if int(time.time() - self.token_timer) > self.token_limit:
-            self.extend_login()
         # Endpoints that return large numbers of results use a 'nextPageToken' (and a 'totalRows') key.
         # Pagination appears to be specific to "List Alerts V2 - POST" and the limit has a maximum of 10000.
         more = True
         results = []
         while more is True:
-            if int(time.time() - self.token_timer) > self.token_limit:
-                self.extend_login()
+            token = self.token_check()
             url = 'https://%s/%s' % (self.api, endpoint)
-            if not request_headers:
-                request_headers = {'Content-Type': 'application/json'}
-            if self.token:
-                request_headers['x-redlock-auth'] = self.token
+            request_headers_with_auth = self.build_request_headers(request_headers, {'x-redlock-auth': token} if token else None)
             if body_params:
                 body_params_json = json.dumps(body_params)
             else:
                 body_params_json = None
+            body_params_data, request_headers_with_auth = self.compress_request_body(body_params_json, request_headers_with_auth)
             self.debug_print('API URL: %s' % url)
-            self.debug_print('API Request Headers: (%s)' % request_headers)
+            self.debug_print('API Request Headers: (%s)' % request_headers_with_auth)
             self.debug_print('API Query Params: %s' % query_params)
             self.debug_print('API Body Params: %s' % body_params_json)
-            # Add User-Agent to the headers
-            request_headers['User-Agent'] = self.user_agent
-            api_response = requests.request(action, url, headers=request_headers, params=query_params, data=body_params_json, verify=self.verify, timeout=self.timeout)
+            api_response = requests.request(action, url, headers=request_headers_with_auth, params=query_params, data=body_params_data, verify=self.verify, timeout=self.timeout)
             self.debug_print('API Response Status Code: %s' % api_response.status_code)
             self.debug_print('API Response Headers: (%s)' % api_response.headers)
             if api_response.status_code in self.retry_status_codes:
                 for exponential_wait in self.retry_waits:
+                    # Record each attempt that is retried (with its resent body).
+                    self.record_transfer(endpoint, api_response, body_params_data)
                     time.sleep(exponential_wait)
-                    api_response = requests.request(action, url, headers=request_headers, params=query_params, data=body_params_json, verify=self.verify, timeout=self.timeout)
+                    api_response = requests.request(action, url, headers=request_headers_with_auth, params=query_params, data=body_params_data, verify=self.verify, timeout=self.timeout)
                     if api_response.ok:
                         break # retry loop
+            self.record_transfer(endpoint, api_response, body_params_data)
             if api_response.ok:
                 if not api_response.content:
                     return None
@@ -143,6 +251,51 @@ class PrismaCloudAPIMixin():
                 self.error_and_exit(api_response.status_code, 'API: (%s) with query params: (%s) and body params: (%s) responded with an error and this response:\n%s' % (url, query_params, body_params, api_response.text))
         return results
 
+    # Download (via a streaming GET request) to a file, or to bytes, for downloads that may be large or not JSON.
+    # Returns None if the download is pending (the endpoint responds with a 204), otherwise the file name (or the content).
+    # Files are written to a temporary file, and renamed when complete (or removed, if the download fails).
+
+    def execute_download(self, endpoint, file_name=None, query_params=None, chunk_size=65536):
+        self.suppress_warnings_when_verify_false()
+        token = self.token_check()
+        url = 'https://%s/%s' % (self.api, endpoint)
+        request_headers = self.build_request_headers(None, {'x-redlock-auth': token} if token else None)
+        self.debug_print('API URL: %s' % url)
+        api_response = requests.request('GET', url, headers=request_headers, params=query_params, verify=self.verify, timeout=self.timeout, stream=True)
+        if api_response.status_code in self.retry_status_codes:
+            for exponential_wait in self.retry_waits:
+                self.record_transfer(endpoint, api_response)
+                api_response.close()
+                time.sleep(exponential_wait)
+                api_response = requests.request('GET', url, headers=request_headers, params=query_params, verify=self.verify, timeout=self.timeout, stream=True)
+                if api_response.ok:
+                    break # retry loop
+        self.debug_print('API Response Status Code: %s' % api_response.status_code)
+        with api_response:
+            if api_response.status_code == 204:
+                self.record_transfer(endpoint, api_response, decoded_bytes=0)
+                return None
+            if not api_response.ok:
+                self.logger.error('API: (%s) responded with a status of: (%s), with query: (%s)' % (url, api_response.status_code, query_params))
+                self.error_and_exit(api_response.status_code, 'API: (%s) with query params: (%s) responded with an error and this response:\n%s' % (url, query_params, api_response.text))
+            if not file_name:
+                content = api_response.content
+                self.record_transfer(endpoint, api_response)
+                return content
+            decoded_bytes = 0
+            temporary_file_name = '%s.%s.part' % (file_name, os.getpid())
+            try:
+                with open(temporary_file_name, 'wb') as download_file:
+                    for chunk in api_response.iter_content(chunk_size=chunk_size):
+                        download_file.write(chunk)
+                        decoded_bytes += len(chunk)
+                os.replace(temporary_file_name, file_name)
+            finally:
+                if os.path.exists(temporary_file_name):
+                    os.remove(temporary_file_name)
+            self.record_transfer(endpoint, api_response, decoded_bytes=decoded_bytes)
+        return file_name
+
     # Exit handler (Error).
 
     @classmethod
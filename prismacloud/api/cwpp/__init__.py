@@ -12,6 +12,7 @@ from ._defenders import *
 from ._feeds import *
 from ._hosts import *
 from ._images import *
+from ._incremental import *
 from ._logs import *
 from ._policies import *
 from ._registry import *
@@ -22,6 +23,7 @@ from ._stats import *
 from ._status import *
 from ._tags import *
 from ._vms import *
+from ._vulnerabilities import *
 
 mixin_classes_as_strings = list(
     filter(lambda x: x.endswith('PrismaCloudAPICWPPMixin'), dir()))
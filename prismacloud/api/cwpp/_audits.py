@@ -1,5 +1,15 @@
 """ Prisma Cloud Compute API Audits Endpoints Class """
 
+import math
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from ..pc_lib_checkpoint import record_id
+from ..pc_lib_time_range import format_timestamp, parse_timestamp
+
 class AuditsPrismaCloudAPICWPPMixin:
     """ Prisma Cloud Compute API Audit Endpoints Class """
 
@@ -7,7 +17,13 @@ class AuditsPrismaCloudAPICWPPMixin:
     # It maps to the table in Compute > Monitor > Runtime > Incident Explorer in the Console.
     # Reference: https://prisma.pan.dev/api/cloud/cwpp/audits
 
-    def audits_list_read(self, audit_type='incidents', query_params=None, concurrent=False, max_workers=4):
+    def audits_list_read(self, audit_type='incidents', query_params=None, concurrent=False, max_workers=4, count=False, filters=None):
+        if filters:
+            if count:
+                return self.count_compute_filtered('api/v1/audits/%s' % audit_type, filters, query_params=query_params)
+            return list(self.execute_compute_filtered('GET', 'api/v1/audits/%s' % audit_type, filters, query_params=query_params, max_workers=max_workers))
+        if count:
+            return self.count_compute('api/v1/audits/%s' % audit_type, query_params=query_params)
         audits = self.execute_compute('GET', 'api/v1/audits/%s' % audit_type, query_params=query_params, paginated=True, concurrent=concurrent, max_workers=max_workers)
         return audits
 
@@ -60,9 +76,92 @@ class AuditsPrismaCloudAPICWPPMixin:
             'incidents'
         ]
 
+    # Audits of many types, sharded by time.
+    # Each audit type's time range ('start' to 'end', RFC 3339 timestamps, Default end: now) is split into sub-windows,
+    # sized by the 'Total-Count' of the audit type (via single-record probes), so that each sub-window has about 'shard_records' audits,
+    # down to 'min_window' seconds. All probes and sub-windows (of all types) share one thread pool of 'max_workers'.
+    # Yields (audit_type, audits) as each sub-window completes, so high-volume audit types do not delay low-volume audit types.
+    # Example: for audit_type, audits in pc_api.audits_bulk_read(start='2024-01-31T00:00:00Z'): ...
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def audits_bulk_read(self, audit_types=None, start=None, end=None, query_params=None, max_workers=8, shard_records=5000, min_window=60):
+        if audit_types is None:
+            audit_types = self.compute_audit_types()
+        start_epoch = parse_timestamp(start)
+        if start_epoch is None:
+            raise ValueError('Bulk audits require a start time (an RFC 3339 timestamp): %s' % start)
+        end_epoch = parse_timestamp(end) if end else time.time()
+        # Audits at the boundary of two sub-windows may be returned by both.
+        boundaries = {}
+        boundary_ids = {}
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            for audit_type in dict.fromkeys(audit_types):
+                boundaries[audit_type] = set()
+                boundary_ids[audit_type] = set()
+                pending[executor.submit(self.audits_shard_read, audit_type, query_params, start_epoch, end_epoch, shard_records, min_window, session)] = audit_type
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        audit_type = pending.pop(future)
+                        sub_windows, audits = future.result()
+                        for sub_window_start, sub_window_end in sub_windows:
+                            boundaries[audit_type].update([sub_window_start, sub_window_end])
+                            pending[executor.submit(self.audits_shard_read, audit_type, query_params, sub_window_start, sub_window_end, shard_records, min_window, session)] = audit_type
+                        if audits:
+                            yield audit_type, self.audits_without_boundary_duplicates(audits, boundaries[audit_type], boundary_ids[audit_type])
+            finally:
+                # When the consumer stops early (or on error), do not start the sub-windows that are still waiting.
+                for future in pending:
+                    future.cancel()
+
+    @classmethod
+    def audits_without_boundary_duplicates(cls, audits, boundaries, boundary_ids):
+        if not boundaries:
+            return audits
+        result = []
+        for audit in audits:
+            epoch = parse_timestamp(audit.get('time'))
+            if epoch is not None and any(abs(epoch - boundary) < 0.001 for boundary in boundaries):
+                audit_id = record_id(audit)
+                if audit_id in boundary_ids:
+                    continue
+                boundary_ids.add(audit_id)
+            result.append(audit)
+        return result
+
+    # Return ([sub-windows], []) for a sub-window with more than 'shard_records' audits, that should be split (again, by its 'Total-Count'),
+    # or ([], [audits]) for the audits in the sub-window.
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def audits_shard_read(self, audit_type, query_params, start_epoch, end_epoch, shard_records, min_window, session):
+        endpoint = 'api/v1/audits/%s' % audit_type
+        shard_query_params = dict(query_params or {})
+        shard_query_params['from'] = format_timestamp(start_epoch)
+        shard_query_params['to'] = format_timestamp(end_epoch)
+        total_count = self.count_compute(endpoint, query_params=shard_query_params, session=session) or 0
+        shards = min(math.ceil(total_count / shard_records), int((end_epoch - start_epoch) // min_window))
+        if shards > 1:
+            step = (end_epoch - start_epoch) / shards
+            return [(start_epoch + step * shard, end_epoch if shard == shards - 1 else start_epoch + step * (shard + 1)) for shard in range(shards)], []
+        audits = []
+        offset = 0
+        limit = self.page_limit(endpoint)
+        while offset < total_count:
+            compute_response = self._make_single_request_with_retry('GET', self._compute_page_url(endpoint, limit, offset), None, shard_query_params, None, session, endpoint, full_response=True)
+            audits.extend(compute_response.body or [])
+            if not compute_response.body:
+                break
+            total_count = compute_response.total_count or 0
+            offset += limit
+        return [], audits
+
     # Hosts > Host Activities
 
-    def host_forensic_activities_list_read(self, query_params=None, concurrent=False, max_workers=4):
+    def host_forensic_activities_list_read(self, query_params=None, concurrent=False, max_workers=4, count=False):
+        if count:
+            return self.count_compute('api/v1/forensic/activities', query_params=query_params)
         audits = self.execute_compute('GET', 'api/v1/forensic/activities', query_params=query_params, paginated=True, concurrent=concurrent, max_workers=max_workers)
         return audits
 
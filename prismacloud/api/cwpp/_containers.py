@@ -1,11 +1,21 @@
 """ Prisma Cloud Compute API Containers Endpoints Class """
 
+from ..pc_lib_filter import normalize_filters
+
 # Containers
 
 class ContainersPrismaCloudAPICWPPMixin:
     """ Prisma Cloud Compute API Containers Endpoints Class """
 
-    def containers_list_read(self, image_id=None, query_params=None, concurrent=False, max_workers=4):
+    def containers_list_read(self, image_id=None, query_params=None, concurrent=False, max_workers=4, count=False, filters=None):
+        if filters:
+            # Filter by image via an 'info.imageID' predicate.
+            filters = normalize_filters(filters) + ([('info.imageID', 'eq', image_id)] if image_id else [])
+            if count:
+                return self.count_compute_filtered('api/v1/containers', filters, query_params=query_params)
+            return list(self.execute_compute_filtered('GET', 'api/v1/containers', filters, query_params=query_params, max_workers=max_workers))
+        if count:
+            return self.count_compute('api/v1/containers?imageId=%s' % image_id if image_id else 'api/v1/containers?', query_params=query_params)
         if image_id:
             containers = self.execute_compute('GET', 'api/v1/containers?imageId=%s' % image_id, query_params=query_params, paginated=True, concurrent=concurrent, max_workers=max_workers)
         else:
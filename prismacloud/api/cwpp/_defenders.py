@@ -5,7 +5,13 @@
 class DefendersPrismaCloudAPICWPPMixin:
     """ Prisma Cloud Compute API Defenders Endpoints Class """
 
-    def defenders_list_read(self, query_params=None, concurrent=False, max_workers=4):
+    def defenders_list_read(self, query_params=None, concurrent=False, max_workers=4, count=False, filters=None):
+        if filters:
+            if count:
+                return self.count_compute_filtered('api/v1/defenders', filters, query_params=query_params)
+            return list(self.execute_compute_filtered('GET', 'api/v1/defenders', filters, query_params=query_params, max_workers=max_workers))
+        if count:
+            return self.count_compute('api/v1/defenders', query_params=query_params)
         defenders = self.execute_compute('GET', 'api/v1/defenders', query_params=query_params, paginated=True, concurrent=concurrent, max_workers=max_workers)
         return defenders
 
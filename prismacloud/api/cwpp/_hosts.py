@@ -6,11 +6,19 @@ class HostsPrismaCloudAPICWPPMixin:
     """ Prisma Cloud Compute API Hosts Endpoints Class """
 
     # Running hosts table in Monitor > Vulnerabilities > Hosts > Running Hosts
-    def hosts_list_read(self, query_params=None, concurrent=False, max_workers=4):
+    def hosts_list_read(self, query_params=None, concurrent=False, max_workers=4, count=False, filters=None):
+        if filters:
+            if count:
+                return self.count_compute_filtered('api/v1/hosts', filters, query_params=query_params)
+            return list(self.execute_compute_filtered('GET', 'api/v1/hosts', filters, query_params=query_params, max_workers=max_workers))
+        if count:
+            return self.count_compute('api/v1/hosts', query_params=query_params)
         hosts = self.execute_compute('GET', 'api/v1/hosts', query_params=query_params, paginated=True, concurrent=concurrent, max_workers=max_workers)
         return hosts
 
-    def hosts_info_list_read(self, query_params=None, concurrent=False, max_workers=4):
+    def hosts_info_list_read(self, query_params=None, concurrent=False, max_workers=4, count=False):
+        if count:
+            return self.count_compute('api/v1/hosts/info', query_params=query_params)
         hosts = self.execute_compute('GET', 'api/v1/hosts/info', query_params=query_params, paginated=True, concurrent=concurrent, max_workers=max_workers)
         return hosts
 
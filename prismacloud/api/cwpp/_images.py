@@ -1,11 +1,21 @@
 """ Prisma Cloud Compute API Images Endpoints Class """
 
+from ..pc_lib_filter import normalize_filters
+
 # Images (Monitor > Vulnerabilities/Compliance > Images > Deployed)
 
 class ImagesPrismaCloudAPICWPPMixin:
     """ Prisma Cloud Compute API Images Endpoints Class """
 
-    def images_list_read(self, image_id=None, query_params=None, concurrent=False, max_workers=4):
+    def images_list_read(self, image_id=None, query_params=None, concurrent=False, max_workers=4, count=False, filters=None):
+        if filters:
+            # Filter by image via an '_id' predicate.
+            filters = normalize_filters(filters) + ([('_id', 'eq', image_id)] if image_id else [])
+            if count:
+                return self.count_compute_filtered('api/v1/images', filters, query_params=query_params)
+            return list(self.execute_compute_filtered('GET', 'api/v1/images', filters, query_params=query_params, max_workers=max_workers))
+        if count:
+            return self.count_compute('api/v1/images?id=%s' % image_id if image_id else 'api/v1/images?', query_params=query_params)
         if image_id:
             images = self.execute_compute('GET', 'api/v1/images?id=%s' % image_id, query_params=query_params, concurrent=concurrent, max_workers=max_workers)
         else:
@@ -0,0 +1,55 @@
+""" Prisma Cloud Compute API Incremental Collection Class """
+
+from ..pc_lib_checkpoint import ordered_records_after_checkpoint, records_after_checkpoint
+from ..pc_lib_time_range import format_timestamp, records_between
+
+class IncrementalPrismaCloudAPICWPPMixin:
+    """ Prisma Cloud Compute API Incremental Collection Class """
+
+    # Incremental collection of audits, host forensic activities, console history, and console logs,
+    # via a CheckpointStore (see pc_lib_checkpoint) of the newest record collected per collection.
+    # Collections: 'audits/<audit type>' (see compute_audit_types()), 'forensic/activities', 'audits/mgmt' (console history), and 'logs/console'.
+
+    def compute_incremental_collections(self):
+        return ['audits/%s' % audit_type for audit_type in self.compute_audit_types()] + ['forensic/activities', 'audits/mgmt', 'logs/console']
+
+    # Return the records collected since the checkpoint of a collection (or since 'start', an RFC 3339 timestamp, without a checkpoint),
+    # and the new checkpoint, to commit after the records have been processed, so that a crash before the commit does not result in a gap:
+    #
+    #     records, checkpoint = pc_api.compute_incremental_read('audits/incidents', checkpoint_store)
+    #     send_data_to_siem(records)
+    #     checkpoint_store.commit('audits/incidents', checkpoint)
+    #
+    # Console logs do not support a time filter: they are filtered (via a binary search, as they are sorted by time) after they are read,
+    # so the 'lines' query parameter should be large enough to include all logs since the checkpoint (or see console_logs_follow()).
+
+    # pylint: disable=too-many-arguments
+    def compute_incremental_read(self, collection, checkpoint_store, query_params=None, start=None, overlap=60, commit=False, concurrent=False, max_workers=4):
+        checkpoint = checkpoint_store.get(collection)
+        query_params = dict(query_params or {})
+        if collection != 'logs/console':
+            if checkpoint:
+                query_params['from'] = format_timestamp(checkpoint['epoch'] - overlap)
+            elif start:
+                query_params['from'] = start
+        if collection == 'forensic/activities':
+            records = self.host_forensic_activities_list_read(query_params=query_params, concurrent=concurrent, max_workers=max_workers)
+        elif collection == 'audits/mgmt':
+            records = self.console_history_list_read(query_params=query_params, concurrent=concurrent, max_workers=max_workers)
+        elif collection == 'logs/console':
+            records = self.console_logs_list_read(query_params=query_params, concurrent=concurrent, max_workers=max_workers)
+            records = self.console_logs_oldest_first(records)
+            if not checkpoint and start:
+                records = records_between(records, start)
+            records, new_checkpoint = ordered_records_after_checkpoint(records, checkpoint, overlap)
+            if commit:
+                checkpoint_store.commit(collection, new_checkpoint)
+            return records, new_checkpoint
+        elif collection.startswith('audits/'):
+            records = self.audits_list_read(audit_type=collection[len('audits/'):], query_params=query_params, concurrent=concurrent, max_workers=max_workers)
+        else:
+            raise ValueError('Unknown incremental collection: %s' % collection)
+        records, new_checkpoint = records_after_checkpoint(records, checkpoint, overlap)
+        if commit:
+            checkpoint_store.commit(collection, new_checkpoint)
+        return records, new_checkpoint
@@ -1,5 +1,10 @@
 """ Prisma Cloud Compute API Logs Endpoints Class """
 
+import time
+
+from ..pc_lib_checkpoint import ordered_records_after_checkpoint
+from ..pc_lib_time_range import parse_timestamp, records_between
+
 # Containers
 
 class LogsPrismaCloudAPICWPPMixin:
@@ -19,6 +24,52 @@ class LogsPrismaCloudAPICWPPMixin:
         logs = self.execute_compute('GET', 'api/v1/logs/console', query_params=query_params, concurrent=concurrent, max_workers=max_workers)
         return logs
 
+    # Console logs are sorted by time: return them oldest first.
+
+    @staticmethod
+    def console_logs_oldest_first(logs):
+        logs = logs or []
+        if len(logs) > 1:
+            first = parse_timestamp(logs[0].get('time'))
+            last = parse_timestamp(logs[-1].get('time'))
+            if first is not None and last is not None and first > last:
+                return logs[::-1]
+        return logs
+
+    # Return the console logs from 'since' to 'until' (inclusive), as epoch seconds or timestamps.
+    # The console logs endpoint does not support a time filter: logs are filtered via a binary search, rather than by parsing each line.
+
+    def console_logs_read_since(self, since=None, until=None, query_params=None):
+        logs = self.console_logs_oldest_first(self.console_logs_list_read(query_params=query_params))
+        return records_between(logs, since, until)
+
+    # Follow (tail) the console logs: yield (logs, checkpoint) with only the logs after the previous logs (or 'checkpoint', or 'since'), every 'interval' seconds.
+    # Commit each checkpoint (see pc_lib_checkpoint) after processing its logs, to resume from it.
+    # Polls request the last 'lines' lines, doubling (up to 'max_lines') while the lines requested do not reach back to the previous logs (or to 'since').
+
+    # pylint: disable=too-many-arguments
+    def console_logs_follow(self, checkpoint=None, since=None, interval=10, lines=1024, max_lines=32768, overlap=60, polls=None):
+        if isinstance(since, str):
+            since = parse_timestamp(since)
+        poll = 0
+        while polls is None or poll < polls:
+            if poll:
+                time.sleep(interval)
+            poll += 1
+            while True:
+                logs = self.console_logs_oldest_first(self.console_logs_list_read(query_params={'lines': lines}))
+                reached = checkpoint['epoch'] - overlap if checkpoint else since
+                oldest = parse_timestamp(logs[0].get('time')) if logs else None
+                if reached is None or len(logs) < lines or lines >= max_lines or oldest is None or oldest <= reached:
+                    break
+                lines = min(lines * 2, max_lines)
+            if not checkpoint and since is not None:
+                logs = records_between(logs, since)
+            logs, new_checkpoint = ordered_records_after_checkpoint(logs, checkpoint, overlap)
+            if new_checkpoint:
+                checkpoint = new_checkpoint
+            yield logs, checkpoint
+
     def system_logs_list_read(self, query_params=None, concurrent=False, max_workers=4):
         logs = self.execute_compute('GET', 'api/v1/logs/system/download', query_params=query_params, concurrent=concurrent, max_workers=max_workers)
         return logs
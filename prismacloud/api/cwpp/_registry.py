@@ -5,7 +5,9 @@
 class RegistryPrismaCloudAPICWPPMixin:
     """ Prisma Cloud Compute API Images Endpoints Class """
 
-    def registry_list_read(self, image_id=None, concurrent=False, max_workers=4):
+    def registry_list_read(self, image_id=None, concurrent=False, max_workers=4, count=False):
+        if count:
+            return self.count_compute('api/v1/registry?id=%s&filterBaseImage=true' % image_id if image_id else 'api/v1/registry?filterBaseImage=true')
         if image_id:
             images = self.execute_compute('GET', 'api/v1/registry?id=%s&filterBaseImage=true' % image_id, concurrent=concurrent, max_workers=max_workers)
         else:
@@ -5,7 +5,9 @@
 class ScansPrismaCloudAPICWPPMixin:
     """ Prisma Cloud Compute API Scans Endpoints Class """
 
-    def scans_list_read(self, image_id=None, concurrent=False, max_workers=4):
+    def scans_list_read(self, image_id=None, concurrent=False, max_workers=4, count=False):
+        if count:
+            return self.count_compute('api/v1/scans?imageID=%s&filterBaseImage=true' % image_id if image_id else 'api/v1/scans?filterBaseImage=true')
         if image_id:
             images = self.execute_compute('GET', 'api/v1/scans?imageID=%s&filterBaseImage=true' % image_id, concurrent=concurrent, max_workers=max_workers)
         else:
@@ -2,7 +2,9 @@ class ServerlessPrismaCloudAPICWPPMixin:
     """ Prisma Cloud Compute Serverless Endpoints Class """
 
     # Get serverless function scan results
-    def serverless_list_read(self, query_params=None, concurrent=False, max_workers=4):
+    def serverless_list_read(self, query_params=None, concurrent=False, max_workers=4, count=False):
+        if count:
+            return self.count_compute('api/v1/serverless', query_params=query_params)
         result = self.execute_compute('GET', 'api/v1/serverless', query_params=query_params, paginated=True, concurrent=concurrent, max_workers=max_workers)
         return result
    
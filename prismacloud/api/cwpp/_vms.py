@@ -7,7 +7,9 @@ class VMsPrismaCloudAPICWPPMixin:
     """ Prisma Cloud Compute API VMs Endpoints Class """
 
     # VM Image table in Monitor > Vulnerabilities > Hosts > VMs
-    def vms_list_read(self, query_params=None, concurrent=False):
+    def vms_list_read(self, query_params=None, concurrent=False, count=False):
+        if count:
+            return self.count_compute('api/v1/vms', query_params=query_params)
         vms = self.execute_compute(
             'GET', 'api/v1/vms', query_params=query_params, paginated=True, concurrent=concurrent)
         return vms
\ No newline at end of file
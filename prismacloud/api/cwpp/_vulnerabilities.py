@@ -0,0 +1,59 @@
+""" Prisma Cloud Compute API Vulnerability Locations Class """
+
+from ..pc_lib_join import field_value, key_index
+
+# Return a dictionary of each CVE (of 'cves', or all CVEs) to the list of images with that CVE.
+
+def cve_image_index(images, cves=None):
+    index = {}
+    for image in images or []:
+        for vulnerability in image.get('vulnerabilities') or []:
+            cve = vulnerability.get('cve')
+            if not cve or (cves is not None and cve not in cves):
+                continue
+            cve_images = index.setdefault(cve, [])
+            if not cve_images or cve_images[-1] is not image:
+                cve_images.append(image)
+    return index
+
+class VulnerabilitiesPrismaCloudAPICWPPMixin:
+    """ Prisma Cloud Compute API Vulnerability Locations Class """
+
+    # Return the locations of each of a set of CVEs: the registry images and deployed images with the CVE,
+    # and the containers (of those deployed images), and the hosts and clusters (of those containers and deployed images):
+    #
+    #     {'CVE-2021-44228': {'registry_images': [...], 'deployed_images': [...], 'containers': [...], 'hosts': [...], 'clusters': [...]}}
+    #
+    # Images are read once, and indexed by CVE. Containers are read once (rather than once per vulnerable image), and grouped by image.
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def cve_locations_read(self, cves, mode='all', image_id=None, concurrent=False, max_workers=4):
+        if isinstance(cves, str):
+            cves = [cves]
+        cves = set(cves)
+        if mode not in ('registry', 'deployed', 'all'):
+            raise ValueError('Unknown mode: %s (Expected one of: registry, deployed, all)' % mode)
+        locations = {cve: {'registry_images': [], 'deployed_images': [], 'containers': [], 'hosts': [], 'clusters': []} for cve in cves}
+        if mode in ('registry', 'all'):
+            registry_images = self.registry_list_read(image_id, concurrent=concurrent, max_workers=max_workers)
+            for cve, images in cve_image_index(registry_images, cves).items():
+                locations[cve]['registry_images'] = images
+        if mode in ('deployed', 'all'):
+            deployed_images = self.images_list_read(image_id=image_id, query_params={'filterBaseImage': 'true'}, concurrent=concurrent, max_workers=max_workers)
+            deployed_index = cve_image_index(deployed_images, cves)
+            # Containers are only read when a deployed image has one of the CVEs.
+            containers = self.containers_list_read(image_id=image_id, concurrent=concurrent, max_workers=max_workers) if deployed_index else []
+            containers_by_image = key_index(containers, 'info.imageID')
+            for cve, images in deployed_index.items():
+                cve_containers = [container for image in images for container in containers_by_image.get(image['_id'], [])]
+                # Hosts and clusters of the containers, and of the images (which include images without running containers).
+                hosts = set(container['hostname'] for container in cve_containers if container.get('hostname'))
+                clusters = set(field_value(container, 'info.cluster') for container in cve_containers if field_value(container, 'info.cluster'))
+                for image in images:
+                    hosts.update(image.get('hosts') or {})
+                    clusters.update(image.get('clusters') or [])
+                locations[cve]['deployed_images'] = images
+                locations[cve]['containers'] = cve_containers
+                locations[cve]['hosts'] = sorted(hosts)
+                locations[cve]['clusters'] = sorted(clusters)
+        return locations
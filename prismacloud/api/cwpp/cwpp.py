@@ -4,14 +4,22 @@ import json
 import time
 import math
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from threading import Lock
-from collections import defaultdict
+from collections import defaultdict, deque, namedtuple
 from datetime import datetime, timedelta
 
 import requests
 from requests.adapters import HTTPAdapter, Retry
 
+from ..pc_lib_filter import compile_compute_filters, filter_records
+from ..pc_lib_process import combine_transformed_pages, decode_and_transform
+
+# A response from a single request: status code, headers, decoded body, undecoded content, the value of the 'Total-Count' header (or None),
+# and the seconds of the (successful) request, excluding rate limiting waits and retries.
+ComputeResponse = namedtuple('ComputeResponse', ['status_code', 'headers', 'body', 'content', 'total_count', 'seconds'])
+
 
 class PrismaCloudAPICWPPMixin():
     """ Requests and Output """
@@ -19,6 +27,9 @@ class PrismaCloudAPICWPPMixin():
     def _initialize_enhanced_error_handling(self):
         """Initialize enhanced error handling and retry mechanisms if not already initialized"""
         if not hasattr(self, '_circuit_breaker_state'):
+            # Guards the circuit breaker and rate limiting state, which is shared by concurrent threads
+            self._state_lock = Lock()
+
             # Circuit breaker state
             self._circuit_breaker_state = {
                 'failures': 0,
@@ -72,15 +83,16 @@ class PrismaCloudAPICWPPMixin():
         now = datetime.now()
         state = self._circuit_breaker_state
         
-        if state['state'] == 'OPEN':
-            if state['last_failure_time'] and (now - state['last_failure_time']).total_seconds() > state['timeout']:
-                state['state'] = 'HALF_OPEN'
-                state['failures'] = 0
-                print(f"🔄 Circuit breaker for {endpoint} moved to HALF_OPEN")
-                return False
-            else:
-                print(f"🚫 Circuit breaker for {endpoint} is OPEN - request blocked")
-                return True
+        with self._state_lock:
+            if state['state'] == 'OPEN':
+                if state['last_failure_time'] and (now - state['last_failure_time']).total_seconds() > state['timeout']:
+                    state['state'] = 'HALF_OPEN'
+                    state['failures'] = 0
+                    print(f"🔄 Circuit breaker for {endpoint} moved to HALF_OPEN")
+                    return False
+                else:
+                    print(f"🚫 Circuit breaker for {endpoint} is OPEN - request blocked")
+                    return True
         
         return False
 
@@ -88,48 +100,55 @@ class PrismaCloudAPICWPPMixin():
         """Record a successful request for circuit breaker"""
         self._initialize_enhanced_error_handling()
         state = self._circuit_breaker_state
-        if state['state'] == 'HALF_OPEN':
-            state['failures'] = 0
-            state['state'] = 'CLOSED'
-            print(f"✅ Circuit breaker for {endpoint} moved to CLOSED")
+        with self._state_lock:
+            if state['state'] == 'HALF_OPEN':
+                state['failures'] = 0
+                state['state'] = 'CLOSED'
+                print(f"✅ Circuit breaker for {endpoint} moved to CLOSED")
 
     def _record_circuit_breaker_failure(self, endpoint):
         """Record a failed request for circuit breaker"""
         self._initialize_enhanced_error_handling()
         state = self._circuit_breaker_state
-        state['failures'] += 1
-        state['last_failure_time'] = datetime.now()
-        
-        if state['state'] == 'HALF_OPEN' or state['failures'] >= state['threshold']:
-            state['state'] = 'OPEN'
-            print(f"🚨 Circuit breaker for {endpoint} moved to OPEN after {state['failures']} failures")
+        with self._state_lock:
+            state['failures'] += 1
+            state['last_failure_time'] = datetime.now()
+            
+            if state['state'] == 'HALF_OPEN' or state['failures'] >= state['threshold']:
+                state['state'] = 'OPEN'
+                print(f"🚨 Circuit breaker for {endpoint} moved to OPEN after {state['failures']} failures")
 
     def _check_rate_limit(self, endpoint):
-        """Check if we're within rate limits"""
+        """Check if we're within rate limits, waiting (outside of the lock) if not"""
         self._initialize_enhanced_error_handling()
-        now = datetime.now()
-        requests_list = self._rate_limit_state['requests'][endpoint]
-        
-        # Remove old requests (older than 1 minute)
-        requests_list[:] = [req_time for req_time in requests_list 
-                           if (now - req_time).total_seconds() < 60]
-        
-        # Check per-minute limit
-        if len(requests_list) >= self._rate_limit_state['max_requests_per_minute']:
-            oldest_request = min(requests_list)
-            wait_time = 5 - (now - oldest_request).total_seconds()
-            if wait_time > 0:
-                print(f"⏳ Rate limit reached for {endpoint}, waiting {wait_time:.1f} seconds")
-                time.sleep(wait_time)
-        
-        # Check per-second limit (simple sliding window)
-        recent_requests = [req_time for req_time in requests_list 
-                          if (now - req_time).total_seconds() < 1]
-        if len(recent_requests) >= self._rate_limit_state['max_requests_per_second']:
-            time.sleep(0.5)  # Increased delay to avoid overwhelming the API
+        minute_wait_time = 0
+        second_wait_time = 0
+        with self._state_lock:
+            now = datetime.now()
+            requests_list = self._rate_limit_state['requests'][endpoint]
+            
+            # Remove old requests (older than 1 minute)
+            requests_list[:] = [req_time for req_time in requests_list 
+                               if (now - req_time).total_seconds() < 60]
+            
+            # Check per-minute limit
+            if len(requests_list) >= self._rate_limit_state['max_requests_per_minute']:
+                oldest_request = min(requests_list)
+                minute_wait_time = max(0, 5 - (now - oldest_request).total_seconds())
+            
+            # Check per-second limit (simple sliding window)
+            recent_requests = [req_time for req_time in requests_list 
+                              if abs((now - req_time).total_seconds()) < 1]
+            if len(recent_requests) >= self._rate_limit_state['max_requests_per_second']:
+                second_wait_time = 0.5  # Increased delay to avoid overwhelming the API
+            
+            # Record this request, at the time it will be sent, so that concurrent threads account for it
+            requests_list.append(now + timedelta(seconds=minute_wait_time + second_wait_time))
         
-        # Record this request
-        requests_list.append(now)
+        if minute_wait_time > 0:
+            print(f"⏳ Rate limit reached for {endpoint}, waiting {minute_wait_time:.1f} seconds")
+        if minute_wait_time + second_wait_time > 0:
+            time.sleep(minute_wait_time + second_wait_time)
 
     def _categorize_error(self, response, exception=None):
         """Categorize errors for appropriate handling"""
@@ -189,11 +208,13 @@ class PrismaCloudAPICWPPMixin():
         
         return False
 
-    def _handle_authentication_error(self, endpoint):
-        """Handle authentication errors by re-logging in"""
+    def _handle_authentication_error(self, endpoint, stale_token=None):
+        """Handle authentication errors by re-logging in, unless another thread already replaced the stale token"""
         print(f"🔐 Authentication error for {endpoint}, attempting re-login...")
         try:
-            self.extend_login_compute()
+            with self._token_lock:
+                if stale_token is None or self.token == stale_token:
+                    self.extend_login_compute()
             print(f"✅ Re-authentication successful for {endpoint}")
             return True
         except Exception as e:
@@ -260,8 +281,22 @@ class PrismaCloudAPICWPPMixin():
         self.debug_print('Extending API Token')
         self.login_compute()
 
-    def _make_single_request_with_retry(self, action, url, request_headers, query_params, body_params_json, session, endpoint="", max_retries=None):
-        """Make a single API request with enhanced retry logic"""
+    # Login, or login again if the API token has expired, and return the current API token (thread-safe).
+
+    def token_check_compute(self):
+        return self.token_check(self.login_compute, self.extend_login_compute)
+
+    def _compute_auth_headers(self, token):
+        if not token:
+            return None
+        if self.api:
+            # Authenticate via CSPM
+            return {'x-redlock-auth': token}
+        # Authenticate via CWP
+        return {'Authorization': "Bearer %s" % token}
+
+    def _make_single_request_with_retry(self, action, url, request_headers, query_params, body_params_json, session, endpoint="", max_retries=None, full_response=False, decode=True):
+        """Make a single API request with enhanced retry logic (returning a ComputeResponse, with the body decoded unless decode is False, if full_response is True)"""
         # Initialize enhanced error handling if not already done
         self._initialize_enhanced_error_handling()
         
@@ -277,39 +312,21 @@ class PrismaCloudAPICWPPMixin():
         
         for attempt in range(max_retries + 1):
             try:
-                # Note: token_timer and token_limit are inherited from the main PrismaCloudAPI class
-                if hasattr(self, '_token_lock'):
-                    with self._token_lock:
-                        if hasattr(self, 'token_timer') and hasattr(self, 'token_limit'):
-                            if int(time.time() - self.token_timer) > self.token_limit:
-                                self.extend_login_compute()
-                        if self.token:
-                            if self.api:
-                                # Authenticate via CSPM
-                                request_headers['x-redlock-auth'] = self.token
-                            else:
-                                # Authenticate via CWP
-                                request_headers['Authorization'] = "Bearer %s" % self.token
-                else:
-                    # Fallback for when _token_lock is not available
-                    if hasattr(self, 'token_timer') and hasattr(self, 'token_limit'):
-                        if int(time.time() - self.token_timer) > self.token_limit:
-                            self.extend_login_compute()
-                    if self.token:
-                        if self.api:
-                            # Authenticate via CSPM
-                            request_headers['x-redlock-auth'] = self.token
-                        else:
-                            # Authenticate via CWP
-                            request_headers['Authorization'] = "Bearer %s" % self.token
+                # Build new headers for each attempt, as the token may have been refreshed by another thread
+                token = self.token_check_compute()
+                request_headers_with_auth = self.build_request_headers(request_headers, self._compute_auth_headers(token))
+                body_params_data, request_headers_with_auth = self.compress_request_body(body_params_json, request_headers_with_auth)
                 
                 self.debug_print('API URL: %s' % url)
-                self.debug_print('API Request Headers: (%s)' % request_headers)
+                self.debug_print('API Request Headers: (%s)' % request_headers_with_auth)
                 self.debug_print('API Query Params: %s' % query_params)
                 self.debug_print('API Body Params: %s' % body_params_json)
                 
-                api_response = session.request(action, url, headers=request_headers, params=query_params,
-                                               data=body_params_json, verify=self.verify, timeout=self.timeout)
+                request_start_time = time.time()
+                api_response = session.request(action, url, headers=request_headers_with_auth, params=query_params,
+                                               data=body_params_data, verify=self.verify, timeout=self.timeout)
+                request_seconds = time.time() - request_start_time
+                self.record_transfer(endpoint, api_response, body_params_data)
                 
                 self.debug_print('API Response Status Code: (%s)' % api_response.status_code)
                 self.debug_print('API Response Headers: (%s)' % api_response.headers)
@@ -317,25 +334,17 @@ class PrismaCloudAPICWPPMixin():
                 if api_response.ok:
                     self._record_circuit_breaker_success(endpoint)
                     
-                    if not api_response.content:
-                        return None
-                    if api_response.headers.get('Content-Type') == 'application/x-gzip':
-                        return api_response.content
-                    if api_response.headers.get('Content-Type') == 'text/csv':
-                        return api_response.content.decode('utf-8')
-                    try:
-                        result = json.loads(api_response.content)
-                        return result
-                    except ValueError:
-                        self.logger.error('JSON raised ValueError, API: (%s) with query params: (%s) and body params: (%s) parsing response: (%s)' % (
-                            url, query_params, body_params_json, api_response.content))
-                        raise ValueError('JSON parsing failed')
+                    body = self._decode_compute_response(api_response, url, query_params, body_params_json) if decode else None
+                    if full_response:
+                        total_count = int(api_response.headers['Total-Count']) if 'Total-Count' in api_response.headers else None
+                        return ComputeResponse(api_response.status_code, api_response.headers, body, api_response.content, total_count, request_seconds)
+                    return body
                 else:
                     error_category = self._categorize_error(api_response)
                     
                     # Handle authentication errors specially
                     if error_category == 'AUTHENTICATION_ERROR':
-                        if self._handle_authentication_error(endpoint):
+                        if self._handle_authentication_error(endpoint, token):
                             continue  # Retry immediately after re-authentication
                         else:
                             self._record_circuit_breaker_failure(endpoint)
@@ -378,20 +387,15 @@ class PrismaCloudAPICWPPMixin():
     # pylint: disable=too-many-arguments,too-many-branches,too-many-locals,too-many-statements
     def execute_compute(self, action, endpoint, query_params=None, body_params=None, request_headers=None, force=False, paginated=False, concurrent=False, max_workers=4):
         self.suppress_warnings_when_verify_false()
-        if not self.token:
-            self.login_compute()
-        if not request_headers:
-            request_headers = {'Content-Type': 'application/json'}
+        self.token_check_compute()
         if body_params:
             body_params_json = json.dumps(body_params)
         else:
             body_params_json = None
-        # Set User Agent
-        request_headers['User-Agent'] = "W"
         # Endpoints that return large numbers of results use a 'Total-Count' response header.
         # Pagination is via query parameters for both GET and POST, and the limit has a maximum of 50.
         offset = 0
-        limit = 100
+        limit = self.page_limit(endpoint)
         results = []
 
         # Enhanced retry configuration with exponential backoff
@@ -424,30 +428,25 @@ class PrismaCloudAPICWPPMixin():
                 total_records_fetched = 0
                 total_available_records = 0
                 while offset == 0 or more is True:
-                    if int(time.time() - self.token_timer) > self.token_limit:
-                        self.extend_login_compute()
+                    token = self.token_check_compute()
                     if paginated:
-                        url = 'https://%s/%s?limit=%s&offset=%s' % (
-                            self.api_compute, endpoint, limit, offset)
+                        limit = self.page_limit(endpoint)
+                        url = self._compute_page_url(endpoint, limit, offset)
                     else:
                         url = 'https://%s/%s' % (self.api_compute, endpoint)
-                    if self.token:
-                        if self.api:
-                            # Authenticate via CSPM
-                            request_headers['x-redlock-auth'] = self.token
-                        else:
-                            # Authenticate via CWP
-                            request_headers['Authorization'] = "Bearer %s" % self.token
+                    request_headers_with_auth = self.build_request_headers(request_headers, self._compute_auth_headers(token))
+                    body_params_data, request_headers_with_auth = self.compress_request_body(body_params_json, request_headers_with_auth)
                     self.debug_print('API URL: %s' % url)
-                    self.debug_print('API Request Headers: (%s)' % request_headers)
+                    self.debug_print('API Request Headers: (%s)' % request_headers_with_auth)
                     self.debug_print('API Query Params: %s' % query_params)
                     self.debug_print('API Body Params: %s' % body_params_json)
-                    # Add User-Agent to the headers
-                    request_headers['User-Agent'] = self.user_agent
                     
                     try:
-                        api_response = session.request(action, url, headers=request_headers, params=query_params,
-                                                       data=body_params_json, verify=self.verify, timeout=self.timeout)
+                        page_start_time = time.time()
+                        api_response = session.request(action, url, headers=request_headers_with_auth, params=query_params,
+                                                       data=body_params_data, verify=self.verify, timeout=self.timeout)
+                        page_seconds = time.time() - page_start_time
+                        self.record_transfer(endpoint, api_response, body_params_data)
                         self.debug_print('API Response Status Code: (%s)' %
                                          api_response.status_code)
                         self.debug_print('API Response Headers: (%s)' %
@@ -472,6 +471,8 @@ class PrismaCloudAPICWPPMixin():
                                 page_count += 1
                                 total_count = int(api_response.headers['Total-Count'])
                                 total_available_records = total_count
+                                if isinstance(result, list):
+                                    self.record_page(endpoint, limit, len(result), page_seconds, len(api_response.content))
                                 
                                 if total_count > 0:
                                     if isinstance(result, list):
@@ -515,171 +516,277 @@ class PrismaCloudAPICWPPMixin():
                         raise e
                 return results
 
-            # Concurrent pagination approach
+            # Concurrent pagination approach, via an order-preserving pager with a bounded window of pages in flight
             else:
                 print(f"🔄 Starting concurrent pagination for endpoint: {endpoint}")
-                
-                # First, get the total count to determine how many pages we need
-                initial_url = 'https://%s/%s?limit=%s&offset=0' % (self.api_compute, endpoint, limit)
+                concurrent_start_time = time.time()
+                completed_pages = 0
+                total_records_fetched = 0
                 try:
-                    print(f"📊 Fetching initial page to determine total count for endpoint: {endpoint}")
-                    
-                    # Make the initial request to get total count
-                    initial_headers = request_headers.copy()
-                    if self.token:
-                        if self.api:
-                            initial_headers['x-redlock-auth'] = self.token
-                        else:
-                            initial_headers['Authorization'] = "Bearer %s" % self.token
-                    
-                    initial_result = self._make_single_request_with_retry(
-                        action, initial_url, initial_headers, query_params, body_params_json, session, endpoint
-                    )
-                    
-                    if not initial_result:
-                        return []
-                    
-                    # Check if we have pagination headers (we need to make a separate request to get headers)
-                    try:
-                        initial_response = session.request(action, initial_url, headers=initial_headers, params=query_params,
-                                                          data=body_params_json, verify=self.verify, timeout=self.timeout)
-                        
-                        if 'Total-Count' not in initial_response.headers:
+                    pages = self.execute_compute_pages(action, endpoint, query_params=query_params, body_params=body_params, request_headers=request_headers,
+                                                       force=force, max_workers=max_workers, limit=limit, session=session)
+                    for _, total_count, page in pages:
+                        if total_count is None:
                             print("✅ Single page result - no pagination needed")
-                            return initial_result
-                        
-                        total_count = int(initial_response.headers['Total-Count'])
-                        print(f"📈 Total records found: {total_count} for endpoint: {endpoint}")
-                        
-                        if total_count <= limit:
-                            print(f"✅ All data in first page for endpoint: {endpoint} - no additional requests needed")
-                            return initial_result
-                        
-                        # Calculate all the offsets we need to fetch
-                        offsets = list(range(limit, total_count, limit))
-                        total_pages = len(offsets) + 1  # +1 for the initial page
-                        
-                        print(f"📄 Fetching {len(offsets)} additional pages concurrently (using {max_workers} threads) for endpoint: {endpoint}")
-                        
-                        # Use ThreadPoolExecutor for concurrent requests
-                        concurrent_start_time = time.time()
-                        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                            # Verify ThreadPool configuration
-                            actual_workers = self._verify_threadpool_workers(executor, max_workers=max_workers)
-                            
-                            # Submit all the concurrent requests with small delays to prevent overwhelming the API
-                            future_to_offset = {}
-                            for i, offset_val in enumerate(offsets):
-                                url = 'https://%s/%s?limit=%s&offset=%s' % (self.api_compute, endpoint, limit, offset_val)
-                                future = executor.submit(
-                                    self._make_single_request_with_retry, 
-                                    action, 
-                                    url, 
-                                    request_headers.copy(), 
-                                    query_params, 
-                                    body_params_json, 
-                                    session,
-                                    endpoint
-                                )
-                                future_to_offset[future] = offset_val
-                                
-                                # Add small delay between submissions to prevent overwhelming the API
-                                if i < len(offsets) - 1:  # Don't delay after the last request
-                                    time.sleep(0.1)  # 100ms delay between request submissions
-                            
-                            print(f"🚀 Submitted {len(future_to_offset)} concurrent requests to {actual_workers} workers for endpoint: {endpoint}")
-                            print("📊 Progress bar:")
-                            
-                            # Collect results as they complete
-                            all_results = [initial_result]  # Start with the first page
-                            completed_pages = 1
-                            # Handle different result types for record counting
-                            if isinstance(initial_result, list):
-                                total_records_fetched = len(initial_result)
-                            elif isinstance(initial_result, str):
-                                # For CSV data, count lines (excluding header)
-                                lines = initial_result.strip().split('\n')
-                                total_records_fetched = max(0, len(lines) - 1)  # Subtract header
-                            else:
-                                total_records_fetched = 1
-                            failed_requests = []
-                            
-                            for future in as_completed(future_to_offset):
-                                offset_val = future_to_offset[future]
-                                completed_pages += 1
-                                
-                                try:
-                                    result = future.result()
-                                    if result:
-                                        # Handle different result types for record counting
-                                        if isinstance(result, list):
-                                            total_records_fetched += len(result)
-                                        elif isinstance(result, str):
-                                            # For CSV data, count lines (excluding header)
-                                            lines = result.strip().split('\n')
-                                            total_records_fetched += max(0, len(lines) - 1)  # Subtract header
-                                        else:
-                                            total_records_fetched += 1
-                                        all_results.append(result)
-                                        # Update progress bar with endpoint and record information
-                                        self._print_progress_bar(
-                                            completed_pages, 
-                                            total_pages, 
-                                            concurrent_start_time, 
-                                            "Concurrent Pages",
-                                            endpoint,
-                                            total_records_fetched,
-                                            total_count
-                                        )
-                                    else:
-                                        all_results.append([])  # Empty result
-                                        self._print_progress_bar(
-                                            completed_pages, 
-                                            total_pages, 
-                                            concurrent_start_time, 
-                                            "Concurrent Pages",
-                                            endpoint,
-                                            total_records_fetched,
-                                            total_count
-                                        )
-                                except Exception as exc:
-                                    failed_requests.append((offset_val, exc))
-                                    print(f"\n❌ Error at offset {offset_val} for endpoint {endpoint}: {exc}")
-                                    self.logger.error('Request for offset %s generated an exception: %s' % (offset_val, exc))
-                                    if not force:
-                                        raise exc
-                            
-                            concurrent_total_time = time.time() - concurrent_start_time
-                            print(f"\n✅ Concurrent execution completed in {concurrent_total_time:.2f} seconds for endpoint: {endpoint}")
-                            print(f"📊 Total records fetched: {total_records_fetched}")
-                            
-                            if failed_requests:
-                                print(f"⚠️  {len(failed_requests)} requests failed out of {total_pages} total pages")
-                            
-                            print("🔄 Combining results from all pages...")
-                            
-                            # Combine all results
-                            combined_results = []
-                            for result_batch in all_results:
-                                if isinstance(result_batch, list):
-                                    combined_results.extend(result_batch)
-                                else:
-                                    combined_results.append(result_batch)
-                            
-                            print(f"✅ Successfully retrieved {len(combined_results)} total records from {total_pages} pages")
-                            return combined_results
-                    
-                    except Exception as exc:
-                        self.logger.error('Failed to get pagination headers: %s' % exc)
-                        if force:
-                            return initial_result
-                        raise exc
-                
+                            return page if page else []
+                        completed_pages += 1
+                        if isinstance(page, list):
+                            total_records_fetched += len(page)
+                            results.extend(page)
+                        elif page:
+                            total_records_fetched += 1
+                            results.append(page)
+                        self._print_progress_bar(
+                            completed_pages,
+                            max(1, math.ceil(total_count / limit)),
+                            concurrent_start_time,
+                            "Concurrent Pages",
+                            endpoint,
+                            total_records_fetched,
+                            total_count
+                        )
                 except Exception as exc:
                     self.logger.error('Concurrent execution failed: %s' % exc)
                     if not force:
                         raise exc
                     return results
+                concurrent_total_time = time.time() - concurrent_start_time
+                print(f"\n✅ Concurrent execution completed in {concurrent_total_time:.2f} seconds for endpoint: {endpoint}")
+                print(f"✅ Successfully retrieved {len(results)} total records from {completed_pages} pages")
+                return results
+
+    def _compute_page_url(self, endpoint, limit, offset):
+        if endpoint.endswith('?'):
+            separator = ''
+        elif '?' in endpoint:
+            separator = '&'
+        else:
+            separator = '?'
+        return 'https://%s/%s%slimit=%s&offset=%s' % (self.api_compute, endpoint, separator, limit, offset)
+
+    def _decode_compute_response(self, api_response, url, query_params, body_params_json):
+        if not api_response.content:
+            return None
+        if api_response.headers.get('Content-Type') == 'application/x-gzip':
+            return api_response.content
+        if api_response.headers.get('Content-Type') == 'text/csv':
+            return api_response.content.decode('utf-8')
+        try:
+            return json.loads(api_response.content)
+        except ValueError:
+            self.logger.error('JSON raised ValueError, API: (%s) with query params: (%s) and body params: (%s) parsing response: (%s)' % (
+                url, query_params, body_params_json, api_response.content))
+            raise
+
+    # Make a single request, and return a ComputeResponse, so that callers can read the status code and headers (such as 'Total-Count') with the decoded body.
+    # Example: pc_api.execute_compute_response('GET', 'api/v1/hosts?limit=50&offset=0').total_count
+
+    def execute_compute_response(self, action, endpoint, query_params=None, body_params=None, request_headers=None):
+        self.suppress_warnings_when_verify_false()
+        if body_params:
+            body_params_json = json.dumps(body_params)
+        else:
+            body_params_json = None
+        url = 'https://%s/%s' % (self.api_compute, endpoint)
+        with requests.Session() as session:
+            return self._make_single_request_with_retry(action, url, request_headers, query_params, body_params_json, session, endpoint, full_response=True)
+
+    # Return the number of records of a paginated endpoint (its 'Total-Count' header) via a request for a single record (limit=1),
+    # rather than requesting (and decoding) every page. Returns None if the endpoint does not return a 'Total-Count' header.
+    # Example: pc_api.count_compute('api/v1/defenders', query_params={'connected': True})
+
+    def count_compute(self, endpoint, query_params=None, request_headers=None, session=None):
+        self.suppress_warnings_when_verify_false()
+        url = self._compute_page_url(endpoint, 1, 0)
+        if session is not None:
+            return self._make_single_request_with_retry('GET', url, request_headers, query_params, None, session, endpoint, full_response=True, decode=False).total_count
+        with requests.Session() as session:
+            return self._make_single_request_with_retry('GET', url, request_headers, query_params, None, session, endpoint, full_response=True, decode=False).total_count
+
+    # Return the counts of several endpoints, requested concurrently.
+    # Requests are a dictionary of names to endpoints, or to (endpoint, query_params) tuples, and counts are returned by name.
+    # With force, failed counts are logged and returned as None.
+    # Example: pc_api.counts_compute({'defenders': 'api/v1/defenders', 'connected': ('api/v1/defenders', {'connected': True})})
+
+    def counts_compute(self, count_requests, force=False, max_workers=4):
+        self.token_check_compute()
+        counts = {}
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_name = {}
+            for name, count_request in count_requests.items():
+                if isinstance(count_request, (list, tuple)):
+                    endpoint, query_params = count_request
+                else:
+                    endpoint, query_params = count_request, None
+                future_to_name[executor.submit(self.count_compute, endpoint, query_params, None, session)] = name
+            for future, name in future_to_name.items():
+                try:
+                    counts[name] = future.result()
+                except Exception as exc:
+                    self.logger.error('Count request for %s generated an exception: %s' % (name, exc))
+                    if not force:
+                        raise exc
+                    counts[name] = None
+        return counts
+
+    # Yield (offset, total_count, page) for each page of a paginated endpoint, in offset order.
+    # Pages are fetched concurrently, but at most 'window' pages (Default: twice max_workers) are in flight or buffered:
+    # new pages are only requested as the consumer takes pages, so memory is bounded by the window, not the dataset.
+    # If the endpoint does not return a 'Total-Count' header, the single (unpaginated) result is yielded with a total_count of None.
+    # With force, failed pages are logged and yielded as empty pages.
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def execute_compute_pages(self, action, endpoint, query_params=None, body_params=None, request_headers=None, force=False, max_workers=4, window=None, limit=None, session=None):
+        self.suppress_warnings_when_verify_false()
+        self.token_check_compute()
+        if not limit:
+            limit = self.page_limit(endpoint)
+        if body_params:
+            body_params_json = json.dumps(body_params)
+        else:
+            body_params_json = None
+        if not window:
+            window = max_workers * 2
+        owned_session = None
+        if session is None:
+            owned_session = session = requests.Session()
+
+        def fetch_page(offset):
+            url = self._compute_page_url(endpoint, limit, offset)
+            compute_response = self._make_single_request_with_retry(action, url, request_headers, query_params, body_params_json, session, endpoint, full_response=True)
+            if isinstance(compute_response.body, list):
+                self.record_page(endpoint, limit, len(compute_response.body), compute_response.seconds, len(compute_response.content))
+            return compute_response
+
+        try:
+            # The first page is requested once, and provides both the first page of results and the total count.
+            initial_response = fetch_page(0)
+            if initial_response.total_count is None:
+                yield 0, None, initial_response.body
+                return
+            total_count = initial_response.total_count
+            yield 0, total_count, initial_response.body if initial_response.body else []
+            offsets = iter(range(limit, total_count, limit))
+            pending = deque()
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                try:
+                    def submit_next_page():
+                        offset = next(offsets, None)
+                        if offset is not None:
+                            pending.append((offset, executor.submit(fetch_page, offset)))
+                    for _ in range(window):
+                        submit_next_page()
+                    while pending:
+                        offset, future = pending.popleft()
+                        try:
+                            page = future.result().body
+                        except Exception as exc:
+                            print(f"\n❌ Error at offset {offset} for endpoint {endpoint}: {exc}")
+                            self.logger.error('Request for offset %s generated an exception: %s' % (offset, exc))
+                            if not force:
+                                raise exc
+                            page = []
+                        submit_next_page()
+                        yield offset, total_count, page if page else []
+                finally:
+                    # When the consumer stops early (or on error), do not start the pages still waiting in the window.
+                    for _, future in pending:
+                        future.cancel()
+        finally:
+            if owned_session:
+                owned_session.close()
+
+    # Yield the records of a paginated endpoint that match filters (see pc_lib_filter): predicates supported by the endpoint are compiled into query parameters,
+    # and the remaining predicates are applied to each page as it is read.
+    # Example: pc_api.execute_compute_filtered('GET', 'api/v1/defenders', [('collections', 'in', ['Production']), ('version', 'lt', '32.03')])
+
+    def execute_compute_filtered(self, action, endpoint, filters, query_params=None, max_workers=4):
+        query_params, remaining = compile_compute_filters(endpoint, filters, query_params)
+        pages = (page for _, _, page in self.execute_compute_pages(action, endpoint, query_params=query_params, max_workers=max_workers))
+        yield from filter_records(pages, remaining)
+
+    # Return the number of records of an endpoint that match filters: via the Total-Count of the query parameters when all predicates are compiled,
+    # otherwise by reading and filtering the records.
+
+    def count_compute_filtered(self, endpoint, filters, query_params=None):
+        query_params, remaining = compile_compute_filters(endpoint, filters, query_params)
+        if not remaining:
+            return self.count_compute(endpoint, query_params=query_params)
+        pages = (page for _, _, page in self.execute_compute_pages('GET', endpoint, query_params=query_params))
+        return sum(1 for _ in filter_records(pages, remaining))
+
+    # Fetch each page of a paginated endpoint (concurrently, via threads) and decode and transform it in a worker process,
+    # so that JSON decoding and CPU-bound post-processing of large responses are not limited by the GIL.
+    # The transform must be picklable (a module-level function) and should return a compact result, as results are returned to this process.
+    # Pass an existing ProcessPoolExecutor as 'process_pool' to reuse worker processes across calls.
+    # Results are combined in offset order.
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def execute_compute_offload(self, action, endpoint, transform=None, query_params=None, body_params=None, request_headers=None, force=False, max_workers=4, process_workers=None, process_pool=None, limit=None):
+        self.suppress_warnings_when_verify_false()
+        self.token_check_compute()
+        if not limit:
+            limit = self.page_limit(endpoint)
+        if body_params:
+            body_params_json = json.dumps(body_params)
+        else:
+            body_params_json = None
+        decode_page = partial(decode_and_transform, transform=transform)
+        owned_process_pool = None
+        if process_pool is None:
+            # pylint: disable=consider-using-with
+            owned_process_pool = process_pool = ProcessPoolExecutor(max_workers=process_workers)
+        try:
+            with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as thread_pool:
+                # Each raw response is released once its decode is submitted: only the Total-Count and the decode future are returned.
+                def fetch_and_submit(offset):
+                    compute_response = self._make_single_request_with_retry(action, self._compute_page_url(endpoint, limit, offset), request_headers, query_params, body_params_json, session, endpoint, full_response=True, decode=False)
+                    return compute_response.total_count, process_pool.submit(decode_page, compute_response.content)
+                try:
+                    total_count, initial_future = fetch_and_submit(0)
+                # pylint: disable=broad-except
+                except Exception as ex:
+                    self.logger.error('Offloaded request for %s generated an exception: %s' % (endpoint, ex))
+                    if not force:
+                        raise ex
+                    return []
+                transformed_pages = []
+                try:
+                    transformed_pages.append(initial_future.result())
+                # pylint: disable=broad-except
+                except Exception as ex:
+                    self.logger.error('Offloaded request for %s generated an exception: %s' % (endpoint, ex))
+                    if not force:
+                        raise ex
+                # Pages are requested within a window of 'max_workers * 2' pages ahead of the page being decoded, so memory is bounded by the window.
+                offsets = iter(range(limit, total_count or 0, limit))
+                pending = deque()
+                def submit_next_page():
+                    offset = next(offsets, None)
+                    if offset is not None:
+                        pending.append(thread_pool.submit(fetch_and_submit, offset))
+                try:
+                    for _ in range(max_workers * 2):
+                        submit_next_page()
+                    while pending:
+                        page_future = pending.popleft()
+                        # One page is requested per page taken from the window, whether or not it succeeds.
+                        submit_next_page()
+                        try:
+                            _, decode_future = page_future.result()
+                            transformed_pages.append(decode_future.result())
+                        # pylint: disable=broad-except
+                        except Exception as ex:
+                            self.logger.error('Offloaded request for %s generated an exception: %s' % (endpoint, ex))
+                            if not force:
+                                raise ex
+                finally:
+                    for page_future in pending:
+                        page_future.cancel()
+            return combine_transformed_pages(transformed_pages)
+        finally:
+            if owned_process_pool:
+                owned_process_pool.shutdown()
 
     # The Compute API setting is optional.
 
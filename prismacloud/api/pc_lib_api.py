@@ -1,12 +1,15 @@
 """ Prisma Cloud API Class """
 
 import logging
-from threading import Lock
+import os
+from threading import Lock, RLock
 
 from .cspm import PrismaCloudAPICSPM
 from .cwpp import PrismaCloudAPICWPP
 from .pccs import PrismaCloudAPIPCCS
 
+from .pc_lib_cache   import ResultCache
+from .pc_lib_tuner   import shared_page_size_tuner
 from .pc_lib_utility import PrismaCloudUtility
 from .version import version  # Import version from your version.py
 
@@ -14,17 +17,30 @@ from .version import version  # Import version from your version.py
 
 # Prisma Cloud API library.
 
+# Guards adding the error log file handler to the shared module logger.
+logger_lock = Lock()
+
 # pylint: disable=too-few-public-methods
 class CallCounter:
     """ Decorator to determine number of calls for a method """
     def __init__(self, method):
         self.method = method
         self.counter = 0
+        self.counter_lock = Lock()
 
     def __call__(self, *args, **kwargs):
-        self.counter += 1
+        with self.counter_lock:
+            self.counter += 1
         return self.method(*args, **kwargs)
 
+# Thread Safety:
+#
+# After configure(), an instance may be shared by many threads, and its execute methods called concurrently.
+# - Request headers are constructed per request: dictionaries passed as 'request_headers' are never modified.
+# - The API token is checked, refreshed, and read under '_token_lock', so only one thread logs in or extends it.
+# - Circuit breaker and rate limiting state is updated under '_state_lock', and rate limit waits occur outside the lock.
+# Calling configure() while other threads are executing requests is not supported.
+
 # pylint: disable=too-many-instance-attributes
 class PrismaCloudAPI(PrismaCloudAPICSPM, PrismaCloudAPICWPP, PrismaCloudAPIPCCS):
     """ Prisma Cloud API Class """
@@ -47,13 +63,21 @@ class PrismaCloudAPI(PrismaCloudAPICSPM, PrismaCloudAPICWPP, PrismaCloudAPIPCCS)
         self.retry_number       = 6
         self.max_workers        = 8
         #
+        self.request_compression_threshold = None # Optionally, gzip request bodies larger than this number of bytes
+        self.transfer_stats                = {}
+        self.page_limits                   = {}   # Page size by endpoint (or endpoint family)
+        self.page_size_tuner               = None # Optionally, learn page sizes per endpoint
+        self.rql_cache                     = None # Optionally, cache RQL search results
+        self.rql_cache_bucket              = 60   # Relative time ranges are rounded into buckets of this number of seconds
+        #
         self.error_log          = 'error.log'
         self.logger             = None
         # Set User-Agent
         default_user_agent = f"PrismaCloudAPI/{version}"  # Dynamically set default User-Agent
         self.user_agent = default_user_agent
-        # Initialize thread lock for concurrent operations
-        self._token_lock = Lock()
+        # Initialize (reentrant) thread lock for concurrent operations
+        self._token_lock = RLock()
+        self._transfer_stats_lock = Lock()
         
         # Initialize enhanced error handling for CWPP module
         self._initialize_enhanced_error_handling()
@@ -68,14 +92,28 @@ class PrismaCloudAPI(PrismaCloudAPICSPM, PrismaCloudAPICWPP, PrismaCloudAPIPCCS)
         self.verify      = settings.get('verify', True)
         self.debug       = settings.get('debug', False)
         self.user_agent  = settings.get('user_agent', self.user_agent)
+        self.request_compression_threshold = settings.get('request_compression_threshold', self.request_compression_threshold)
+        self.page_limits = settings.get('page_limits', self.page_limits)
+        self.error_log   = settings.get('error_log', self.error_log)
+        if settings.get('page_size_tuning'):
+            self.page_size_tuner = shared_page_size_tuner(settings.get('page_size_tuning_file', os.path.join(PrismaCloudUtility.CONFIG_DIRECTORY, 'page_limits.json')))
+        if settings.get('rql_cache_ttl'):
+            self.rql_cache = ResultCache(ttl=settings['rql_cache_ttl'], max_entries=settings.get('rql_cache_max_entries', 256), max_items=settings.get('rql_cache_max_items'))
+            self.rql_cache_bucket = settings.get('rql_cache_bucket', self.rql_cache_bucket)
         #
         # self.logger      = settings['logger']
-        self.logger = logging.getLogger(__name__)
-        formatter   = logging.Formatter(fmt='%(asctime)s: %(levelname)s: %(message)s', datefmt='%Y-%m-%d %I:%M:%S %p')
-        filehandler = logging.FileHandler(self.error_log, delay=True)
-        filehandler.setLevel(level=logging.DEBUG)
-        filehandler.setFormatter(formatter)
-        self.logger.addHandler(filehandler)
+        # Add one error log file handler to the shared module logger, no matter how many times (or instances) are configured,
+        # and count errors per instance, via an adapter.
+        module_logger = logging.getLogger(__name__)
+        with logger_lock:
+            error_log_path = os.path.abspath(self.error_log)
+            if not any(isinstance(handler, logging.FileHandler) and handler.baseFilename == error_log_path for handler in module_logger.handlers):
+                formatter   = logging.Formatter(fmt='%(asctime)s: %(levelname)s: %(message)s', datefmt='%Y-%m-%d %I:%M:%S %p')
+                filehandler = logging.FileHandler(self.error_log, delay=True)
+                filehandler.setLevel(level=logging.DEBUG)
+                filehandler.setFormatter(formatter)
+                module_logger.addHandler(filehandler)
+        self.logger = logging.LoggerAdapter(module_logger, {})
         self.logger.error = CallCounter(self.logger.error)
         #
         url = PrismaCloudUtility.normalize_url(settings.get('url', ''))
@@ -0,0 +1,72 @@
+""" Prisma Cloud Result Cache Class """
+
+import time
+
+from collections import OrderedDict
+from threading import Lock
+
+# --Description-- #
+
+# A thread-safe, in-memory cache of API results, with a time to live (in seconds),
+# and least-recently-used eviction when it exceeds 'max_entries' results, or 'max_items' items (the total length of list results).
+
+class ResultCache():
+    """ Prisma Cloud Result Cache Class """
+
+    def __init__(self, ttl=300, max_entries=256, max_items=None):
+        self.ttl         = ttl
+        self.max_entries = max_entries
+        self.max_items   = max_items
+        self.entries     = OrderedDict()
+        self.items       = 0
+        self.hits        = 0
+        self.misses      = 0
+        self._lock       = Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return 'Result Cache:\n  Entries: (%s)\n  Items: (%s)\n  Hits: (%s)\n  Misses: (%s)' % (len(self.entries), self.items, self.hits, self.misses)
+
+    @classmethod
+    def result_items(cls, result):
+        return len(result) if isinstance(result, list) else 1
+
+    # Return a cached result, or None.
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, result = entry
+            if expires < time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def set(self, key, result):
+        result_items = self.result_items(result)
+        if self.max_items is not None and result_items > self.max_items:
+            return
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.time() + self.ttl, result)
+            self.items += result_items
+            while self.entries and (len(self.entries) > self.max_entries or (self.max_items is not None and self.items > self.max_items)):
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        _, result = self.entries.pop(key)
+        self.items -= self.result_items(result)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.items = 0
@@ -0,0 +1,144 @@
+""" Prisma Cloud Checkpoint Store Class """
+
+import hashlib
+import json
+import os
+
+from threading import Lock
+
+from .pc_lib_time_range import bisect_records, format_timestamp, ordered_record_time, parse_timestamp
+
+# --Description-- #
+
+# A durable store of high-water marks (checkpoints), by collection (for example: 'audits/incidents' or 'logs/console'),
+# for incremental collection of time-ordered records.
+#
+# A checkpoint is the time of the newest record collected, and the ids (and times) of the records collected within 'overlap' seconds of that time.
+# Collection requests records from the checkpoint time minus the overlap (to include records that are indexed late, or that share a timestamp),
+# and skips records older than that, or with an id in the checkpoint.
+#
+# Checkpoints are committed (written to a temporary file, flushed, and renamed over the store) only after records have been processed,
+# so a crash before the commit results in records being collected again (rather than a gap).
+
+class CheckpointStore():
+    """ Prisma Cloud Checkpoint Store Class """
+
+    def __init__(self, file_name):
+        self.file_name   = file_name
+        self.checkpoints = {}
+        self._lock       = Lock()
+        self.load()
+
+    def __repr__(self):
+        return 'Checkpoint Store:\n  File: (%s)\n  Checkpoints: (%s)' % (self.file_name, ', '.join('%s: %s' % (key, checkpoint['time']) for key, checkpoint in sorted(self.checkpoints.items())))
+
+    def get(self, key):
+        with self._lock:
+            return self.checkpoints.get(key)
+
+    def load(self):
+        try:
+            with open(self.file_name, 'r') as checkpoint_file:
+                checkpoints = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self.checkpoints = checkpoints
+
+    # Commit a checkpoint (or None, to keep the existing checkpoint, when no records were collected), and save the store.
+
+    def commit(self, key, checkpoint):
+        if not checkpoint:
+            return
+        with self._lock:
+            self.checkpoints[key] = checkpoint
+            self.save()
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self.checkpoints = {}
+            else:
+                self.checkpoints.pop(key, None)
+            self.save()
+
+    # Write to a temporary file and rename it, so that a crash while saving does not corrupt the store.
+
+    def save(self):
+        directory = os.path.dirname(self.file_name)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        temporary_file_name = '%s.%s' % (self.file_name, os.getpid())
+        with open(temporary_file_name, 'w') as checkpoint_file:
+            json.dump(self.checkpoints, checkpoint_file, indent=4)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_file_name, self.file_name)
+
+# Return the id of a record: its '_id', or a hash of the record.
+
+def record_id(record):
+    if record.get('_id'):
+        return str(record['_id'])
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+# Return the records after a checkpoint (sorted by time), and the checkpoint to commit after processing those records (or None).
+# Records without a (parsable) time are returned, but do not affect the checkpoint.
+
+def records_after_checkpoint(records, checkpoint=None, overlap=60, time_field='time'):
+    if checkpoint:
+        start = checkpoint['epoch'] - overlap
+        checkpoint_ids = dict(checkpoint['ids'])
+    else:
+        start = None
+        checkpoint_ids = {}
+    timed_records = []
+    untimed_records = []
+    for record in records or []:
+        epoch = parse_timestamp(record.get(time_field))
+        if epoch is None:
+            untimed_records.append(record)
+            continue
+        if start is not None and epoch < start:
+            continue
+        this_record_id = record_id(record)
+        if this_record_id in checkpoint_ids:
+            continue
+        timed_records.append((epoch, this_record_id, record))
+    timed_records.sort(key=lambda timed_record: timed_record[0])
+    new_checkpoint = None
+    if timed_records:
+        newest = max(timed_records[-1][0], checkpoint['epoch'] if checkpoint else timed_records[-1][0])
+        # Retain the ids (from the previous checkpoint, and from these records) of records within the overlap of the newest record.
+        ids = dict(checkpoint_ids)
+        ids.update((this_record_id, epoch) for epoch, this_record_id, _ in timed_records)
+        ids = sorted([this_record_id, epoch] for this_record_id, epoch in ids.items() if epoch >= newest - overlap)
+        new_checkpoint = {'time': format_timestamp(newest), 'epoch': newest, 'ids': ids}
+    return [record for _, _, record in timed_records] + untimed_records, new_checkpoint
+
+# Return the records after a checkpoint, and the checkpoint to commit after processing those records (or None), for records already sorted by time (oldest first),
+# for example: console logs. Via a binary search: only the records probed, and the records within the overlap, are parsed.
+
+def ordered_records_after_checkpoint(records, checkpoint=None, overlap=60, time_field='time'):
+    records = records or []
+    if checkpoint:
+        checkpoint_ids = dict(checkpoint['ids'])
+        low = bisect_records(records, checkpoint['epoch'] - overlap, time_field)
+        # Records within the overlap of the checkpoint may have been collected.
+        high = bisect_records(records, checkpoint['epoch'], time_field, after=True)
+        new_records = [record for record in records[low:high] if record_id(record) not in checkpoint_ids] + records[high:]
+    else:
+        checkpoint_ids = {}
+        new_records = list(records)
+    newest = ordered_record_time(new_records, len(new_records) - 1, time_field)
+    if newest is None:
+        return new_records, None
+    if checkpoint:
+        newest = max(newest, checkpoint['epoch'])
+    ids = dict(checkpoint_ids)
+    for record in new_records[bisect_records(new_records, newest - overlap, time_field):]:
+        epoch = parse_timestamp(record.get(time_field))
+        if epoch is not None:
+            ids[record_id(record)] = epoch
+    ids = sorted([this_record_id, epoch] for this_record_id, epoch in ids.items() if epoch >= newest - overlap)
+    return new_records, {'time': format_timestamp(newest), 'epoch': newest, 'ids': ids}
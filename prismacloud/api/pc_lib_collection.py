@@ -0,0 +1,121 @@
+""" Prisma Cloud Indexed Collection Class """
+
+# --Description-- #
+
+# A list of objects (for example: users, roles, policies, or account groups, as returned by the API) with hash indexes, by field,
+# built once (on the first lookup of a field) and reused, replacing a linear scan per lookup with a dictionary lookup.
+#
+# Indexes may be case insensitive (string values are indexed in lower case),
+# or multi-value (each value of a list field is indexed, for example: 'accountGroupIds' of a role).
+# Objects with a value that cannot be indexed (for example: a dictionary) are found via a linear scan.
+#
+# An IndexedCollection is a list: indexes are rebuilt after the list is modified (but not after an object in the list is modified: call reindex()).
+
+class IndexedCollection(list):
+    """ Prisma Cloud Indexed Collection Class """
+
+    def __init__(self, items=None, indexes=None):
+        super().__init__(items or [])
+        self._indexes = {}
+        for index in indexes or []:
+            if isinstance(index, str):
+                index = (index,)
+            self.field_index(*index)
+
+    def __repr__(self):
+        return 'Indexed Collection:\n  Items: (%s)\n  Indexes: (%s)' % (len(self), ', '.join(str(index) for index in self._indexes))
+
+    # Return the index of a field: a dictionary of each value to the list of objects with that value (in list order), and the list of objects with a value that cannot be indexed.
+
+    def field_index(self, field, lower=False, multi_value=False):
+        key = (field, lower, multi_value)
+        if key not in self._indexes:
+            index = {}
+            unindexed = []
+            for item in self:
+                if not isinstance(item, dict) or field not in item:
+                    continue
+                values = item[field]
+                if not (multi_value and isinstance(values, (list, tuple, set))):
+                    values = [values]
+                for value in values:
+                    if lower and isinstance(value, str):
+                        value = value.lower()
+                    try:
+                        items = index.setdefault(value, [])
+                    except TypeError:
+                        unindexed.append(item)
+                        continue
+                    if not items or items[-1] is not item:
+                        items.append(item)
+            self._indexes[key] = (index, unindexed)
+        return self._indexes[key]
+
+    def reindex(self):
+        self._indexes = {}
+
+    # Return all objects with a field with a certain value (in list order).
+
+    def find_all(self, field, value, lower=False, multi_value=False):
+        index, unindexed = self.field_index(field, lower, multi_value)
+        if lower and isinstance(value, str):
+            value = value.lower()
+        try:
+            items = index.get(value, [])
+        except TypeError:
+            items = []
+        if unindexed:
+            # Merge the objects found via a linear scan (in list order).
+            item_ids = set(id(item) for item in items)
+            item_ids.update(id(item) for item in unindexed if self.item_matches(item, field, value, lower, multi_value))
+            return [item for item in self if id(item) in item_ids]
+        return list(items)
+
+    # Return the first object with a field with a certain value, or None.
+
+    def find(self, field, value, lower=False, multi_value=False):
+        items = self.find_all(field, value, lower, multi_value)
+        return items[0] if items else None
+
+    # Return another field value from the first object with a field with a certain value, or None.
+
+    def find_value(self, field, value, field_to_return, lower=False, multi_value=False):
+        item = self.find(field, value, lower, multi_value)
+        return item[field_to_return] if item else None
+
+    @classmethod
+    def item_matches(cls, item, field, value, lower=False, multi_value=False):
+        values = item[field]
+        if not (multi_value and isinstance(values, (list, tuple, set))):
+            values = [values]
+        for this_value in values:
+            if lower and isinstance(this_value, str):
+                this_value = this_value.lower()
+            if this_value == value:
+                return True
+        return False
+
+    # Modifying the list invalidates the indexes.
+
+    # pylint: disable=no-self-argument
+    def _modified(method):
+        def modified_method(self, *args, **kwargs):
+            self._indexes = {}
+            return method(self, *args, **kwargs)
+        modified_method.__name__ = method.__name__
+        return modified_method
+
+    append      = _modified(list.append)
+    extend      = _modified(list.extend)
+    insert      = _modified(list.insert)
+    remove      = _modified(list.remove)
+    pop         = _modified(list.pop)
+    clear       = _modified(list.clear)
+    sort        = _modified(list.sort)
+    reverse     = _modified(list.reverse)
+    __setitem__ = _modified(list.__setitem__)
+    __delitem__ = _modified(list.__delitem__)
+    __iadd__    = _modified(list.__iadd__)
+    __imul__    = _modified(list.__imul__)
+
+    del _modified
@@ -0,0 +1,257 @@
+""" Prisma Cloud Columnar Export Helpers """
+
+import json
+import os
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from .pc_lib_join import field_value
+from .pc_lib_time_range import parse_timestamp
+
+# --Description-- #
+
+# Columnar (Apache Arrow and Parquet) export of alerts, resources (config search results), images, hosts, containers, defenders, and audits.
+#
+# Records are flattened into a schema (a list of columns: name, dotted path of the field in each record, and type),
+# and encoded into Arrow record batches of 'batch_rows' records as pages are read, so that memory is bounded by the batch, not the dataset.
+# Low-cardinality columns (for example: severity, or cloud type) are dictionary-encoded.
+# Tables are returned as Arrow tables, which convert to pandas (table.to_pandas()) or are queried by DuckDB (duckdb.sql('SELECT ... FROM table')) without copying.
+#
+# Column types: 'string', 'dictionary' (a dictionary-encoded string), 'int64', 'double', 'bool',
+# 'timestamp' (an RFC 3339 string, or epoch milliseconds), and 'json' (a list or object, as a JSON string).
+#
+# Requires PyArrow (an optional dependency): pip install prismacloud-api[columnar]
+
+COLUMNAR_SCHEMAS = {
+    'alerts': [
+        ('id',             'id',                    'string'),
+        ('status',         'status',                'dictionary'),
+        ('alert_time',     'alertTime',             'timestamp'),
+        ('policy_id',      'policy.policyId',       'string'),
+        ('policy_name',    'policy.name',           'dictionary'),
+        ('policy_type',    'policy.policyType',     'dictionary'),
+        ('severity',       'policy.severity',       'dictionary'),
+        ('cloud_type',     'resource.cloudType',    'dictionary'),
+        ('account_id',     'resource.accountId',    'dictionary'),
+        ('account_name',   'resource.account',      'dictionary'),
+        ('region',         'resource.regionId',     'dictionary'),
+        ('resource_type',  'resource.resourceType', 'dictionary'),
+        ('resource_id',    'resource.id',           'string'),
+        ('resource_name',  'resource.name',         'string'),
+    ],
+    'resources': [
+        ('id',             'id',                    'string'),
+        ('name',           'name',                  'string'),
+        ('cloud_type',     'cloudType',             'dictionary'),
+        ('account_id',     'accountId',             'dictionary'),
+        ('account_name',   'accountName',           'dictionary'),
+        ('region',         'regionId',              'dictionary'),
+        ('service',        'service',               'dictionary'),
+        ('resource_type',  'resourceType',          'dictionary'),
+        ('asset_id',       'assetId',               'string'),
+        ('inserted',       'insertTs',              'timestamp'),
+    ],
+    'images': [
+        ('id',                       '_id',                    'string'),
+        ('registry',                 'repoTag.registry',       'dictionary'),
+        ('repo',                     'repoTag.repo',           'dictionary'),
+        ('tag',                      'repoTag.tag',            'string'),
+        ('distro',                   'distro',                 'dictionary'),
+        ('vulnerabilities_count',    'vulnerabilitiesCount',   'int64'),
+        ('compliance_issues_count',  'complianceIssuesCount',  'int64'),
+        ('risk_score',               'vulnerabilityRiskScore', 'double'),
+        ('scan_time',                'scanTime',               'timestamp'),
+        ('collections',              'collections',            'json'),
+        ('clusters',                 'clusters',               'json'),
+    ],
+    'hosts': [
+        ('id',                       '_id',                    'string'),
+        ('hostname',                 'hostname',               'string'),
+        ('distro',                   'distro',                 'dictionary'),
+        ('cloud_provider',           'cloudMetadata.provider', 'dictionary'),
+        ('cloud_region',             'cloudMetadata.region',   'dictionary'),
+        ('cloud_account_id',         'cloudMetadata.accountID', 'dictionary'),
+        ('vulnerabilities_count',    'vulnerabilitiesCount',   'int64'),
+        ('compliance_issues_count',  'complianceIssuesCount',  'int64'),
+        ('risk_score',               'vulnerabilityRiskScore', 'double'),
+        ('scan_time',                'scanTime',               'timestamp'),
+        ('collections',              'collections',            'json'),
+        ('clusters',                 'clusters',               'json'),
+    ],
+    'containers': [
+        ('id',             '_id',                         'string'),
+        ('hostname',       'hostname',                    'string'),
+        ('name',           'info.name',                   'string'),
+        ('image_name',     'info.imageName',              'dictionary'),
+        ('image_id',       'info.imageID',                'dictionary'),
+        ('namespace',      'info.namespace',              'dictionary'),
+        ('cluster',        'info.cluster',                'dictionary'),
+        ('cloud_provider', 'info.cloudMetadata.provider', 'dictionary'),
+        ('cloud_region',   'info.cloudMetadata.region',   'dictionary'),
+        ('scan_time',      'scanTime',                    'timestamp'),
+        ('collections',    'collections',                 'json'),
+    ],
+    'defenders': [
+        ('hostname',       'hostname',               'string'),
+        ('version',        'version',                'dictionary'),
+        ('type',           'type',                   'dictionary'),
+        ('category',       'category',               'dictionary'),
+        ('connected',      'connected',              'bool'),
+        ('cluster',        'cluster',                'dictionary'),
+        ('cloud_provider', 'cloudMetadata.provider', 'dictionary'),
+        ('cloud_region',   'cloudMetadata.region',   'dictionary'),
+        ('last_modified',  'lastModified',           'timestamp'),
+        ('collections',    'collections',            'json'),
+    ],
+    'audits': [
+        ('id',             '_id',            'string'),
+        ('time',           'time',           'timestamp'),
+        ('type',           'type',           'dictionary'),
+        ('hostname',       'hostname',       'dictionary'),
+        ('container_name', 'containerName',  'string'),
+        ('image_name',     'imageName',      'dictionary'),
+        ('rule_name',      'ruleName',       'dictionary'),
+        ('attack_type',    'attackType',     'dictionary'),
+        ('effect',         'effect',         'dictionary'),
+        ('severity',       'severity',       'dictionary'),
+        ('message',        'msg',            'string'),
+        ('collections',    'collections',    'json'),
+    ],
+}
+
+def require_pyarrow():
+    if pyarrow is None:
+        raise ImportError('Columnar export requires PyArrow: pip install prismacloud-api[columnar]')
+
+# Return a schema (a list of (name, path, type) columns) from a dataset name, or a list of columns or paths (of 'string' columns).
+
+def columnar_schema(schema):
+    if isinstance(schema, str):
+        if schema not in COLUMNAR_SCHEMAS:
+            raise ValueError('Unknown schema: %s (Expected one of: %s)' % (schema, ', '.join(COLUMNAR_SCHEMAS)))
+        return COLUMNAR_SCHEMAS[schema]
+    return [(column, column, 'string') if isinstance(column, str) else tuple(column) for column in schema]
+
+def arrow_type(column_type):
+    require_pyarrow()
+    return {
+        'string':     pyarrow.string(),
+        'dictionary': pyarrow.dictionary(pyarrow.int32(), pyarrow.string()),
+        'int64':      pyarrow.int64(),
+        'double':     pyarrow.float64(),
+        'bool':       pyarrow.bool_(),
+        'timestamp':  pyarrow.timestamp('ms', tz='UTC'),
+        'json':       pyarrow.string(),
+    }[column_type]
+
+def arrow_schema(schema):
+    return pyarrow.schema([(name, arrow_type(column_type)) for name, _, column_type in columnar_schema(schema)])
+
+def column_value(value, column_type):
+    if value is None:
+        return None
+    if column_type in ('string', 'dictionary'):
+        return value if isinstance(value, str) else str(value)
+    if column_type == 'json':
+        return json.dumps(value, separators=(',', ':'))
+    if column_type == 'timestamp':
+        if isinstance(value, str):
+            epoch_seconds = parse_timestamp(value)
+            return int(epoch_seconds * 1000) if epoch_seconds is not None else None
+        return int(value)
+    try:
+        return {'int64': int, 'double': float, 'bool': bool}[column_type](value)
+    except (TypeError, ValueError):
+        return None
+
+# Return a record batch of records, flattened column by column.
+
+def record_batch(records, schema):
+    schema = columnar_schema(schema)
+    arrays = []
+    for _, path, column_type in schema:
+        values = [column_value(field_value(record, path), column_type) for record in records]
+        if column_type == 'dictionary':
+            arrays.append(pyarrow.array(values, type=pyarrow.string()).dictionary_encode())
+        else:
+            arrays.append(pyarrow.array(values, type=arrow_type(column_type)))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=arrow_schema(schema))
+
+# Yield record batches of 'batch_rows' records from pages (lists) of records, or from records.
+
+def record_batches(pages, schema, batch_rows=10000):
+    require_pyarrow()
+    rows = []
+    for page in pages:
+        if isinstance(page, list):
+            rows.extend(page)
+        else:
+            rows.append(page)
+        # Cut the batches of the rows, then keep (copy) the remaining rows once per page.
+        start = 0
+        while len(rows) - start >= batch_rows:
+            yield record_batch(rows[start:start + batch_rows], schema)
+            start += batch_rows
+        if start:
+            rows = rows[start:]
+    if rows:
+        yield record_batch(rows, schema)
+
+# Return an Arrow table of pages (lists) of records, or of records.
+
+def columnar_table(pages, schema, batch_rows=10000):
+    require_pyarrow()
+    return pyarrow.Table.from_batches(list(record_batches(pages, schema, batch_rows)), schema=arrow_schema(schema))
+
+# Yield pages of records of a dataset, as they are read:
+#   alerts:     alert_v2_list_read_stream(query_params, body_params)
+#   resources:  a config search (search_params: for example, {'query': "config from cloud.resource where ...", 'timeRange': ...})
+#   images, hosts, containers, defenders, and audits (of 'audit_type'): execute_compute_pages(query_params)
+
+# pylint: disable=too-many-arguments
+def dataset_pages(pc_api, dataset, query_params=None, body_params=None, search_params=None, audit_type='incidents', max_workers=4):
+    compute_endpoints = {
+        'images':     'api/v1/images',
+        'hosts':      'api/v1/hosts',
+        'containers': 'api/v1/containers',
+        'defenders':  'api/v1/defenders',
+        'audits':     'api/v1/audits/%s' % audit_type,
+    }
+    if dataset == 'alerts':
+        yield from pc_api.alert_v2_list_read_stream(query_params=query_params, body_params=body_params)
+    elif dataset == 'resources':
+        if not search_params:
+            raise ValueError("The 'resources' dataset requires search_params (for example: {'query': \"config from cloud.resource where ...\"})")
+        yield from pc_api.search_read_pages('search/config', 'search/config/page', search_params, resource_json=False)
+    elif dataset in compute_endpoints:
+        for _, _, page in pc_api.execute_compute_pages('GET', compute_endpoints[dataset], query_params=query_params, max_workers=max_workers):
+            yield page
+    else:
+        raise ValueError('Unknown dataset: %s (Expected one of: alerts, resources, %s)' % (dataset, ', '.join(compute_endpoints)))
+
+# Write pages (lists) of records, or records, to a Parquet file (via a temporary file, renamed when complete). Returns the number of rows written.
+
+def write_parquet(pages, file_name, schema, batch_rows=10000, compression='zstd'):
+    require_pyarrow()
+    rows = 0
+    temporary_file_name = '%s.%s' % (file_name, os.getpid())
+    dictionary_columns = [name for name, _, column_type in columnar_schema(schema) if column_type == 'dictionary']
+    try:
+        with pyarrow.parquet.ParquetWriter(temporary_file_name, arrow_schema(schema), compression=compression, use_dictionary=dictionary_columns) as parquet_writer:
+            for batch in record_batches(pages, schema, batch_rows):
+                parquet_writer.write_batch(batch)
+                rows += batch.num_rows
+        os.replace(temporary_file_name, file_name)
+    finally:
+        if os.path.exists(temporary_file_name):
+            os.remove(temporary_file_name)
+    return rows
+
+# Export a dataset (see dataset_pages()) to a Parquet file, with its schema (Default: COLUMNAR_SCHEMAS[dataset]). Returns the number of rows written.
+
+def export_parquet(pc_api, dataset, file_name, schema=None, batch_rows=10000, compression='zstd', **dataset_params):
+    return write_parquet(dataset_pages(pc_api, dataset, **dataset_params), file_name, schema or dataset, batch_rows, compression)
@@ -0,0 +1,191 @@
+""" Prisma Cloud Filter Helpers """
+
+from datetime import datetime, timezone
+
+from .pc_lib_join import field_value
+from .pc_lib_packages import compare_versions
+from .pc_lib_time_range import format_timestamp, parse_timestamp
+
+# --Description-- #
+
+# Filters of Compute list endpoints: predicates are compiled into the query parameters that each endpoint supports (so that the Console filters results),
+# and the remaining predicates are applied to each record as pages are read.
+#
+# Filters are a list of (field, operator, value) predicates (all of which must match), or a dictionary of field to value (or to a list of values, for 'in'),
+# where field is a field (or a dotted path of nested fields) of each record. For example:
+#
+#     [('collections', 'in', ['Production']), ('connected', 'eq', True), ('version', 'lt', '32.03')]
+#     {'hostname': 'host-1', 'clusters': ['cluster-1', 'cluster-2']}
+#
+# Operators: eq, ne, in, contains, startswith, lt, le, gt, ge. Predicates of a list field (for example: 'collections') match any value in the list.
+# 'eq', 'ne', and 'in' match values exactly, while 'contains' and 'startswith' match strings case-insensitively (as the 'search' query parameter does).
+# Comparisons compare numbers as numbers, timestamps as times, and other strings as versions.
+
+FILTER_OPERATORS = ['eq', 'ne', 'in', 'contains', 'startswith', 'lt', 'le', 'gt', 'ge']
+
+def filter_param(param, operators=('eq', 'in'), exact=True):
+    return {operator: param for operator in operators}, exact
+
+# The query parameters supported by each endpoint: {field: ({operator: query parameter}, exact)}.
+# Predicates compiled into an exact query parameter are not applied to records (for example: 'hostname' of images, which do not have a 'hostname' field).
+
+COMPUTE_FILTER_PARAMS = {
+    'api/v1/defenders': {
+        'hostname':       filter_param('hostname'),
+        'connected':      filter_param('connected', ['eq']),
+        'cluster':        filter_param('cluster'),
+        'type':           filter_param('type'),
+        'collections':    filter_param('collections'),
+    },
+    'api/v1/hosts': {
+        'hostname':       filter_param('hostname'),
+        'distro':         filter_param('distro'),
+        'clusters':       filter_param('clusters'),
+        'collections':    filter_param('collections'),
+    },
+    'api/v1/containers': {
+        'hostname':       filter_param('hostname'),
+        'info.imageID':   filter_param('imageId', ['eq']),
+        'info.imageName': filter_param('image'),
+        'info.namespace': filter_param('namespaces'),
+        'info.cluster':   filter_param('clusters'),
+        'collections':    filter_param('collections'),
+    },
+    'api/v1/images': {
+        '_id':            filter_param('id'),
+        'hostname':       filter_param('hostname'),
+        'clusters':       filter_param('clusters'),
+        'collections':    filter_param('collections'),
+    },
+    'api/v1/audits': {
+        'time':           ({'ge': 'from', 'le': 'to'}, False),
+        'hostname':       filter_param('hostname'),
+        'collections':    filter_param('collections'),
+    },
+}
+
+# Query parameters of times: values (RFC 3339 strings, epoch seconds, or datetimes) are sent (and compared) as RFC 3339 timestamps.
+
+TIME_PARAMS = ['from', 'to']
+
+# Endpoints with a 'search' (a substring search of many fields) query parameter: one 'contains' predicate is compiled into it, and also applied to records.
+
+SEARCH_ENDPOINTS = ['api/v1/defenders', 'api/v1/hosts', 'api/v1/containers', 'api/v1/images']
+
+# Return filters as a list of (field, operator, value) predicates.
+
+def normalize_filters(filters):
+    if not filters:
+        return []
+    if isinstance(filters, dict):
+        filters = [(field, 'in' if isinstance(value, (list, tuple, set)) else 'eq', value) for field, value in filters.items()]
+    predicates = []
+    for field, operator, value in filters:
+        if operator not in FILTER_OPERATORS:
+            raise ValueError('Unknown filter operator: %s (Expected one of: %s)' % (operator, ', '.join(FILTER_OPERATORS)))
+        if operator == 'in':
+            value = list(value)
+        predicates.append((field, operator, value))
+    return predicates
+
+def time_value(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return format_timestamp(value.timestamp())
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return format_timestamp(value)
+    if isinstance(value, str) and parse_timestamp(value) is not None:
+        return format_timestamp(parse_timestamp(value))
+    raise ValueError('Time filter values are RFC 3339 strings, epoch seconds, or datetimes: %s' % (value,))
+
+def query_param_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, list):
+        return ','.join(query_param_value(this_value) for this_value in value)
+    return str(value)
+
+# Return the endpoint of the query parameters of a Compute endpoint (for example: 'api/v1/audits/incidents' is 'api/v1/audits').
+
+def filter_endpoint(endpoint):
+    endpoint = endpoint.split('?')[0].strip('/')
+    if endpoint.startswith('api/v1/audits/'):
+        return 'api/v1/audits'
+    return endpoint
+
+# Compile filters into (query parameters, the remaining predicates to apply to records) for a Compute endpoint.
+# Query parameters (if specified) are included, and are not replaced: predicates of a query parameter already specified are applied to records.
+
+def compile_compute_filters(endpoint, filters, query_params=None):
+    endpoint = filter_endpoint(endpoint)
+    endpoint_params = COMPUTE_FILTER_PARAMS.get(endpoint, {})
+    query_params = dict(query_params or {})
+    remaining = []
+    for field, operator, value in normalize_filters(filters):
+        params, exact = endpoint_params.get(field, ({}, False))
+        param = params.get(operator)
+        # Each query parameter is compiled once, and an empty 'in' matches nothing, so it is applied to records.
+        # Comparisons of a time field are compared (and sent) as RFC 3339 timestamps.
+        if operator in ('lt', 'le', 'gt', 'ge') and any(time_param in TIME_PARAMS for time_param in params.values()):
+            value = time_value(value)
+        if param and param not in query_params and (operator != 'in' or value):
+            query_params[param] = query_param_value(value)
+            if not exact:
+                remaining.append((field, operator, value))
+            continue
+        if operator == 'contains' and endpoint in SEARCH_ENDPOINTS and 'search' not in query_params:
+            query_params['search'] = str(value)
+        remaining.append((field, operator, value))
+    return query_params, remaining
+
+def compare_values(value_a, value_b):
+    if isinstance(value_a, (int, float)) and isinstance(value_b, (int, float)):
+        return (value_a > value_b) - (value_a < value_b)
+    value_a, value_b = str(value_a), str(value_b)
+    time_a = parse_timestamp(value_a)
+    time_b = parse_timestamp(value_b)
+    if time_a is not None and time_b is not None:
+        return (time_a > time_b) - (time_a < time_b)
+    return compare_versions(value_a, value_b)
+
+def value_matches(value, operator, filter_value):
+    if operator == 'ne':
+        return value != filter_value
+    if value is None:
+        return False
+    if operator == 'eq':
+        return value == filter_value
+    if operator == 'in':
+        return value in filter_value
+    if operator == 'contains':
+        return str(filter_value).lower() in str(value).lower()
+    if operator == 'startswith':
+        return str(value).lower().startswith(str(filter_value).lower())
+    comparison = compare_values(value, filter_value)
+    return {'lt': comparison < 0, 'le': comparison <= 0, 'gt': comparison > 0, 'ge': comparison >= 0}[operator]
+
+# Return True if a record matches all predicates.
+
+def record_matches(record, filters):
+    for field, operator, filter_value in filters:
+        value = field_value(record, field)
+        if isinstance(value, list):
+            if operator == 'ne':
+                matches = filter_value not in value
+            else:
+                matches = any(value_matches(this_value, operator, filter_value) for this_value in value)
+        else:
+            matches = value_matches(value, operator, filter_value)
+        if not matches:
+            return False
+    return True
+
+# Yield the records (from pages of records) that match all predicates.
+
+def filter_records(pages, filters):
+    filters = normalize_filters(filters)
+    for page in pages:
+        for record in page or []:
+            if record_matches(record, filters):
+                yield record
@@ -0,0 +1,159 @@
+""" Prisma Cloud Report Jobs Class """
+
+import csv
+import io
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# --Description-- #
+
+# Prisma Cloud report jobs library.
+# Alert CSV reports and compliance reports are asynchronous server jobs: a report is created, generated by the server, and then downloaded.
+# Jobs are created concurrently, and each job is polled with backoff (waiting from 'initial_wait' up to 'max_wait' seconds between polls)
+# until its report is ready, or until the overall 'deadline' (in seconds).
+# Each job is yielded as soon as its report is downloaded: to a file (when a file name is specified), or as content.
+# A failure (including a SystemExit from error_and_exit) or a timeout in one job is recorded as that job's 'error',
+# and does not affect other jobs.
+
+ALERT_CSV_READY_STATUSES  = ['READY_TO_DOWNLOAD']
+ALERT_CSV_FAILED_STATUSES = ['FAILED', 'ERROR', 'CANCELLED']
+
+class PrismaCloudReportJobs():
+    """ Prisma Cloud Report Jobs Class """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, pc_api, max_workers=4, deadline=1800, initial_wait=2, max_wait=60, backoff=1.5):
+        self.pc_api       = pc_api
+        self.max_workers  = max_workers
+        self.deadline     = deadline
+        self.initial_wait = initial_wait
+        self.max_wait     = max_wait
+        self.backoff      = backoff
+        self.jobs         = []
+
+    def __repr__(self):
+        return 'Prisma Cloud Report Jobs:\n  Jobs: (%s)\n  Statuses: (%s)' % (len(self.jobs), ', '.join(job['status'] for job in self.jobs))
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def add_alert_csv(self, body_params, name=None, file_name=None):
+        return self.add_job('alert_csv', body_params, name, file_name)
+
+    def add_compliance_report(self, report_to_add, name=None, file_name=None):
+        return self.add_job('compliance_report', report_to_add, name, file_name)
+
+    def add_job(self, kind, params, name=None, file_name=None):
+        job = {
+            'name':      name if name is not None else len(self.jobs),
+            'kind':      kind,
+            'params':    params,
+            'file_name': file_name,
+            'id':        None,
+            'status':    'NEW',
+            'result':    None,
+            'error':     None,
+            'polls':     0,
+            'seconds':   0,
+            'wait':      self.initial_wait,
+            'next_poll': 0,
+        }
+        self.jobs.append(job)
+        return job
+
+    # Create a report job (returning False, as the report is not ready).
+
+    def create(self, job):
+        if job['kind'] == 'alert_csv':
+            report = self.pc_api.alert_csv_create(job['params'])
+        else:
+            report = self.pc_api.compliance_report_create(job['params'])
+        job['id'] = report['id']
+        job['status'] = 'CREATED'
+        return False
+
+    # Poll a report job, and download its report when ready (returning True).
+
+    def check(self, job):
+        job['polls'] += 1
+        if job['kind'] == 'alert_csv':
+            status = self.pc_api.alert_csv_status(job['id']).get('status')
+            job['status'] = status
+            if status in ALERT_CSV_FAILED_STATUSES:
+                raise RuntimeError('Alert CSV report (%s) status: %s' % (job['id'], status))
+            if status not in ALERT_CSV_READY_STATUSES:
+                return False
+            job['result'] = self.pc_api.alert_csv_download(job['id'], file_name=job['file_name'])
+            return True
+        # Compliance report downloads respond with a 204 (and None is returned) while the report is pending.
+        result = self.pc_api.compliance_report_download(job['id'], file_name=job['file_name'])
+        if result is None:
+            job['status'] = 'PENDING'
+            return False
+        job['result'] = result
+        return True
+
+    # Run all jobs, yielding each job when it is done, has failed, or has timed out.
+
+    # pylint: disable=too-many-branches
+    def run(self):
+        start_time = time.time()
+        deadline_time = start_time + self.deadline
+        waiting = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.create, job): job for job in self.jobs if job['status'] == 'NEW'}
+            while futures or waiting:
+                now = time.time()
+                for job in [job for job in waiting if job['next_poll'] <= now]:
+                    waiting.remove(job)
+                    futures[executor.submit(self.check, job)] = job
+                timeout = max(0, min(job['next_poll'] for job in waiting) - time.time()) if waiting else None
+                if futures:
+                    done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    done = []
+                    time.sleep(timeout)
+                for future in done:
+                    job = futures.pop(future)
+                    job['seconds'] = time.time() - start_time
+                    try:
+                        ready = future.result()
+                    # pylint: disable=broad-except
+                    except (Exception, SystemExit) as ex:
+                        job['status'] = 'FAILED'
+                        job['error'] = ex
+                        yield job
+                        continue
+                    if ready:
+                        job['status'] = 'DONE'
+                        yield job
+                    elif time.time() >= deadline_time:
+                        job['status'] = 'TIMEOUT'
+                        job['error'] = TimeoutError('Report job (%s) was not ready within %s seconds' % (job['id'], self.deadline))
+                        yield job
+                    else:
+                        # Poll again after a growing wait, but at the deadline at the latest.
+                        job['next_poll'] = min(time.time() + job['wait'], deadline_time)
+                        job['wait'] = min(job['wait'] * self.backoff, self.max_wait)
+                        waiting.append(job)
+
+    # Run all jobs, and return the jobs in the order they were added.
+
+    def run_all(self):
+        for _ in self.run():
+            pass
+        return self.jobs
+
+    # Yield each row (as a dictionary) of the CSV report of a job, from its file or its content.
+
+    @classmethod
+    def rows(cls, job):
+        if job['file_name']:
+            with open(job['file_name'], newline='', encoding='utf-8') as csv_file:
+                yield from csv.DictReader(csv_file)
+            return
+        content = job['result'] or ''
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        yield from csv.DictReader(io.StringIO(content))
@@ -0,0 +1,76 @@
+""" Prisma Cloud Join Helpers """
+
+# --Description-- #
+
+# Helpers to correlate lists of objects (for example: Compute images, containers, and hosts) via hash joins, rather than nested loops.
+#
+# A join builds an index (a dictionary of key to objects) of one side once, and streams the other side (a list or a generator),
+# in time linear in the size of both sides. Keys are fields, dotted paths of nested fields (for example: 'info.imageID'), or functions of an object.
+# Joins are one-to-many: an object is joined to each object with its key.
+
+# Return the value of a field (or dotted path of nested fields, or function) of an object, or None.
+
+def field_value(record, key):
+    if callable(key):
+        return key(record)
+    value = record
+    for field in key.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(field)
+    return value
+
+# Return a dictionary of each key to the list of objects with that key (in order), or to the first object with that key (with 'unique').
+# Objects without the key (or with a key that cannot be indexed) are not indexed.
+
+def key_index(records, key, unique=False):
+    index = {}
+    for record in records or []:
+        value = field_value(record, key)
+        if value is None:
+            continue
+        try:
+            if unique:
+                index.setdefault(value, record)
+            else:
+                index.setdefault(value, []).append(record)
+        except TypeError:
+            continue
+    return index
+
+# Yield (left, right) for each pair of objects with the same key, streaming 'left', and indexing 'right' (or using 'right_index', from key_index()).
+# With how='left', also yield (left, None) for each left object without a match.
+
+# pylint: disable=too-many-arguments
+def hash_join(left, right=None, left_key='_id', right_key=None, how='inner', right_index=None):
+    if how not in ('inner', 'left'):
+        raise ValueError('Unknown join: %s (Expected one of: inner, left)' % how)
+    if right_index is None:
+        right_index = key_index(right, right_key or left_key)
+    for left_record in left or []:
+        value = field_value(left_record, left_key)
+        try:
+            matches = right_index.get(value, []) if value is not None else []
+        except TypeError:
+            matches = []
+        if isinstance(matches, dict):
+            matches = [matches]
+        if not matches and how == 'left':
+            yield left_record, None
+        for right_record in matches:
+            yield left_record, right_record
+
+# Yield a dictionary of each container, and its image (by 'info.imageID') and host (by 'hostname'), or None when not found (or not specified).
+# Containers may be a generator (for example: of pages), while images and hosts are indexed.
+
+def join_containers(containers, images=None, hosts=None):
+    image_index = key_index(images, '_id', unique=True)
+    host_index  = key_index(hosts, 'hostname', unique=True)
+    for container in containers or []:
+        image_id = field_value(container, 'info.imageID')
+        hostname = field_value(container, 'hostname')
+        yield {
+            'container': container,
+            'image':     image_index.get(image_id) if image_id is not None else None,
+            'host':      host_index.get(hostname) if hostname is not None else None,
+        }
@@ -0,0 +1,195 @@
+""" Prisma Cloud Vulnerability Matrix Class """
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# --Description-- #
+
+# A sparse matrix of workloads (for example: images from images_list_read() or registry_list_read(), and hosts from hosts_list_read()) by CVE,
+# for vulnerability summaries (counts by severity, kind, collection, or cluster, CVE prevalence, and the top vulnerable workloads or most prevalent CVEs),
+# computed via NumPy rather than loops over the 'vulnerabilities' of each workload.
+#
+# CVEs, severities, kinds, collections, and clusters are integer-coded. The matrix is stored as coordinates (workload, CVE, severity) with one entry
+# per workload and CVE (with the highest severity of the CVE in the workload), and collections and clusters as coordinates (workload, collection or cluster).
+#
+# Requires NumPy (an optional dependency): pip install prismacloud-api[analytics]
+
+SEVERITY_RANKS = {
+    'negligible':  0,
+    'unimportant': 0,
+    'low':         1,
+    'moderate':    2,
+    'medium':      2,
+    'important':   3,
+    'high':        3,
+    'critical':    4,
+}
+
+class Codes():
+    """ Integer codes of values (in order of addition) """
+
+    def __init__(self):
+        self.values = []
+        self.codes  = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.codes[value]
+
+class PrismaCloudVulnerabilityMatrix():
+    """ Prisma Cloud Vulnerability Matrix Class """
+
+    def __init__(self):
+        if numpy is None:
+            raise ImportError('PrismaCloudVulnerabilityMatrix requires NumPy: pip install prismacloud-api[analytics]')
+        self.workloads   = []
+        self.cves        = Codes()
+        self.severities  = Codes()
+        self.kinds       = Codes()
+        self.collections = Codes()
+        self.clusters    = Codes()
+        self._workload_codes = {}
+        self._workload_kinds = []
+        self._entries        = ([], [], [])
+        self._memberships    = {'collection': ([], []), 'cluster': ([], [])}
+        self._membership_keys = set()
+        self._arrays         = None
+
+    def __repr__(self):
+        return 'Prisma Cloud Vulnerability Matrix:\n  Workloads: (%s)\n  CVEs: (%s)\n  Entries: (%s)' % (len(self.workloads), len(self.cves), len(self.arrays()['cve']))
+
+    # Add workloads (kind: for example, 'deployed', 'registry', or 'host') with their vulnerabilities, collections, and clusters.
+
+    def add_workloads(self, workloads, kind, id_field='_id'):
+        kind_code = self.kinds.code(kind)
+        rows, cves, severities = self._entries
+        for workload in workloads or []:
+            workload_key = (kind, workload.get(id_field))
+            if workload_key not in self._workload_codes:
+                self._workload_codes[workload_key] = len(self.workloads)
+                self.workloads.append(workload_key)
+                self._workload_kinds.append(kind_code)
+            row = self._workload_codes[workload_key]
+            for vulnerability in workload.get('vulnerabilities') or []:
+                if not vulnerability.get('cve'):
+                    continue
+                rows.append(row)
+                cves.append(self.cves.code(vulnerability['cve']))
+                severities.append(self.severities.code(str(vulnerability.get('severity') or '').lower()))
+            for group, field, codes in [('collection', 'collections', self.collections), ('cluster', 'clusters', self.clusters)]:
+                group_rows, group_codes = self._memberships[group]
+                for value in workload.get(field) or []:
+                    # Memberships are added once per workload, when a workload is added again (for example: from another page or read).
+                    membership_key = (group, row, codes.code(value))
+                    if membership_key in self._membership_keys:
+                        continue
+                    self._membership_keys.add(membership_key)
+                    group_rows.append(row)
+                    group_codes.append(membership_key[2])
+        self._arrays = None
+        return self
+
+    # Return the matrix as arrays, with one entry per workload and CVE.
+
+    def arrays(self):
+        if self._arrays is None:
+            rows, cves, severities = (numpy.asarray(values, dtype=numpy.int64) for values in self._entries)
+            severity_ranks = numpy.asarray([SEVERITY_RANKS.get(severity, -1) for severity in self.severities.values] or [0], dtype=numpy.int64)
+            if len(rows):
+                # Sort by workload, CVE, and (descending) severity rank, and keep the first entry of each workload and CVE.
+                order = numpy.lexsort((-severity_ranks[severities], cves, rows))
+                rows, cves, severities = rows[order], cves[order], severities[order]
+                first = numpy.ones(len(rows), dtype=bool)
+                first[1:] = (rows[1:] != rows[:-1]) | (cves[1:] != cves[:-1])
+                rows, cves, severities = rows[first], cves[first], severities[first]
+            self._arrays = {
+                'workload': rows,
+                'cve':      cves,
+                'severity': severities,
+                'kind':     numpy.asarray(self._workload_kinds, dtype=numpy.int64),
+            }
+            for group, (group_rows, group_codes) in self._memberships.items():
+                self._arrays[group] = (numpy.asarray(group_rows, dtype=numpy.int64), numpy.asarray(group_codes, dtype=numpy.int64))
+        return self._arrays
+
+    # Return a boolean mask of the workloads in any of 'collections', any of 'clusters', and of any of 'kinds' (each, if specified).
+
+    def workload_mask(self, collections=None, clusters=None, kinds=None):
+        arrays = self.arrays()
+        mask = numpy.ones(len(self.workloads), dtype=bool)
+        for group, values, codes in [('collection', collections, self.collections), ('cluster', clusters, self.clusters)]:
+            if values is None:
+                continue
+            group_rows, group_codes = arrays[group]
+            selected = numpy.zeros(len(codes) + 1, dtype=bool)
+            selected[[codes.codes[value] for value in values if value in codes.codes]] = True
+            group_mask = numpy.zeros(len(self.workloads), dtype=bool)
+            group_mask[group_rows[selected[group_codes]]] = True
+            mask &= group_mask
+        if kinds is not None:
+            selected = numpy.zeros(len(self.kinds) + 1, dtype=bool)
+            selected[[self.kinds.codes[kind] for kind in kinds if kind in self.kinds.codes]] = True
+            mask &= selected[arrays['kind']]
+        return mask
+
+    # Return a boolean mask of the entries of the selected workloads, and of any of 'severities' (if specified, case-insensitive).
+
+    def entry_mask(self, severities=None, collections=None, clusters=None, kinds=None):
+        arrays = self.arrays()
+        mask = self.workload_mask(collections, clusters, kinds)[arrays['workload']]
+        if severities is not None:
+            selected = numpy.zeros(len(self.severities) + 1, dtype=bool)
+            severity_codes = [self.severities.codes.get(str(severity).lower()) for severity in severities]
+            selected[[severity_code for severity_code in severity_codes if severity_code is not None]] = True
+            mask &= selected[arrays['severity']]
+        return mask
+
+    # Return the number of vulnerabilities (workload and CVE entries) by 'severity', 'kind', 'collection', 'cluster', 'cve', or 'workload'.
+    # Filter by severities, collections, clusters, and kinds.
+
+    def counts_by(self, group='severity', **filters):
+        arrays = self.arrays()
+        mask = self.entry_mask(**filters)
+        if group in ('severity', 'cve', 'workload'):
+            values = {'severity': self.severities.values, 'cve': self.cves.values, 'workload': self.workloads}[group]
+            counts = numpy.bincount(arrays[group][mask], minlength=len(values))
+        else:
+            workload_counts = numpy.bincount(arrays['workload'][mask], minlength=len(self.workloads))
+            if group == 'kind':
+                values = self.kinds.values
+                counts = numpy.bincount(arrays['kind'], weights=workload_counts, minlength=len(values))
+            elif group in ('collection', 'cluster'):
+                values = (self.collections if group == 'collection' else self.clusters).values
+                group_rows, group_codes = arrays[group]
+                counts = numpy.bincount(group_codes, weights=workload_counts[group_rows], minlength=len(values))
+            else:
+                raise ValueError('Unknown group: %s (Expected one of: severity, kind, collection, cluster, cve, workload)' % group)
+        return {value: int(count) for value, count in zip(values, counts) if count}
+
+    # Return the 'k' workloads with the most vulnerabilities, or the 'k' CVEs in the most workloads, as a list of (workload or CVE, count).
+
+    def top(self, k=10, group='workload', **filters):
+        if group not in ('workload', 'cve'):
+            raise ValueError('Unknown group: %s (Expected one of: workload, cve)' % group)
+        arrays = self.arrays()
+        values = self.workloads if group == 'workload' else self.cves.values
+        counts = numpy.bincount(arrays[group][self.entry_mask(**filters)], minlength=len(values))
+        k = min(k, len(counts))
+        if k <= 0:
+            return []
+        top_indices = numpy.argpartition(-counts, k - 1)[:k]
+        top_indices = top_indices[numpy.lexsort((top_indices, -counts[top_indices]))]
+        return [(values[index], int(counts[index])) for index in top_indices if counts[index]]
+
+    def top_workloads(self, k=10, **filters):
+        return self.top(k, 'workload', **filters)
+
+    def top_cves(self, k=10, **filters):
+        return self.top(k, 'cve', **filters)
@@ -0,0 +1,173 @@
+""" Prisma Cloud Package Index Class """
+
+import bisect
+import gzip
+import json
+import os
+import re
+
+from functools import lru_cache
+
+try:
+    from packaging.version import InvalidVersion, Version
+except ImportError:
+    Version = None
+
+# --Description-- #
+
+# An index of the packages (and binaries, and applications) of Compute images: package name to version to images,
+# built once from the results of scans_list_read() (CI images), registry_list_read() (registry images), and/or images_list_read() (deployed images),
+# and saved to (and loaded from) a file, so that repeated package searches do not read (or scan) the images again.
+#
+# Versions are compared via packaging (PEP 440) when installed and both versions are valid, otherwise by their numeric and alphabetic parts.
+# Parsed versions are cached.
+
+PACKAGE_INDEX_VERSION = 1
+
+VERSION_PART = re.compile(r'\d+|[A-Za-z]+')
+
+@lru_cache(maxsize=65536)
+def parse_version(version):
+    pep440_version = None
+    if Version is not None:
+        try:
+            pep440_version = Version(version)
+        except InvalidVersion:
+            pep440_version = None
+    parts = tuple((1, int(part), '') if part.isdigit() else (0, 0, part.lower()) for part in VERSION_PART.findall(version))
+    return pep440_version, parts
+
+# Return -1, 0, or 1, as version_a is less than, equal to, or greater than version_b.
+# Mixing the two schemes across pairs is not transitive: sort a set of versions via sort_versions(), which uses one scheme for the set.
+
+def compare_versions(version_a, version_b):
+    pep440_a, parts_a = parse_version(version_a)
+    pep440_b, parts_b = parse_version(version_b)
+    if pep440_a is not None and pep440_b is not None:
+        return (pep440_a > pep440_b) - (pep440_a < pep440_b)
+    return (parts_a > parts_b) - (parts_a < parts_b)
+
+# Return versions sorted via PEP 440 when all versions are valid, otherwise via their numeric and alphabetic parts.
+
+def sort_versions(versions):
+    versions = list(versions)
+    if all(parse_version(version)[0] is not None for version in versions):
+        return sorted(versions, key=lambda version: parse_version(version)[0])
+    return sorted(versions, key=lambda version: parse_version(version)[1])
+
+VERSION_COMPARISONS = {
+    'eq': lambda comparison: comparison == 0,
+    'gt': lambda comparison: comparison > 0,
+    'ge': lambda comparison: comparison >= 0,
+    'lt': lambda comparison: comparison < 0,
+    'le': lambda comparison: comparison <= 0,
+}
+
+class PrismaCloudPackageIndex():
+    """ Prisma Cloud Package Index Class """
+
+    def __init__(self):
+        # {package name: {package version: [[image key, package type, package path, CVE count], ...]}}
+        self.packages = {}
+        # {image key: {'kind': ..., 'id': ..., 'instance': ...}}
+        self.images = {}
+        self._names = None
+
+    def __repr__(self):
+        return 'Prisma Cloud Package Index:\n  Images: (%s)\n  Packages: (%s)' % (len(self.images), len(self.packages))
+
+    # Add images (kind: 'ci', 'registry', or 'deployed') to the index.
+
+    def add_images(self, images, kind):
+        for image in images or []:
+            # CI (scan) results nest image details in 'entityInfo'.
+            image_info = image['entityInfo'] if 'entityInfo' in image else image
+            image_key = '%s:%s' % (kind, image['_id'])
+            try:
+                instance = '%s %s' % (image_info['instances'][0]['image'], image_info['instances'][0]['host'])
+            except (IndexError, KeyError, TypeError):
+                instance = ''
+            self.images[image_key] = {'kind': kind, 'id': image['_id'], 'instance': instance}
+            for packages in image_info.get('packages') or []:
+                for package in packages.get('pkgs') or []:
+                    self.add_package(image_key, packages['pkgsType'], package['name'], package.get('version'), package.get('path', ''), package.get('cveCount'))
+            for binary in image_info.get('binaries') or []:
+                self.add_package(image_key, 'binary', binary['name'], None, binary.get('path', ''))
+            for application in image.get('applications') or []:
+                self.add_package(image_key, 'application', application['name'], application.get('version'), application.get('path', ''))
+        return self
+
+    def add_package(self, image_key, package_type, name, version, path='', cve_count=None):
+        if not name:
+            return
+        if name not in self.packages:
+            self._names = None
+        self.packages.setdefault(name, {}).setdefault(version or '', []).append([image_key, package_type, path, cve_count])
+
+    # Return the names of packages that match: exactly, by prefix (via a binary search of the sorted names), or by substring.
+
+    def package_names(self, name=None, match='exact'):
+        if name is None:
+            return sorted(self.packages)
+        if match == 'exact':
+            return [name] if name in self.packages else []
+        if match == 'prefix':
+            if self._names is None:
+                self._names = sorted(self.packages)
+            start = bisect.bisect_left(self._names, name)
+            end = start
+            while end < len(self._names) and self._names[end].startswith(name):
+                end += 1
+            return self._names[start:end]
+        if match == 'substring':
+            return sorted(package_name for package_name in self.packages if name in package_name)
+        raise ValueError('Unknown match: %s (Expected one of: exact, prefix, substring)' % match)
+
+    # Return the versions of a package, sorted.
+
+    def package_versions(self, name):
+        return sort_versions(self.packages.get(name, {}))
+
+    # Return the packages (in images) that match a name, and optionally a version comparison (eq, gt, ge, lt, le), package type, and kind of image.
+    # Packages without a version (for example: binaries) do not match a version comparison.
+
+    # pylint: disable=too-many-arguments
+    def search(self, name=None, match='exact', version=None, comparison='eq', package_type='all', kinds=None):
+        if comparison not in VERSION_COMPARISONS:
+            raise ValueError('Unknown comparison: %s (Expected one of: %s)' % (comparison, ', '.join(VERSION_COMPARISONS)))
+        version_matches = VERSION_COMPARISONS[comparison]
+        results = []
+        for package_name in self.package_names(name, match):
+            for package_version, entries in self.packages[package_name].items():
+                if version and not (package_version and version_matches(compare_versions(package_version, version))):
+                    continue
+                for image_key, this_package_type, path, cve_count in entries:
+                    if package_type not in ('all', this_package_type):
+                        continue
+                    image = self.images[image_key]
+                    if kinds and image['kind'] not in kinds:
+                        continue
+                    results.append({'kind': image['kind'], 'image': image['id'], 'instance': image['instance'], 'type': this_package_type, 'name': package_name, 'version': package_version, 'path': path, 'cves': cve_count})
+        return results
+
+    # Save the index to a file (gzip-compressed, when the file name ends with '.gz'), and load an index from a file.
+
+    def save(self, file_name):
+        data = {'version': PACKAGE_INDEX_VERSION, 'images': self.images, 'packages': self.packages}
+        temporary_file_name = '%s.%s' % (file_name, os.getpid())
+        open_file = gzip.open if file_name.endswith('.gz') else open
+        with open_file(temporary_file_name, 'wt') as index_file:
+            json.dump(data, index_file, separators=(',', ':'))
+        os.replace(temporary_file_name, file_name)
+
+    @classmethod
+    def load(cls, file_name):
+        open_file = gzip.open if file_name.endswith('.gz') else open
+        with open_file(file_name, 'rt') as index_file:
+            data = json.load(index_file)
+        if data.get('version') != PACKAGE_INDEX_VERSION:
+            raise ValueError('Unsupported package index version: %s' % data.get('version'))
+        package_index = cls()
+        package_index.images = data['images']
+        package_index.packages = data['packages']
+        return package_index
@@ -0,0 +1,129 @@
+""" Prisma Cloud API Pool Class """
+
+import time
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+
+from .pc_lib_api import PrismaCloudAPI
+
+# --Description-- #
+
+# Prisma Cloud API Pool library.
+# Holds one configured PrismaCloudAPI instance (with its own token, rate limiter, and circuit breaker) per tenant
+# (or Compute Console), and fans out method calls across all of them concurrently.
+# A failure (including a SystemExit from error_and_exit) in one tenant is recorded for that tenant,
+# and does not affect the results from other tenants.
+
+class PrismaCloudAPIPool():
+    """ Prisma Cloud API Pool Class """
+
+    def __init__(self, settings_list=None, max_workers=8, use_meta_info=True):
+        self.clients     = {}
+        self.errors      = {}
+        self.max_workers = max_workers
+        self._pool_lock  = Lock()
+        if settings_list:
+            self.configure(settings_list, use_meta_info=use_meta_info)
+
+    def __repr__(self):
+        return 'Prisma Cloud API Pool:\n  Tenants: (%s)\n  Configuration Errors: (%s)' % (', '.join(self.clients), ', '.join(self.errors))
+
+    def __len__(self):
+        return len(self.clients)
+
+    def __getitem__(self, tenant):
+        return self.clients[tenant]
+
+    # Tenants are identified by the 'name' setting, or by the 'url' setting when 'name' is not specified.
+
+    @classmethod
+    def tenant_name(cls, settings):
+        return settings.get('name') or settings.get('url', '')
+
+    # Configure (and login to) each tenant concurrently.
+    # Tenants that fail to configure are recorded in 'errors', rather than added to 'clients'.
+
+    def configure(self, settings_list, use_meta_info=True):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_settings = {executor.submit(self.add, settings, use_meta_info): settings for settings in settings_list}
+            for future in as_completed(future_to_settings):
+                tenant = self.tenant_name(future_to_settings[future])
+                try:
+                    future.result()
+                # pylint: disable=broad-except
+                except (Exception, SystemExit) as ex:
+                    with self._pool_lock:
+                        self.errors[tenant] = ex
+        return self
+
+    def add(self, settings, use_meta_info=True):
+        tenant = self.tenant_name(settings)
+        if not tenant:
+            raise ValueError('Settings require a name or url to be added to the pool')
+        with self._pool_lock:
+            if tenant in self.clients:
+                raise ValueError('Tenant (%s) is already in the pool' % tenant)
+        client = PrismaCloudAPI()
+        client.configure(settings, use_meta_info=use_meta_info)
+        with self._pool_lock:
+            self.clients[tenant] = client
+            self.errors.pop(tenant, None)
+        return client
+
+    def remove(self, tenant):
+        with self._pool_lock:
+            return self.clients.pop(tenant, None)
+
+    # Call a method on one client, and return its result tagged by tenant.
+    # The method is either the name of a PrismaCloudAPI method (for example: 'defenders_list_read'),
+    # or a callable that accepts a PrismaCloudAPI instance as its first argument.
+
+    @classmethod
+    def call(cls, tenant, client, method, *args, **kwargs):
+        tenant_result = {'tenant': tenant, 'result': None, 'error': None, 'seconds': 0}
+        start_time = time.time()
+        try:
+            if callable(method):
+                tenant_result['result'] = method(client, *args, **kwargs)
+            else:
+                tenant_result['result'] = getattr(client, method)(*args, **kwargs)
+        # pylint: disable=broad-except
+        except (Exception, SystemExit) as ex:
+            tenant_result['error'] = ex
+        tenant_result['seconds'] = time.time() - start_time
+        return tenant_result
+
+    # Call a method on each (or the specified) tenant concurrently, yielding each tagged result as it completes.
+
+    def fan_out_as_completed(self, method, *args, tenants=None, **kwargs):
+        with self._pool_lock:
+            clients = {tenant: client for tenant, client in self.clients.items() if tenants is None or tenant in tenants}
+        if not clients:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(clients))) as executor:
+            futures = [executor.submit(self.call, tenant, client, method, *args, **kwargs) for tenant, client in clients.items()]
+            for future in as_completed(futures):
+                yield future.result()
+
+    # Call a method on each (or the specified) tenant concurrently, and return a dictionary of tagged results by tenant.
+    # Example: results = pool.fan_out('defenders_list_read', query_params={'connected': True})
+    #          for tenant, tenant_result in results.items(): ... tenant_result['result'] or tenant_result['error']
+
+    def fan_out(self, method, *args, tenants=None, **kwargs):
+        results = {}
+        for tenant_result in self.fan_out_as_completed(method, *args, tenants=tenants, **kwargs):
+            results[tenant_result['tenant']] = tenant_result
+        return {tenant: results[tenant] for tenant in self.clients if tenant in results}
+
+    # Return only the successful results, by tenant.
+
+    @classmethod
+    def successful_results(cls, results):
+        return {tenant: tenant_result['result'] for tenant, tenant_result in results.items() if tenant_result['error'] is None}
+
+    # Return only the errors, by tenant.
+
+    @classmethod
+    def failed_results(cls, results):
+        return {tenant: tenant_result['error'] for tenant, tenant_result in results.items() if tenant_result['error'] is not None}
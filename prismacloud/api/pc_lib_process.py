@@ -0,0 +1,34 @@
+""" Prisma Cloud Process Pool Helpers """
+
+import json
+
+# --Description-- #
+
+# Helpers for decoding and transforming API responses in worker processes.
+# These are module-level functions, so that they can be pickled and sent to a ProcessPoolExecutor.
+
+# Decode (JSON) response content, and optionally apply a transform to the decoded page.
+# A transform accepts the decoded page (usually a list of records) and should return a compact result,
+# for example: the fields or aggregates needed by the caller, rather than whole image or host documents.
+
+def decode_and_transform(content, transform=None):
+    if not content:
+        page = []
+    else:
+        page = json.loads(content)
+    if page is None:
+        page = []
+    if transform:
+        return transform(page)
+    return page
+
+# Combine transformed pages: list results are concatenated, other results are appended.
+
+def combine_transformed_pages(transformed_pages):
+    combined_results = []
+    for transformed_page in transformed_pages:
+        if isinstance(transformed_page, list):
+            combined_results.extend(transformed_page)
+        else:
+            combined_results.append(transformed_page)
+    return combined_results
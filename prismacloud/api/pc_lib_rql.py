@@ -0,0 +1,147 @@
+""" Prisma Cloud RQL Helpers """
+
+import json
+import re
+import time
+
+from .pc_lib_time_range import absolute_time_range, split_time_bounds, time_range_bounds
+
+# --Description-- #
+
+# Helpers for splitting an RQL search into shards (by cloud account, region, or time window) that can be run concurrently,
+# and for identifying equivalent RQL searches (to cache results).
+
+# Search (and page) endpoints, by search type.
+
+RQL_SEARCH_ENDPOINTS = {
+    'config': ('search/config',     'search/config/page'),
+    'event':  ('search/event',      'search/config/page'),
+    'iam':    ('api/v1/permission', 'api/v1/permission/page'),
+}
+
+# Shard attributes (or any RQL attribute).
+
+RQL_SHARD_FIELDS = {
+    'account': 'cloud.account',
+    'region':  'cloud.region',
+    'service': 'cloud.service',
+}
+
+# IAM searches do not have 'cloud.*' attributes: shard by the source cloud account (or any IAM RQL attribute).
+
+RQL_IAM_SHARD_FIELDS = {
+    'account': 'source.cloud.account',
+}
+
+RQL_WHERE = re.compile(r'\bwhere\b', re.IGNORECASE)
+
+# Clauses that end the conditions of a 'where' clause (outside of quoted strings and parentheses).
+
+RQL_WHERE_END = re.compile(r'(?:addcolumn|as)\b|;', re.IGNORECASE)
+
+# Return the position (from 'start') of the first match of a pattern outside of quoted strings and parentheses, at the start of a word (or None).
+
+def rql_clause_position(query, pattern, start=0):
+    depth = 0
+    quote = None
+    position = start
+    while position < len(query):
+        character = query[position]
+        if quote:
+            if character == '\\':
+                position += 1
+            elif character == quote:
+                quote = None
+        elif character in ('"', "'"):
+            quote = character
+        elif character in '([{':
+            depth += 1
+        elif character in ')]}':
+            depth -= 1
+        elif depth == 0 and (character == ';' or (character.isalpha() and not (position > 0 and (query[position - 1].isalnum() or query[position - 1] in '._')))):
+            if pattern.match(query, position):
+                return position
+        position += 1
+    return None
+
+# Return the end of the conditions of the 'where' clause that start at 'start'.
+
+def rql_conditions_end(query, start):
+    end = rql_clause_position(query, RQL_WHERE_END, start)
+    return len(query) if end is None else end
+
+# Add a condition to an RQL query, as the first condition of its (first, outside of quoted strings and parentheses) 'where' clause:
+# where <condition> AND (<conditions>)
+# Trailing clauses (for example: 'addcolumn') are not included in the parentheses.
+
+def rql_with_condition(query, condition):
+    position = rql_clause_position(query, RQL_WHERE)
+    if position is None:
+        raise ValueError('RQL query requires a where clause to be sharded: %s' % query)
+    where_end = position + len('where')
+    end = rql_conditions_end(query, where_end)
+    conditions = query[where_end:end].strip()
+    if not conditions:
+        raise ValueError('RQL query requires where conditions to be sharded: %s' % query)
+    trailing = query[end:].strip()
+    return '%s %s AND ( %s )%s' % (query[:where_end], condition, conditions, ' %s' % trailing if trailing else '')
+
+def rql_string(value):
+    return "'%s'" % str(value).replace("'", "\\'")
+
+# Return a list of search parameters (one per shard) for each value of a shard attribute, and/or for each time window.
+
+def rql_shard_search_params(search_params, shard_by=None, shard_values=None, time_shards=None, shard_fields=None):
+    shards = [dict(search_params)]
+    if shard_by:
+        if shard_fields is None:
+            shard_fields = RQL_SHARD_FIELDS
+        if shard_by in RQL_SHARD_FIELDS and shard_by not in shard_fields:
+            raise ValueError('RQL search cannot be sharded by: %s (Expected one of: %s, or an RQL attribute)' % (shard_by, ', '.join(shard_fields)))
+        field = shard_fields.get(shard_by, shard_by)
+        shards = [dict(shard, query=rql_with_condition(shard['query'], '%s = %s' % (field, rql_string(value)))) for shard in shards for value in shard_values]
+    if time_shards and time_shards > 1:
+        bounds = time_range_bounds(search_params.get('timeRange'))
+        if not bounds:
+            raise ValueError('RQL search requires a relative or absolute timeRange to be sharded by time: %s' % search_params.get('timeRange'))
+        shards = [dict(shard, timeRange=absolute_time_range(start, end)) for shard in shards for start, end in split_time_bounds(bounds[0], bounds[1], time_shards)]
+    return shards
+
+# Return a key that identifies an RQL search result, for removing duplicates returned by more than one shard.
+
+def rql_item_key(item):
+    for key in ['assetId', 'rrn', 'id']:
+        if item.get(key):
+            return (key, item.get('accountId'), item[key])
+    return None
+
+# RQL keywords, which are case-insensitive.
+
+RQL_KEYWORDS = {'and', 'as', 'config', 'event', 'exists', 'from', 'in', 'network', 'not', 'or', 'where'}
+
+RQL_TOKENS = re.compile(r"""(?:'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|[^\s'"])+""")
+
+# Normalize an RQL query: collapse whitespace, and lowercase keywords, outside of quoted strings.
+
+def rql_normalize(query):
+    tokens = RQL_TOKENS.findall(query or '')
+    return ' '.join(token.lower() if token.lower() in RQL_KEYWORDS else token for token in tokens)
+
+# Round a relative (or 'to_now') time range into buckets of 'bucket' seconds, so that the same relative search in the same bucket shares a key.
+
+def rql_time_range_key(time_range, bucket=60, now=None):
+    if not time_range or time_range.get('type') == 'absolute':
+        return time_range
+    if now is None:
+        now = time.time()
+    return {'timeRange': time_range, 'bucket': int(now // bucket) if bucket else now}
+
+# Return a cache key for a search: the search endpoint and parameters, with a normalized query and a bucketed time range.
+
+def rql_cache_key(search_url, search_params, bucket=60, now=None):
+    key_params = dict(search_params)
+    if 'query' in key_params:
+        key_params['query'] = rql_normalize(key_params['query'])
+    if 'timeRange' in key_params:
+        key_params['timeRange'] = rql_time_range_key(key_params['timeRange'], bucket, now)
+    return json.dumps([search_url, key_params], sort_keys=True, default=str)
@@ -0,0 +1,196 @@
+""" Prisma Cloud Batch Sink Class """
+
+import gzip
+import json
+import queue
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --Description-- #
+
+# Prisma Cloud batch sink library.
+# Forwards records (for example: audits, to a SIEM HTTP collector) in batches, rather than one request per record.
+#
+# Records are put into a bounded queue (put() blocks when the queue is full, so producers cannot outrun the sink),
+# serialized once, and batched by count ('batch_records') and size ('batch_bytes'), or after 'batch_seconds' without a full batch.
+# Batches are sent as NDJSON (one record per line) or as a JSON array, optionally gzip-compressed, by 'workers' sender threads
+# sharing one pooled session, with retries (and backoff) for connection errors and 'retry_status_codes'.
+# Batches that fail after all retries are counted in 'metrics', and passed to 'on_failure' (if specified).
+# flush() sends a partial batch, and waits until all queued records have been sent (or have failed), for example: before committing a checkpoint.
+
+SINK_FLUSH = object()
+
+SINK_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'json':   'application/json',
+}
+
+class PrismaCloudBatchSink():
+    """ Prisma Cloud Batch Sink Class """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes,too-many-locals
+    def __init__(self, url, headers=None, body_format='ndjson', compress=False, batch_records=500, batch_bytes=1048576, batch_seconds=5,
+                 queue_size=10000, workers=2, timeout=30, verify=True, retry_status_codes=None, retry_waits=None, on_failure=None):
+        if body_format not in SINK_CONTENT_TYPES:
+            raise ValueError('Unknown body format: %s (Expected one of: %s)' % (body_format, ', '.join(SINK_CONTENT_TYPES)))
+        self.url                = url
+        self.headers            = dict(headers or {})
+        self.body_format        = body_format
+        self.compress           = compress
+        self.batch_records      = batch_records
+        self.batch_bytes        = batch_bytes
+        self.batch_seconds      = batch_seconds
+        self.timeout            = timeout
+        self.verify             = verify
+        self.retry_status_codes = retry_status_codes if retry_status_codes is not None else [429, 500, 502, 503, 504]
+        self.retry_waits        = retry_waits if retry_waits is not None else [1, 2, 4, 8]
+        self.on_failure         = on_failure
+        self.metrics            = {'records_queued': 0, 'records_sent': 0, 'records_failed': 0, 'batches_sent': 0, 'batches_failed': 0, 'bytes_sent': 0, 'retries': 0, 'seconds_sending': 0.0}
+        self.headers['Content-Type'] = SINK_CONTENT_TYPES[body_format]
+        if compress:
+            self.headers['Content-Encoding'] = 'gzip'
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._records = queue.Queue(maxsize=queue_size)
+        # At most two batches per sender are waiting, so that the batcher is also subject to backpressure.
+        self._batches = queue.Queue(maxsize=workers * 2)
+        self._metrics_lock = threading.Condition()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._batch_records, daemon=True)]
+        self._threads.extend(threading.Thread(target=self._send_batches, daemon=True) for _ in range(workers))
+        for thread in self._threads:
+            thread.start()
+
+    def __repr__(self):
+        return 'Prisma Cloud Batch Sink:\n  URL: (%s)\n  Metrics: (%s)' % (self.url, ', '.join('%s: %s' % (key, value) for key, value in self.metrics.items()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _count(self, **counts):
+        with self._metrics_lock:
+            for key, value in counts.items():
+                self.metrics[key] += value
+            self._metrics_lock.notify_all()
+
+    # Queue a record (blocking while the queue is full). None is ignored.
+
+    def put(self, record):
+        if self._closed:
+            raise ValueError('Batch sink is closed')
+        if record is None:
+            return
+        self._records.put(record)
+        self._count(records_queued=1)
+
+    def put_many(self, records):
+        for record in records:
+            self.put(record)
+
+    # Send a partial batch, and wait until all queued records have been sent (or have failed). Returns False after a timeout.
+
+    def flush(self, timeout=None):
+        if self._closed:
+            return True
+        self._records.put(SINK_FLUSH)
+        with self._metrics_lock:
+            return self._metrics_lock.wait_for(lambda: self.metrics['records_sent'] + self.metrics['records_failed'] >= self.metrics['records_queued'], timeout)
+
+    # Send all queued records, and stop the sink. Returns the metrics.
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._records.put(None)
+            for thread in self._threads:
+                thread.join()
+            self.session.close()
+        return self.metrics
+
+    def _batch_records(self):
+        batch = []
+        batch_size = 0
+        batch_started = None
+        while True:
+            timeout = None
+            if batch:
+                timeout = max(0, batch_started + self.batch_seconds - time.time())
+            try:
+                record = self._records.get(timeout=timeout)
+            except queue.Empty:
+                # Send a batch that is not full after 'batch_seconds'.
+                self._batches.put(batch)
+                batch, batch_size = [], 0
+                continue
+            if record is SINK_FLUSH:
+                if batch:
+                    self._batches.put(batch)
+                    batch, batch_size = [], 0
+                continue
+            if record is None:
+                if batch:
+                    self._batches.put(batch)
+                # Stop each sender.
+                for _ in self._threads[1:]:
+                    self._batches.put(None)
+                return
+            serialized_record = json.dumps(record, separators=(',', ':'), default=str).encode('utf-8')
+            # Flush before a record that would exceed the batch size.
+            if batch and batch_size + len(serialized_record) + 1 > self.batch_bytes:
+                self._batches.put(batch)
+                batch, batch_size = [], 0
+            if not batch:
+                batch_started = time.time()
+            batch.append(serialized_record)
+            batch_size += len(serialized_record) + 1
+            if len(batch) >= self.batch_records:
+                self._batches.put(batch)
+                batch, batch_size = [], 0
+
+    def batch_body(self, batch):
+        if self.body_format == 'ndjson':
+            body = b'\n'.join(batch) + b'\n'
+        else:
+            body = b'[' + b','.join(batch) + b']'
+        if self.compress:
+            body = gzip.compress(body)
+        return body
+
+    def _send_batches(self):
+        while True:
+            batch = self._batches.get()
+            if batch is None:
+                return
+            body = self.batch_body(batch)
+            start_time = time.time()
+            error = None
+            for attempt in range(len(self.retry_waits) + 1):
+                if attempt:
+                    self._count(retries=1)
+                    time.sleep(self.retry_waits[attempt - 1])
+                try:
+                    response = self.session.post(self.url, headers=self.headers, data=body, timeout=self.timeout, verify=self.verify)
+                except requests.exceptions.RequestException as ex:
+                    error = ex
+                    continue
+                if response.ok:
+                    error = None
+                    break
+                error = requests.exceptions.HTTPError('Batch sink (%s) responded with a status of: (%s)' % (self.url, response.status_code), response=response)
+                if response.status_code not in self.retry_status_codes:
+                    break
+            self._count(seconds_sending=time.time() - start_time)
+            if error is None:
+                self._count(records_sent=len(batch), batches_sent=1, bytes_sent=len(body))
+            else:
+                self._count(records_failed=len(batch), batches_failed=1)
+                if self.on_failure:
+                    self.on_failure(batch, error)
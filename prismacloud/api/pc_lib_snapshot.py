@@ -0,0 +1,223 @@
+""" Prisma Cloud Snapshot Store Class """
+
+import hashlib
+import json
+import sqlite3
+import time
+
+from threading import Lock
+
+from .pc_lib_checkpoint import record_id
+from .pc_lib_join import field_value
+from .pc_lib_packages import compare_versions
+
+# --Description-- #
+
+# A local (SQLite) snapshot of tenant inventories (for example: defenders, hosts, and cloud accounts), for offline queries (filters and joins)
+# without requests to the API.
+#
+# Each source is a table with an 'id' primary key, indexed columns (fields, or dotted paths of nested fields, of each record),
+# and the record as a JSON 'document' (query other fields via json_extract(document, '$.field'), and lists via json_each()).
+# A 'compare_versions(a, b)' SQL function compares versions (for example: defender versions).
+#
+# Refreshes are incremental: pages are streamed into the table, and only new or changed records (by a digest of each record) are written,
+# and records no longer returned are deleted, in one transaction (so a failed refresh leaves the previous snapshot).
+# Sources refreshed within 'max_age' seconds are not refreshed again.
+#
+# Query parameters are per source ({source: query_params}), for Compute sources and sources with a 'query_params' method argument.
+# A refresh with query parameters (a filtered refresh) writes new or changed records, but does not delete records (not returned due to the filter),
+# and does not update the 'refreshed' time of the snapshot, which is the time of the last unfiltered refresh (used by 'max_age').
+
+SNAPSHOT_SOURCES = {
+    'defenders': {
+        'endpoint': 'api/v1/defenders',
+        'key': 'hostname',
+        'columns': [('hostname', 'hostname', 'TEXT'), ('version', 'version', 'TEXT'), ('connected', 'connected', 'INTEGER'), ('type', 'type', 'TEXT'),
+                    ('category', 'category', 'TEXT'), ('cluster', 'cluster', 'TEXT'), ('cloud_provider', 'cloudMetadata.provider', 'TEXT'),
+                    ('cloud_account_id', 'cloudMetadata.accountID', 'TEXT'), ('collections', 'collections', 'JSON')],
+    },
+    'hosts': {
+        'endpoint': 'api/v1/hosts',
+        'key': '_id',
+        'columns': [('hostname', 'hostname', 'TEXT'), ('distro', 'distro', 'TEXT'), ('cloud_provider', 'cloudMetadata.provider', 'TEXT'),
+                    ('cloud_account_id', 'cloudMetadata.accountID', 'TEXT'), ('cloud_region', 'cloudMetadata.region', 'TEXT'),
+                    ('vulnerabilities_count', 'vulnerabilitiesCount', 'INTEGER'), ('scan_time', 'scanTime', 'TEXT'),
+                    ('collections', 'collections', 'JSON'), ('clusters', 'clusters', 'JSON')],
+    },
+    'containers': {
+        'endpoint': 'api/v1/containers',
+        'key': '_id',
+        'columns': [('hostname', 'hostname', 'TEXT'), ('name', 'info.name', 'TEXT'), ('image_name', 'info.imageName', 'TEXT'), ('image_id', 'info.imageID', 'TEXT'),
+                    ('namespace', 'info.namespace', 'TEXT'), ('cluster', 'info.cluster', 'TEXT'), ('collections', 'collections', 'JSON')],
+    },
+    'images': {
+        'endpoint': 'api/v1/images',
+        'key': '_id',
+        'columns': [('registry', 'repoTag.registry', 'TEXT'), ('repo', 'repoTag.repo', 'TEXT'), ('tag', 'repoTag.tag', 'TEXT'),
+                    ('vulnerabilities_count', 'vulnerabilitiesCount', 'INTEGER'), ('scan_time', 'scanTime', 'TEXT'),
+                    ('collections', 'collections', 'JSON'), ('clusters', 'clusters', 'JSON')],
+    },
+    'cloud_accounts': {
+        'method': 'cloud_accounts_list_read',
+        'query_params': True,
+        'key': 'accountId',
+        'columns': [('name', 'name', 'TEXT'), ('cloud_type', 'cloudType', 'TEXT'), ('account_type', 'accountType', 'TEXT'), ('enabled', 'enabled', 'INTEGER')],
+    },
+    'account_groups': {
+        'method': 'cloud_account_group_list_read',
+        'key': 'id',
+        'columns': [('name', 'name', 'TEXT'), ('account_ids', 'accountIds', 'JSON')],
+    },
+    'policies': {
+        'method': 'policy_v2_list_read',
+        'key': 'policyId',
+        'columns': [('name', 'name', 'TEXT'), ('policy_type', 'policyType', 'TEXT'), ('severity', 'severity', 'TEXT'), ('cloud_type', 'cloudType', 'TEXT'),
+                    ('enabled', 'enabled', 'INTEGER')],
+    },
+    'users': {
+        'method': 'user_list_read',
+        'key': 'email',
+        'columns': [('first_name', 'firstName', 'TEXT'), ('last_name', 'lastName', 'TEXT'), ('enabled', 'enabled', 'INTEGER'), ('role_ids', 'roleIds', 'JSON')],
+    },
+}
+
+class PrismaCloudSnapshotStore():
+    """ Prisma Cloud Snapshot Store Class """
+
+    def __init__(self, pc_api, file_name, sources=None):
+        self.pc_api  = pc_api
+        self.sources = dict(SNAPSHOT_SOURCES, **(sources or {}))
+        self._lock = Lock()
+        self.connection = sqlite3.connect(file_name, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.create_function('compare_versions', 2, lambda version_a, version_b: compare_versions(version_a, version_b) if version_a and version_b else None)
+        with self._lock, self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS snapshots (source TEXT PRIMARY KEY, refreshed REAL, records INTEGER, written INTEGER, deleted INTEGER, seconds REAL)')
+
+    def __repr__(self):
+        return 'Prisma Cloud Snapshot Store:\n  Snapshots: (%s)' % ', '.join('%s: %s' % (snapshot['source'], snapshot['records']) for snapshot in self.snapshots())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def source(self, source):
+        if source not in self.sources:
+            raise ValueError('Unknown source: %s (Expected one of: %s)' % (source, ', '.join(self.sources)))
+        return self.sources[source]
+
+    def create_table(self, source):
+        columns = self.source(source)['columns']
+        column_definitions = ''.join(', "%s" %s' % (name, 'TEXT' if column_type == 'JSON' else column_type) for name, _, column_type in columns)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS "%s" (id TEXT PRIMARY KEY, digest TEXT%s, document TEXT)' % (source, column_definitions))
+        for name, _, _ in columns:
+            self.connection.execute('CREATE INDEX IF NOT EXISTS "%s_%s" ON "%s" ("%s")' % (source, name, source, name))
+
+    # Yield pages of the records of a source: Compute endpoints are streamed page by page, other sources are read via their list method.
+
+    def source_pages(self, source, query_params=None):
+        source_definition = self.source(source)
+        if 'endpoint' in source_definition:
+            for _, _, page in self.pc_api.execute_compute_pages('GET', source_definition['endpoint'], query_params=query_params):
+                yield page
+        else:
+            list_read = getattr(self.pc_api, source_definition['method'])
+            yield (list_read(query_params=query_params) if query_params else list_read()) or []
+
+    # Return the query parameters of each source ({source: query_params}), validated before any source is refreshed.
+
+    def source_query_params(self, query_params):
+        for source, source_query_params in (query_params or {}).items():
+            source_definition = self.source(source)
+            if source_query_params and not ('endpoint' in source_definition or source_definition.get('query_params')):
+                raise ValueError('Source does not support query_params: %s' % source)
+        return query_params or {}
+
+    # Refresh the snapshot of each source (Default: all sources) not refreshed within 'max_age' seconds. Returns the snapshot (metadata) of each source.
+    # Query parameters are per source, for example: {'defenders': {'connected': 'true'}}
+
+    def refresh(self, sources=None, max_age=None, query_params=None):
+        if isinstance(sources, str):
+            sources = [sources]
+        query_params = self.source_query_params(query_params)
+        refreshed = {}
+        snapshots = {snapshot['source']: snapshot for snapshot in self.snapshots()}
+        for source in sources or list(self.sources):
+            snapshot = snapshots.get(source)
+            if max_age is not None and snapshot and snapshot['refreshed'] is not None and time.time() - snapshot['refreshed'] < max_age:
+                refreshed[source] = snapshot
+                continue
+            refreshed[source] = self.refresh_source(source, query_params.get(source))
+        return refreshed
+
+    # pylint: disable=too-many-locals
+    def refresh_source(self, source, query_params=None):
+        source_definition = self.source(source)
+        self.source_query_params({source: query_params})
+        columns = source_definition['columns']
+        start_time = time.time()
+        insert = 'INSERT OR REPLACE INTO "%s" (id, digest%s, document) VALUES (?, ?%s, ?)' % (source, ''.join(', "%s"' % name for name, _, _ in columns), ', ?' * len(columns))
+        with self._lock, self.connection:
+            self.create_table(source)
+            digests = dict(self.connection.execute('SELECT id, digest FROM "%s"' % source))
+            seen = set()
+            written = 0
+            for page in self.source_pages(source, query_params):
+                rows = []
+                for record in page or []:
+                    key = field_value(record, source_definition['key'])
+                    key = str(key) if key is not None else record_id(record)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    document = json.dumps(record, sort_keys=True, separators=(',', ':'), default=str)
+                    digest = hashlib.sha1(document.encode('utf-8')).hexdigest()
+                    if digests.get(key) == digest:
+                        continue
+                    values = []
+                    for _, path, column_type in columns:
+                        value = field_value(record, path)
+                        if value is not None and (column_type == 'JSON' or isinstance(value, (dict, list))):
+                            value = json.dumps(value, separators=(',', ':'))
+                        values.append(value)
+                    rows.append([key, digest] + values + [document])
+                self.connection.executemany(insert, rows)
+                written += len(rows)
+            # A filtered refresh does not return the records excluded by the filter, so records are only deleted by an unfiltered refresh.
+            deleted = [] if query_params else [[key] for key in digests if key not in seen]
+            self.connection.executemany('DELETE FROM "%s" WHERE id = ?' % source, deleted)
+            records = self.connection.execute('SELECT COUNT(*) FROM "%s"' % source).fetchone()[0]
+            if query_params:
+                refreshed = self.connection.execute('SELECT refreshed FROM snapshots WHERE source = ?', [source]).fetchone()
+                refreshed = refreshed[0] if refreshed else None
+            else:
+                refreshed = time.time()
+            snapshot = {'source': source, 'refreshed': refreshed, 'records': records, 'written': written, 'deleted': len(deleted), 'seconds': time.time() - start_time}
+            self.connection.execute('INSERT OR REPLACE INTO snapshots (source, refreshed, records, written, deleted, seconds) VALUES (:source, :refreshed, :records, :written, :deleted, :seconds)', snapshot)
+        return snapshot
+
+    def snapshots(self):
+        return self.query('SELECT * FROM snapshots ORDER BY source')
+
+    # Return the rows of a query (as dictionaries). For example:
+    #
+    #     store.query("SELECT hostname, version FROM defenders WHERE compare_versions(version, ?) < 0", ['32.03'])
+    #     store.query("SELECT h.hostname FROM hosts h, json_each(h.collections) c WHERE c.value = ?", ['Production'])
+
+    def query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self.connection.execute(sql, params)]
+
+    # Return the (JSON-decoded) records of a source, optionally filtered by a WHERE clause.
+
+    def documents(self, source, where=None, params=()):
+        self.source(source)
+        sql = 'SELECT document FROM "%s"' % source
+        if where:
+            sql = '%s WHERE %s' % (sql, where)
+        return [json.loads(row['document']) for row in self.query(sql, params)]
@@ -0,0 +1,140 @@
+""" Prisma Cloud Time Range Helpers """
+
+import calendar
+import re
+import time
+
+from datetime import datetime, timezone
+from functools import lru_cache
+
+# --Description-- #
+
+# Helpers for timestamps, and for the 'timeRange' parameter of alert and search requests, for example:
+#   {'type': 'relative', 'value': {'amount': 90, 'unit': 'day'}}
+#   {'type': 'absolute', 'value': {'startTime': 1700000000000, 'endTime': 1707776000000}}
+#   {'type': 'to_now',   'value': 'epoch'}
+# Times are epoch milliseconds.
+
+TIME_UNIT_MILLISECONDS = {
+    'minute': 60 * 1000,
+    'hour':   60 * 60 * 1000,
+    'day':    24 * 60 * 60 * 1000,
+    'week':   7 * 24 * 60 * 60 * 1000,
+    'month':  30 * 24 * 60 * 60 * 1000,
+    'year':   365 * 24 * 60 * 60 * 1000,
+}
+
+def now_milliseconds():
+    return int(time.time() * 1000)
+
+# Return the (start, end) of a time range, or None when a time range cannot be resolved (for example: 'to_now' the start of the current week).
+
+def time_range_bounds(time_range, now=None):
+    if not time_range:
+        return None
+    if now is None:
+        now = now_milliseconds()
+    time_range_type = time_range.get('type')
+    value = time_range.get('value')
+    if time_range_type == 'absolute' and isinstance(value, dict):
+        if 'startTime' in value and 'endTime' in value:
+            return int(value['startTime']), int(value['endTime'])
+    if time_range_type == 'relative' and isinstance(value, dict):
+        unit = TIME_UNIT_MILLISECONDS.get(value.get('unit'))
+        if unit and 'amount' in value:
+            return now - int(value['amount']) * unit, now
+    if time_range_type == 'to_now' and value == 'epoch':
+        return 0, now
+    return None
+
+def absolute_time_range(start, end):
+    return {'type': 'absolute', 'value': {'startTime': int(start), 'endTime': int(end)}}
+
+# Split (start, end) into contiguous sub-windows of (nearly) equal duration.
+
+def split_time_bounds(start, end, shards):
+    shards = max(1, min(int(shards), end - start)) if end > start else 1
+    boundaries = [start + (end - start) * shard // shards for shard in range(shards)] + [end]
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+# Compute timestamps are RFC 3339 strings, for example: '2024-01-31T12:34:56.123456789Z' or '2024-01-31T12:34:56.123-08:00'.
+# UTC timestamps (the common case) are parsed by position, with the epoch of each date cached.
+# Others are parsed via a regular expression (rather than datetime.fromisoformat(), which requires Python 3.7, and does not support nanoseconds).
+
+TIMESTAMP = re.compile(r'^(\d{4})-(\d{2})-(\d{2})[Tt ](\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?(?:([Zz])|([+-])(\d{2}):?(\d{2}))?$')
+
+@lru_cache(maxsize=1024)
+def date_epoch(year, month, day):
+    return calendar.timegm((year, month, day, 0, 0, 0, 0, 0, 0))
+
+# Return a timestamp as epoch seconds, or None if it cannot be parsed.
+
+def parse_timestamp(value):
+    if not value or not isinstance(value, str):
+        return None
+    # pylint: disable=too-many-boolean-expressions
+    if len(value) >= 20 and value[-1] in 'Zz' and value[4] == '-' and value[7] == '-' and value[10] in 'Tt ' and value[13] == ':' and value[16] == ':' and value[19] in '.Zz':
+        fraction = value[20:-1]
+        if not fraction or fraction.isdigit():
+            try:
+                epoch_seconds = date_epoch(int(value[:4]), int(value[5:7]), int(value[8:10])) + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+            except ValueError:
+                epoch_seconds = None
+            if epoch_seconds is not None:
+                if fraction:
+                    epoch_seconds += int(fraction[:6].ljust(6, '0')) / 1000000
+                return epoch_seconds
+    match = TIMESTAMP.match(value.strip())
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction, _, offset_sign, offset_hours, offset_minutes = match.groups()
+    try:
+        epoch_seconds = calendar.timegm((int(year), int(month), int(day), int(hour), int(minute), int(second), 0, 0, 0))
+    except ValueError:
+        return None
+    if fraction:
+        epoch_seconds += int(fraction[:6].ljust(6, '0')) / 1000000
+    if offset_sign:
+        offset = int(offset_hours) * 3600 + int(offset_minutes) * 60
+        epoch_seconds += -offset if offset_sign == '+' else offset
+    return epoch_seconds
+
+# Return the time of a record in a time-ordered list (or of the nearest preceding record with a time), or None.
+
+def ordered_record_time(records, index, time_field='time'):
+    while index >= 0:
+        epoch_seconds = parse_timestamp(records[index].get(time_field))
+        if epoch_seconds is not None:
+            return epoch_seconds
+        index -= 1
+    return None
+
+# Return the index of the first record (in a list of records sorted by time, oldest first) with a time at or after 'epoch_seconds' (or after, with 'after').
+# A binary search: only the records probed are parsed.
+
+def bisect_records(records, epoch_seconds, time_field='time', after=False):
+    low, high = 0, len(records)
+    while low < high:
+        middle = (low + high) // 2
+        middle_epoch_seconds = ordered_record_time(records, middle, time_field)
+        if middle_epoch_seconds is None or middle_epoch_seconds < epoch_seconds or (after and middle_epoch_seconds == epoch_seconds):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+# Return the records (sorted by time, oldest first) from 'start' to 'end' (inclusive), as epoch seconds or timestamps.
+
+def records_between(records, start=None, end=None, time_field='time'):
+    if isinstance(start, str):
+        start = parse_timestamp(start)
+    if isinstance(end, str):
+        end = parse_timestamp(end)
+    low = bisect_records(records, start, time_field) if start is not None else 0
+    high = bisect_records(records, end, time_field, after=True) if end is not None else len(records)
+    return records[low:high]
+
+# Return epoch seconds as a Compute timestamp (UTC, with milliseconds).
+
+def format_timestamp(epoch_seconds):
+    return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
@@ -0,0 +1,140 @@
+""" Prisma Cloud Page Size Tuner Class """
+
+import atexit
+import json
+import os
+
+from threading import Lock
+
+# --Description-- #
+
+# Page sizes (the 'limit' of each paginated request) by endpoint family.
+# Defaults are used unless a page size is configured for an endpoint (via the 'page_limits' setting) or learned by the tuner.
+# Maximums are the server maximums, which neither configured nor learned page sizes exceed.
+
+PAGE_LIMIT_DEFAULTS = {
+    'compute':       50,
+    'code_security': 50,
+    'rql':           1000,
+    'alert':         10000,
+}
+
+PAGE_LIMIT_MAXIMUMS = {
+    'compute':       50,
+    'code_security': 50,
+    'rql':           1000,
+    'alert':         10000,
+}
+
+# The smallest page size the tuner will try.
+
+PAGE_LIMIT_MINIMUM = 10
+
+# Measurements are keyed by console and endpoint (for example: 'us-east1.cloud.twistlock.com/us-1-123456789/api/v1/images'),
+# so that the instances in a pool (or reconfigured for another tenant) do not mix their measurements.
+#
+# The tuner measures the throughput (records per second) of pages requested with each candidate page size
+# (the maximum, and successively halved sizes), converging on the candidate with the highest throughput,
+# and persisting measurements so that later runs start from what was learned.
+# Only full pages are measured, as a short final page understates throughput.
+
+class PageSizeTuner():
+    """ Prisma Cloud Page Size Tuner Class """
+
+    def __init__(self, file_name=None, candidates=3, samples=2, smoothing=0.3, save_at_exit=True):
+        self.file_name  = file_name
+        self.candidates = candidates
+        self.samples    = samples
+        self.smoothing  = smoothing
+        self.stats      = {}
+        self._lock      = Lock()
+        if self.file_name:
+            self.load()
+            if save_at_exit:
+                atexit.register(self.save)
+
+    def candidate_limits(self, maximum):
+        limits = []
+        limit = maximum
+        while limit >= PAGE_LIMIT_MINIMUM and len(limits) < self.candidates:
+            limits.append(limit)
+            limit = limit // 2
+        return limits or [maximum]
+
+    # Return a candidate that still needs measurements, or the candidate with the highest throughput.
+
+    def choose(self, endpoint, maximum):
+        candidates = self.candidate_limits(maximum)
+        with self._lock:
+            endpoint_stats = self.stats.get(endpoint, {})
+            for limit in candidates:
+                if endpoint_stats.get(str(limit), {}).get('pages', 0) < self.samples:
+                    return limit
+            return max(candidates, key=lambda limit: endpoint_stats[str(limit)]['records_per_second'])
+
+    def record(self, endpoint, limit, records, seconds, size=0):
+        if records < limit or seconds <= 0:
+            return
+        with self._lock:
+            limit_stats = self.stats.setdefault(endpoint, {}).setdefault(str(limit), {'pages': 0, 'records_per_second': 0.0, 'seconds_per_page': 0.0, 'bytes_per_page': 0.0})
+            records_per_second = records / seconds
+            if limit_stats['pages'] == 0:
+                limit_stats['records_per_second'] = records_per_second
+                limit_stats['seconds_per_page'] = seconds
+                limit_stats['bytes_per_page'] = size
+            else:
+                # Exponentially weighted moving averages, so that measurements track changes in console performance.
+                limit_stats['records_per_second'] += self.smoothing * (records_per_second - limit_stats['records_per_second'])
+                limit_stats['seconds_per_page'] += self.smoothing * (seconds - limit_stats['seconds_per_page'])
+                limit_stats['bytes_per_page'] += self.smoothing * (size - limit_stats['bytes_per_page'])
+            limit_stats['pages'] += 1
+
+    # Return the best measured page size per endpoint.
+
+    def learned_limits(self):
+        learned = {}
+        with self._lock:
+            for endpoint, endpoint_stats in self.stats.items():
+                measured = {limit: limit_stats for limit, limit_stats in endpoint_stats.items() if limit_stats['pages'] >= self.samples}
+                if measured:
+                    learned[endpoint] = int(max(measured, key=lambda limit: measured[limit]['records_per_second']))
+        return learned
+
+    def load(self):
+        try:
+            with open(self.file_name, 'r') as stats_file:
+                stats = json.load(stats_file)
+        # pylint: disable=broad-except
+        except Exception:
+            return
+        with self._lock:
+            self.stats = stats
+
+    def save(self):
+        if not self.file_name:
+            return
+        with self._lock:
+            stats = json.dumps(self.stats, indent=4)
+        try:
+            directory = os.path.dirname(self.file_name)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            temporary_file_name = '%s.%s' % (self.file_name, os.getpid())
+            with open(temporary_file_name, 'w') as stats_file:
+                stats_file.write(stats)
+            os.replace(temporary_file_name, self.file_name)
+        # pylint: disable=broad-except
+        except Exception:
+            pass
+
+# One tuner per file, shared by all instances configured with that file, so that instances do not overwrite each other's measurements,
+# and the file is saved (at exit) once.
+
+PAGE_SIZE_TUNERS = {}
+PAGE_SIZE_TUNERS_LOCK = Lock()
+
+def shared_page_size_tuner(file_name):
+    with PAGE_SIZE_TUNERS_LOCK:
+        if file_name not in PAGE_SIZE_TUNERS:
+            PAGE_SIZE_TUNERS[file_name] = PageSizeTuner(file_name)
+        return PAGE_SIZE_TUNERS[file_name]
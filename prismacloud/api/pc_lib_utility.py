@@ -7,8 +7,11 @@ import csv
 import json
 import os
 import sys
+import threading
+import time
 
 from update_checker import UpdateChecker
+from .pc_lib_collection import IndexedCollection
 from .version import version as api_version
 
 try:
@@ -38,15 +41,102 @@ class PrismaCloudUtility():
     CONFIG_DIRECTORY = os.path.join(homefolder, '.prismacloud')
     DEFAULT_CONFIG_FILE = os.path.join(CONFIG_DIRECTORY, 'credentials.json')
 
+    # Check PyPI for a newer version of this package.
+    # The check runs in a background thread and its result is cached on disk, so script startup never waits on PyPI.
+    # Disable via the PC_VERSION_CHECK environment variable, or a 'version_check' key in the default settings file.
+    # The cache TTL and the deadline default to these values, or the PC_VERSION_CHECK_TTL and PC_VERSION_CHECK_DEADLINE environment variables.
+
+    VERSION_CHECK_CACHE_FILE = os.path.join(CONFIG_DIRECTORY, 'version_check.json')
+    VERSION_CHECK_CACHE_TTL = 86400
+    VERSION_CHECK_DEADLINE = 0.25
+
     @classmethod
-    def package_version_check(cls, package_name='prismacloud-api'):
+    def package_version_check(cls, package_name='prismacloud-api', enabled=None):
         package_version_message = 'version: %s' % api_version
-        checker = UpdateChecker()
-        result = checker.check(package_name, api_version)
-        if result:
-            package_version_message = "version update available: %s -> %s\nrun 'pip3 install --upgrade %s' to update" % (api_version, result.available_version, package_name)
+        if enabled is None:
+            enabled = cls.package_version_check_enabled()
+        if not enabled:
+            return package_version_message
+        cached_check = cls.read_version_check_cache(package_name)
+        if cached_check is None:
+            checker_thread = threading.Thread(target=cls.update_version_check_cache, args=(package_name,), daemon=True)
+            checker_thread.start()
+            checker_thread.join(cls.version_check_setting('PC_VERSION_CHECK_DEADLINE', cls.VERSION_CHECK_DEADLINE))
+            cached_check = cls.read_version_check_cache(package_name)
+        if cached_check and cached_check.get('available_version'):
+            package_version_message = "version update available: %s -> %s\nrun 'pip3 install --upgrade %s' to update" % (api_version, cached_check['available_version'], package_name)
         return package_version_message
 
+    @classmethod
+    def package_version_check_enabled(cls):
+        if os.environ.get('PC_VERSION_CHECK', '').lower() in ['0', 'false', 'no', 'off']:
+            return False
+        try:
+            with open(cls.DEFAULT_CONFIG_FILE, 'r') as settings_file:
+                settings = json.load(settings_file)
+            if str(settings.get('version_check', True)).lower() in ['0', 'false', 'no', 'off']:
+                return False
+        # pylint: disable=broad-except
+        except Exception:
+            pass
+        return True
+
+    # Return the (non-negative number) value of an environment variable, or the default if it is not set or not valid, as the check is optional.
+
+    @classmethod
+    def version_check_setting(cls, name, default):
+        try:
+            value = float(os.environ.get(name, default))
+        except ValueError:
+            return default
+        return value if value >= 0 else default
+
+    # Return the cached check if it is for this package and version, and has not expired.
+
+    @classmethod
+    def read_version_check_cache(cls, package_name):
+        try:
+            with open(cls.VERSION_CHECK_CACHE_FILE, 'r') as cache_file:
+                cached_check = json.load(cache_file)
+        # pylint: disable=broad-except
+        except Exception:
+            return None
+        if cached_check.get('package_name') != package_name or cached_check.get('running_version') != api_version:
+            return None
+        if time.time() - cached_check.get('checked', 0) > cls.version_check_setting('PC_VERSION_CHECK_TTL', cls.VERSION_CHECK_CACHE_TTL):
+            return None
+        return cached_check
+
+    # Failed checks (for example, when air-gapped) are also cached, to avoid retrying on every run.
+
+    @classmethod
+    def update_version_check_cache(cls, package_name):
+        available_version = None
+        try:
+            result = UpdateChecker().check(package_name=package_name, package_version=api_version)
+            if result:
+                available_version = result.available_version
+        # pylint: disable=broad-except
+        except Exception:
+            pass
+        cached_check = {
+            'package_name':      package_name,
+            'running_version':   api_version,
+            'available_version': available_version,
+            'checked':           time.time()
+        }
+        try:
+            if not os.path.exists(cls.CONFIG_DIRECTORY):
+                os.makedirs(cls.CONFIG_DIRECTORY)
+            temporary_file_name = '%s.%s' % (cls.VERSION_CHECK_CACHE_FILE, os.getpid())
+            with open(temporary_file_name, 'w') as cache_file:
+                json.dump(cached_check, cache_file)
+            os.replace(temporary_file_name, cls.VERSION_CHECK_CACHE_FILE)
+        # pylint: disable=broad-except
+        except Exception:
+            pass
+        return cached_check
+
     # Default command line arguments.
     # (Sync with pcs_configure.py.)
 
@@ -352,9 +442,12 @@ class PrismaCloudUtility():
             self.error_and_exit(500, 'Failed to write JSON file.', ex)
 
     # Search list for a field with a certain value and return another field value from that object.
+    # For repeated searches of a list, use an IndexedCollection (see pc_lib_collection): searches of an IndexedCollection use its indexes, rather than a linear scan.
 
     @classmethod
     def search_list_value(cls, list_to_search, field_to_search, field_to_return, search_value):
+        if isinstance(list_to_search, IndexedCollection):
+            return list_to_search.find_value(field_to_search, search_value, field_to_return)
         item_to_return = None
         for source_item in list_to_search:
             if field_to_search in source_item:
@@ -367,6 +460,8 @@ class PrismaCloudUtility():
 
     @classmethod
     def search_list_value_lower(cls, list_to_search, field_to_search, field_to_return, search_value):
+        if isinstance(list_to_search, IndexedCollection):
+            return list_to_search.find_value(field_to_search, search_value, field_to_return, lower=True)
         item_to_return = None
         search_value = search_value.lower()
         for source_item in list_to_search:
@@ -380,6 +475,8 @@ class PrismaCloudUtility():
 
     @classmethod
     def search_list_object(cls, list_to_search, field_to_search, search_value):
+        if isinstance(list_to_search, IndexedCollection):
+            return list_to_search.find(field_to_search, search_value)
         object_to_return = None
         for source_item in list_to_search:
             if field_to_search in source_item:
@@ -392,6 +489,8 @@ class PrismaCloudUtility():
 
     @classmethod
     def search_list_object_lower(cls, list_to_search, field_to_search, search_value):
+        if isinstance(list_to_search, IndexedCollection):
+            return list_to_search.find(field_to_search, search_value, lower=True)
         object_to_return = None
         search_value = search_value.lower()
         for source_item in list_to_search:
@@ -405,25 +504,27 @@ class PrismaCloudUtility():
 
     @classmethod
     def search_list_list(cls, list_to_search, field_to_search, search_value):
+        if isinstance(list_to_search, IndexedCollection):
+            return list_to_search.find_all(field_to_search, search_value)
         object_list_to_return = []
         for source_item in list_to_search:
             if field_to_search in source_item:
                 if source_item[field_to_search] == search_value:
                     object_list_to_return.append(source_item)
-                    break
         return object_list_to_return
 
     # Search list for a field with a certain value and return a list of all objects that match (case insensitive).
 
     @classmethod
     def search_list_list_lower(cls, list_to_search, field_to_search, search_value):
+        if isinstance(list_to_search, IndexedCollection):
+            return list_to_search.find_all(field_to_search, search_value, lower=True)
         object_list_to_return = []
         search_value = search_value.lower()
         for source_item in list_to_search:
             if field_to_search in source_item:
                 if source_item[field_to_search].lower() == search_value:
                     object_list_to_return.append(source_item)
-                    break
         return object_list_to_return
 
     # Exit handler (Error).
@@ -11,12 +11,6 @@ class PrismaCloudAPIPCCSMixin():
     # pylint: disable=too-many-arguments,too-many-branches,too-many-locals,too-many-statements
     def execute_code_security(self, action, endpoint, query_params=None, body_params=None, request_headers=None, force=False, paginated=False):
         self.suppress_warnings_when_verify_false()
-        if not self.token:
-            self.login()
-        if int(time.time() - self.token_timer) > self.token_limit:
-            self.extend_login()
-        if not request_headers:
-            request_headers = {'Content-Type': 'application/json'}
         if body_params:
             body_params_json = json.dumps(body_params)
         else:
@@ -24,33 +18,38 @@ class PrismaCloudAPIPCCSMixin():
         # Endpoints that return large numbers of results use a 'hasNext' key.
         # Pagination is via query parameters for both GET and POST, and appears to be specific to "List File Errors - POST".
         offset = 0
-        limit = 50
+        limit = self.page_limit(endpoint, 'code_security')
         more = False
         results = []
         while offset == 0 or more is True:
-            if int(time.time() - self.token_timer) > self.token_limit:
-                self.extend_login()
+            token = self.token_check()
             if paginated:
+                limit = self.page_limit(endpoint, 'code_security')
                 url = 'https://%s/%s?limit=%s&offset=%s' % (self.api, endpoint, limit, offset)
             else:
                 url = 'https://%s/%s' % (self.api, endpoint)
-            if self.token:
-                request_headers['authorization'] = self.token
+            request_headers_with_auth = self.build_request_headers(request_headers, {'authorization': token} if token else None)
+            body_params_data, request_headers_with_auth = self.compress_request_body(body_params_json, request_headers_with_auth)
             self.debug_print('API URL: %s' % url)
-            self.debug_print('API Headers: %s' % request_headers)
+            self.debug_print('API Headers: %s' % request_headers_with_auth)
             self.debug_print('API Query Params: %s' % query_params)
             self.debug_print('API Body Params: %s' % body_params_json)
-            # Add User-Agent to the headers
-            request_headers['User-Agent'] = self.user_agent
-            api_response = requests.request(action, url, headers=request_headers, params=query_params, data=body_params_json, verify=self.verify, timeout=self.timeout)
+            page_start_time = time.time()
+            api_response = requests.request(action, url, headers=request_headers_with_auth, params=query_params, data=body_params_data, verify=self.verify, timeout=self.timeout)
+            page_seconds = time.time() - page_start_time
             self.debug_print('API Response Status Code: %s' % api_response.status_code)
             self.debug_print('API Response Headers: (%s)' % api_response.headers)
             if api_response.status_code in self.retry_status_codes:
                 for exponential_wait in self.retry_waits:
+                    # Record each attempt that is retried (with its resent body).
+                    self.record_transfer(endpoint, api_response, body_params_data)
                     time.sleep(exponential_wait)
-                    api_response = requests.request(action, url, headers=request_headers, params=query_params, data=body_params_json, verify=self.verify, timeout=self.timeout)
+                    page_start_time = time.time()
+                    api_response = requests.request(action, url, headers=request_headers_with_auth, params=query_params, data=body_params_data, verify=self.verify, timeout=self.timeout)
+                    page_seconds = time.time() - page_start_time
                     if api_response.ok:
                         break # retry loop
+            self.record_transfer(endpoint, api_response, body_params_data)
             if api_response.ok:
                 if not api_response.content:
                     return None
@@ -71,6 +70,7 @@ class PrismaCloudAPIPCCSMixin():
                         return results # or continue
                     self.error_and_exit(api_response.status_code, 'JSON raised ValueError, API: (%s) with query params: (%s) and body params: (%s) parsing response: (%s)' % (url, query_params, body_params, api_response.content))
                 if paginated:
+                    self.record_page(endpoint, limit, len(result['data']), page_seconds, len(api_response.content), 'code_security')
                     results.extend(result['data'])
                     if 'hasNext' in result:
                         self.debug_print('Retrieving Next Page of Results')
@@ -7,7 +7,7 @@ import time
 import requests
 
 # pylint: disable=import-error
-from prismacloud.api import pc_api, pc_utility
+from prismacloud.api import pc_api, pc_utility, IndexedCollection
 
 # TODO: Do not update policy.rule.name when policy.systemDefault == True ?
 
@@ -136,7 +136,7 @@ print()
 
 print('API - Getting the newly created Compliance Standard Requirements ...', end='')
 time.sleep(WAIT_TIMER)
-compliance_requirement_list_new = pc_api.compliance_standard_requirement_list_read(compliance_standard_new['id'])
+compliance_requirement_list_new = IndexedCollection(pc_api.compliance_standard_requirement_list_read(compliance_standard_new['id']))
 print(' done.')
 print()
 
@@ -3,6 +3,9 @@
 # Use this script to forward Audits, and Console History and Logs from Prisma Cloud Compute to a SIEM.
 # It is expected to be called once an hour, by default, to read from the Prisma Cloud API and write to your SIEM API.
 # It depends upon the SIEM to deduplicate data, and requires you to modify the `send_data_to_siem()` function for your SIEM API.
+# With --checkpoint_file, it collects only the records since the previous run (the SIEM does not need to deduplicate data),
+# and --hours and --minutes_overlap only apply to the first run. Checkpoints are committed only after records are sent,
+# so configure SIEM_URL (or `req_url` in `outbound_api_call()`): until then, records are not sent and checkpoints are not committed.
 
 import concurrent.futures
 import json
@@ -14,24 +17,31 @@ from typing import Union
 
 
 from datetime import datetime, timedelta, timezone
-from dateutil import parser, tz
 
 import requests
 
 # pylint: disable=import-error
-from prismacloud.api import pc_api, pc_utility
+from prismacloud.api import pc_api, pc_utility, PrismaCloudBatchSink
+from prismacloud.api.pc_lib_checkpoint import CheckpointStore
 
 # --Configuration-- #
 
 ENABLE_PROFILING = False
 OUTER_CONCURRENY = 1
 INNER_CONCURRENY = 1
+AUDIT_CONCURRENCY = 8
 OUTPUT_DIRECTORY = '/tmp/prisma-cloud-compute-data'
 
 DEFAULT_HOURS = 1
 DEFAULT_MINUTES_OVERLAP = 1
 DEFAULT_CONSOLE_LOG_LIMIT = 32768
 
+# Configure SIEM_URL to send records in batches (NDJSON, gzip-compressed) via PrismaCloudBatchSink, rather than via outbound_api_call().
+SIEM_URL = ''
+SIEM_HEADERS = {}
+SIEM_BATCH_RECORDS = 500
+SIEM_CONCURRENCY = 2
+
 this_parser = pc_utility.get_arg_parser()
 this_parser.add_argument(
     '--hours',
@@ -71,6 +81,15 @@ this_parser.add_argument(
     type=int,
     default=DEFAULT_CONSOLE_LOG_LIMIT,
     help=f'(Optional) - Number of messages to collect, requires --console_logs. (Default: {DEFAULT_CONSOLE_LOG_LIMIT})')
+this_parser.add_argument(
+    '--console_logs_follow',
+    type=int,
+    metavar='SECONDS',
+    help='(Optional) - Follow Console Logs, sending new messages every SECONDS, until interrupted. (Default: disabled)')
+this_parser.add_argument(
+    '--checkpoint_file',
+    type=str,
+    help='(Optional) - Collect incrementally, since the previous run, recording the newest record collected in this file. (Default: disabled)')
 this_parser.add_argument(
     '-v', '--verbose',
     action='store_true',
@@ -79,6 +98,8 @@ args = this_parser.parse_args()
 
 # -- User Defined Functions-- #
 
+# Return True if the data was sent.
+
 def outbound_api_call(data_type:str, data: Union[list, dict]):
     # Transform data into the format expected by the request to your SIEM.
     data['event'] = data_type
@@ -98,7 +119,7 @@ def outbound_api_call(data_type:str, data: Union[list, dict]):
     if not req_url:
         print(f'        OUTBOUND_API_CALL for {data_type} STUB ...')
         profile_log('OUTBOUND_API_CALL', 'FINISHED')
-        return
+        return False
     print(f'        OUTBOUND_API_CALL for {data_type} ...')
     # Add User-Agent to the headers
     req_headers['User-Agent'] = self.user_agent
@@ -113,38 +134,74 @@ def outbound_api_call(data_type:str, data: Union[list, dict]):
     if not api_response.ok:
         print(f'API: {req_url} responded with an error: {api_response.status_code}')
     profile_log('OUTBOUND_API_CALL', 'FINISHED')
+    return api_response.ok
 
 # --Functions-- #
 
+def process_incremental(collection: str, data_type: str, query_params: dict, start: str):
+    # Commit the checkpoint only after the data has been sent, so that a failure results in the data being sent again, rather than a gap.
+    records, checkpoint = pc_api.compute_incremental_read(collection, checkpoint_store, query_params=query_params, start=start, overlap=args.minutes_overlap * 60)
+    # Commit only after the records have been sent.
+    if not send_data_to_siem(data_type=data_type, data=records):
+        print(f'    NOT COMMITTING ({data_type}) checkpoint: records failed to send')
+        return
+    checkpoint_store.commit(collection, checkpoint)
+
 def process_audit_events(audit_type: str, query_params: dict):
+    if checkpoint_store:
+        process_incremental('audits/%s' % audit_type, audit_type, query_params, query_params['from'])
+        return
     audits = pc_api.audits_list_read(audit_type=audit_type, query_params=query_params)
     send_data_to_siem(data_type=audit_type, data=audits)
 
 def process_host_forensic_activities(query_params: dict):
+    if checkpoint_store:
+        process_incremental('forensic/activities', 'forensic/activities', query_params, query_params['from'])
+        return
     audits = pc_api.host_forensic_activities_list_read(query_params=query_params)
     send_data_to_siem(data_type='forensic/activities', data=audits)
 
 def process_console_history(query_params: dict):
+    if checkpoint_store:
+        process_incremental('audits/mgmt', 'audits/mgmt', query_params, query_params['from'])
+        return
     audits = pc_api.console_history_list_read(query_params=query_params)
     send_data_to_siem(data_type='audits/mgmt', data=audits)
 
 def process_console_logs(query_params: dict, time_range: dict):
-    matching_console_logs = []
-    console_logs = pc_api.console_logs_list_read(query_params=query_params)
-    for this_log in console_logs:
-        if this_log['time']:
-            log_datetime = parser.isoparse(this_log['time']).astimezone(tz.tzlocal())
-            if time_range['from'] <= log_datetime <= time_range['to']:
-                matching_console_logs.append(this_log)
+    if checkpoint_store:
+        process_incremental('logs/console', 'logs/console', query_params, datetime_range['from'])
+        return
+    matching_console_logs = pc_api.console_logs_read_since(since=time_range['from'], until=time_range['to'], query_params=query_params)
     send_data_to_siem(data_type='logs/console', data=matching_console_logs)
 
+def follow_console_logs(interval: int):
+    checkpoint = checkpoint_store.get('logs/console') if checkpoint_store else None
+    for console_logs, checkpoint in pc_api.console_logs_follow(checkpoint=checkpoint, since=datetime_range['from'], interval=interval, max_lines=args.console_logs_limit, overlap=args.minutes_overlap * 60):
+        # Commit only after the records have been sent: on failure, stop following (the next run resends from the last committed checkpoint).
+        if not send_data_to_siem(data_type='logs/console', data=console_logs):
+            print('    NOT COMMITTING (logs/console) checkpoint: records failed to send, stopping')
+            return
+        if checkpoint_store:
+            checkpoint_store.commit('logs/console', checkpoint)
+
 ####
 
+# Return True if all of the data was sent (via SIEM_URL, or via outbound_api_call(), which is a stub until configured).
+
 def send_data_to_siem(data_type: str, data: list, send_as_list=False):
     profile_log(data_type, 'STARTING')
     print(f'    PROCESSING {len(data)} ({data_type}) records')
-    if send_as_list:
-        outbound_api_call(data_type, data)
+    if siem_sink:
+        records_failed = siem_sink.metrics['records_failed']
+        for data_item in data:
+            data_item['event'] = data_type
+            if args.verbose:
+                print(data_item)
+            siem_sink.put(data_item)
+        sent = siem_sink.flush() and siem_sink.metrics['records_failed'] == records_failed
+    elif send_as_list:
+        sent = outbound_api_call(data_type, data)
     else:
         inner_futures = []
         with concurrent.futures.ThreadPoolExecutor(INNER_CONCURRENY) as inner_executor:
@@ -155,7 +212,9 @@ def send_data_to_siem(data_type: str, data: list, send_as_list=False):
                     )
                 )
             concurrent.futures.wait(inner_futures)
+        sent = all(future.exception() is None and future.result() for future in inner_futures)
     profile_log(data_type, 'FINISHED')
+    return sent
 
 ####
 
@@ -184,6 +243,10 @@ def profile_log(detail: str, state: str, initialize=False):
 settings = pc_utility.get_settings(args)
 pc_api.configure(settings)
 
+checkpoint_store = CheckpointStore(args.checkpoint_file) if args.checkpoint_file else None
+
+siem_sink = PrismaCloudBatchSink(SIEM_URL, headers=SIEM_HEADERS, compress=True, batch_records=SIEM_BATCH_RECORDS, workers=SIEM_CONCURRENCY) if SIEM_URL else None
+
 # --Main-- #
 
 profile_log('Collect Compute Audits, History, and Logs', 'STARTING', True)
@@ -204,11 +267,6 @@ datetime_range = {
     'sort': 'time'
 }
 
-console_logs_datetime_range = {
-    'from':  date_time_0,
-    'to':    date_time_1,
-}
-
 console_logs_query_params = {
     'lines': args.console_logs_limit
 }
@@ -226,14 +284,20 @@ with concurrent.futures.ThreadPoolExecutor(OUTER_CONCURRENY) as executor:
     if args.audit_events:
         print('Collecting Audits')
         print()
-        for this_audit_type in pc_api.compute_audit_types():
-            if this_audit_type in args.audit_types_filter:
-                outer_futures.append(executor.submit(
-                        # aka: process_audit_events(this_audit_type, datetime_range)
-                        process_audit_events, this_audit_type, datetime_range
-                    )
-            )
-        concurrent.futures.wait(outer_futures)
+        if checkpoint_store:
+            for this_audit_type in pc_api.compute_audit_types():
+                if this_audit_type in args.audit_types_filter:
+                    outer_futures.append(executor.submit(
+                            # aka: process_audit_events(this_audit_type, datetime_range)
+                            process_audit_events, this_audit_type, datetime_range
+                        )
+                )
+            concurrent.futures.wait(outer_futures)
+        else:
+            # All audit types, sharded by time, within one concurrency budget.
+            audit_types = [this_audit_type for this_audit_type in pc_api.compute_audit_types() if this_audit_type in args.audit_types_filter]
+            for this_audit_type, audits in pc_api.audits_bulk_read(audit_types, start=datetime_range['from'], end=datetime_range['to'], max_workers=AUDIT_CONCURRENCY):
+                send_data_to_siem(data_type=this_audit_type, data=audits)
         print()
 
     if args.host_forensic_activities:
@@ -260,13 +324,26 @@ with concurrent.futures.ThreadPoolExecutor(OUTER_CONCURRENY) as executor:
         print(f'Collecting Console Logs (Limit: {args.console_logs_limit})')
         print()
         outer_futures.append(executor.submit(
-                # aka: process_console_logs(console_logs_query_params, console_logs_datetime_range)
-                process_console_logs, console_logs_query_params, console_logs_datetime_range
+                # aka: process_console_logs(console_logs_query_params, datetime_range)
+                process_console_logs, console_logs_query_params, datetime_range
             )
         )
         print()
     concurrent.futures.wait(outer_futures)
 
+if args.console_logs_follow:
+    print(f'Following Console Logs (every {args.console_logs_follow} seconds, interrupt to stop)')
+    print()
+    try:
+        follow_console_logs(args.console_logs_follow)
+    except KeyboardInterrupt:
+        print()
+
+if siem_sink:
+    siem_sink.close()
+    print(siem_sink)
+    print()
+
 profile_log('Collect Compute Audits, History, and Logs', 'FINISHED')
 
 print('Done')
@@ -8,6 +8,7 @@ from dateutil import tz
 
 # pylint: disable=import-error
 from prismacloud.api import pc_api, pc_utility
+from prismacloud.api.pc_lib_join import key_index
 
 # --Configuration-- #
 
@@ -67,10 +68,7 @@ print()
 
 print(hosts, file=open('hosts.txt', 'w'))
 
-hosts_dictionary = {}
-for host in hosts:
-    # _id or hostname ?
-    hosts_dictionary[host['_id']] = host
+hosts_dictionary = key_index(hosts, '_id', unique=True)
 
 # https://prisma.pan.dev/api/cloud/cwpp/images#operation/get-images
 print('Getting Deployed Images (please wait) ...', end='')
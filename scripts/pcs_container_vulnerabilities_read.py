@@ -4,6 +4,7 @@ import json
 
 # pylint: disable=import-error
 from prismacloud.api import pc_api, pc_utility
+from prismacloud.api.pc_lib_join import join_containers
 
 # --Configuration-- #
 
@@ -41,24 +42,18 @@ containers = pc_api.containers_list_read()
 print(' done.')
 print()
 
-images_dictionary = {}
-for image in images:
-    if pc_api.debug:
+if pc_api.debug:
+    for image in images:
         print(json.dumps(image, indent=4))
-    image_id = image['_id']
-    images_dictionary[image_id] = image
 
-for container in containers:
+for joined in join_containers(containers, images):
+    container = joined['container']
     if pc_api.debug:
         print(json.dumps(container, indent=4))
     if 'imageID' in container['info']:
-        image_id   = container['info']['imageID']
         image_name = container['info']['imageName']
-        if image_id in images_dictionary:
-            if 'vulnerabilities' in images_dictionary[image_id] and images_dictionary[image_id]['vulnerabilities']:
-                vulnerabilities = images_dictionary[image_id]['vulnerabilities']
-            else:
-                vulnerabilities = []
+        if joined['image'] and joined['image'].get('vulnerabilities'):
+            vulnerabilities = joined['image']['vulnerabilities']
         else:
             vulnerabilities = []
         vulnerabilities_by_container.append({'name': container['info']['name'], 'host': container['hostname'], 'image': image_name, 'vulnerabilities': vulnerabilities})
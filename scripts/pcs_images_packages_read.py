@@ -1,9 +1,10 @@
 """ Get a list of Packages in CI, Registry, Deployed, or all Images """
 
-from packaging import version
+import os
 
 # pylint: disable=import-error
 from prismacloud.api import pc_api, pc_utility
+from prismacloud.api.pc_lib_packages import PrismaCloudPackageIndex
 
 # --Configuration-- #
 
@@ -45,6 +46,16 @@ parser.add_argument(
     action="store_true",
     help="(Optional) - Output results to CSV files ('ci.csv', 'registry.csv', 'deployed.csv')."
 )
+parser.add_argument(
+    '--index_file',
+    type=str,
+    help="(Optional) - Search the package index in this file (for example: 'packages.json.gz'), if it exists, rather than reading the images. Otherwise, save the package index to this file."
+)
+parser.add_argument(
+    '--prefix_match_name',
+    default=False,
+    action="store_true",
+    help='(Optional) - Package name must start with the Package name specified.')
 args = parser.parse_args()
 
 search_package_name    = None
@@ -60,35 +71,6 @@ else:
 
 # --Helpers-- #
 
-def optional_print(txt='', mode=True):
-    if mode:
-        print(txt)
-
-def package_name_matches(comparison_exact, search_name, package_name):
-    if not search_name or not package_name:
-        return False
-    if comparison_exact:
-        if search_name == package_name:
-            return True
-    else:
-        if search_name in package_name:
-            return True
-    return False
-
-def package_version_matches(comparison_operator, search_version, package_version):
-    if not search_version or not package_version:
-        return False
-    search_semver = version.parse(search_version)
-    package_semver = version.parse(package_version)
-    # In the future, use match/case provided by Python 3.10.
-    if comparison_operator == 'eq' and search_semver == package_semver:
-        return True
-    if comparison_operator == 'gt' and search_semver < package_semver:
-        return True
-    if comparison_operator == 'lt' and search_semver > package_semver:
-        return True
-    return False
-
 # Write a header and an array of data to a CSV file.
 
 def write_file(file_name, header, data):
@@ -96,101 +78,43 @@ def write_file(file_name, header, data):
         data_file.write('%s\n' % header)
         data_file.write('\n'.join(data))
 
-# Parse response from the API.
-
-# pylint: disable=too-many-branches
-def parse_images(images, output_mode, search_package_type, search_exact_name, search_name, search_comparison_operator, search_version):
-    normalized_images = {}
-    images_with_package = []
-    for image in images:
-        image_id = image['_id']
-        if 'entityInfo' in image:
-            try:
-                image_ii = '%s %s' % (image['entityInfo']['instances'][0]['image'], image['entityInfo']['instances'][0]['host'])
-            except IndexError:
-                image_ii = ''
-            except KeyError:
-                image_ii = ''
-            except TypeError:
-                image_ii = ''
-            if 'applications' in image:
-                applications = image['applications']
-            else:
-                applications = []
-            normalized_images[image_id] = {
-                'id':        image_id,
-                'instance':  image_ii,
-                'instances': image['entityInfo']['instances'],
-                'packages':  image['entityInfo']['packages'],
-                'binaries': image['entityInfo']['binaries'],
-                'applications': applications}
-        else:
-            try:
-                image_ii = '%s %s' % (image['instances'][0]['image'], image['instances'][0]['host'])
-            except IndexError:
-                image_ii = ''
-            except KeyError:
-                image_ii = ''
-            except TypeError:
-                image_ii = ''
-            if 'applications' in image:
-                applications = image['applications']
-            else:
-                applications = []
-            normalized_images[image_id] = {
-                'id':        image_id,
-                'instance':  image_ii,
-                'instances': image['instances'],
-                'packages':  image['packages'],
-                'binaries': image['binaries'],
-                'applications': applications}
+# Output the packages of each image in the index.
 
-    optional_print(mode=search_all_packages)
-    for image in normalized_images:
-        optional_print('Image', mode=output_mode)
-        optional_print('ID: %s' % image, mode=output_mode)
-        optional_print('Instance: %s' % normalized_images[image]['instance'], mode=output_mode)
-        optional_print(mode=output_mode)
-        if not normalized_images[image]['packages']:
+def print_images(kind):
+    packages_by_image = {}
+    for name, versions in package_index.packages.items():
+        for package_version, entries in versions.items():
+            for image_key, package_type, package_path, cve_count in entries:
+                packages_by_image.setdefault(image_key, []).append((package_type, name, package_version, package_path, cve_count))
+    print()
+    for image_key, image in package_index.images.items():
+        if image['kind'] != kind:
             continue
-        for packages in normalized_images[image]['packages']:
-            for package in packages['pkgs']:
-                optional_print('\tType: %s' % packages['pkgsType'], mode=output_mode)
-                optional_print('\tName: %s' % package['name'], mode=output_mode)
-                optional_print('\tVers: %s' % package['version'], mode=output_mode)
-                if 'path' in package:
-                    optional_print('\tPath: %s' % package['path'], mode=output_mode)
-                    package_path = package['path']
-                else:
-                    package_path = ''
-                optional_print('\tCVEs: %s' % package['cveCount'], mode=output_mode)
-                optional_print(mode=output_mode)
-                if search_package_type in [packages['pkgsType'], 'all']:
-                    if package_name_matches(search_exact_name, search_name, package['name']):
-                        if search_version:
-                            if package_version_matches(search_comparison_operator, search_version, package['version']):
-                                images_with_package.append("%s\t%s\t%s\t%s\t%s" % (normalized_images[image]['instance'], packages['pkgsType'], package['name'], package['version'], package_path))
-                        else:
-                            images_with_package.append("%s\t%s\t%s\t%s\t%s" % (normalized_images[image]['instance'], packages['pkgsType'], package['name'], package['version'], package_path))
-        for binary in normalized_images[image]['binaries']:
-            if 'path' in binary:
-                optional_print('\tPath: %s' % binary['path'], mode=output_mode)
-                binary_path = binary['path']
-            else:
-                binary_path = ''
-            if package_name_matches(search_exact_name, search_name, binary['name']):
-                images_with_package.append("%s\t%s\t%s\t%s\t%s" % (normalized_images[image]['instance'], 'binary', binary['name'], 'N/A', binary_path))
+        print('Image')
+        print('ID: %s' % image['id'])
+        print('Instance: %s' % image['instance'])
+        print()
+        for package_type, name, package_version, package_path, cve_count in packages_by_image.get(image_key, []):
+            print('\tType: %s' % package_type)
+            print('\tName: %s' % name)
+            print('\tVers: %s' % (package_version or 'N/A'))
+            if package_path:
+                print('\tPath: %s' % package_path)
+            if cve_count is not None:
+                print('\tCVEs: %s' % cve_count)
+            print()
 
-        for application in normalized_images[image]['applications']:
-            if 'path' in application:
-                optional_print('\tPath: %s' % application['path'], mode=output_mode)
-                application_path = application['path']
-            else:
-                application_path = ''
-            if package_name_matches(search_exact_name, search_name, application['name']):
-                images_with_package.append("%s\t%s\t%s\t%s\t%s" % (normalized_images[image]['instance'], 'application', application['name'], application['version'], application_path))
+# Search the index for the specified package.
 
-    return images_with_package
+def search_images(kind):
+    if args.exact_match_name:
+        name_match = 'exact'
+    elif args.prefix_match_name:
+        name_match = 'prefix'
+    else:
+        name_match = 'substring'
+    results = package_index.search(search_package_name, match=name_match, version=search_package_version, comparison=args.version_comparison, package_type=args.package_type, kinds=[kind])
+    return ['%s\t%s\t%s\t%s\t%s' % (result['instance'], result['type'], result['name'], result['version'] or 'N/A', result['path']) for result in results]
 
 # Example response from the API.
 
@@ -248,31 +172,47 @@ if search_package_name:
     print('Searching for Package: (%s) Version: (%s) Exact Match Name: (%s) Version Comparison Operator: (%s)' % (search_package_name, search_package_version, args.exact_match_name, args.version_comparison))
     print()
 
-# Monitor > Vulnerabilities/Compliance > Images > CI
-if args.mode in ['ci', 'all']:
-    print('Getting CI Images ...')
-    ci_images = pc_api.scans_list_read(args.image_id)
-    ci_images_with_package = parse_images(ci_images, search_all_packages, args.package_type, args.exact_match_name, search_package_name, args.version_comparison, search_package_version)
+if args.index_file and os.path.exists(args.index_file):
+    print('Loading Package Index: (%s) ...' % args.index_file)
+    package_index = PrismaCloudPackageIndex.load(args.index_file)
     print('Done.')
     print()
+else:
+    package_index = PrismaCloudPackageIndex()
+    # Monitor > Vulnerabilities/Compliance > Images > CI
+    if args.mode in ['ci', 'all']:
+        print('Getting CI Images ...')
+        package_index.add_images(pc_api.scans_list_read(args.image_id), 'ci')
+        print('Done.')
+        print()
+    # Monitor > Vulnerabilities/Compliance > Images > Registries
+    if args.mode in ['registry', 'all']:
+        print('Getting Registry Images ...')
+        package_index.add_images(pc_api.registry_list_read(args.image_id), 'registry')
+        print('Done.')
+        print()
+    # Monitor > Vulnerabilities/Compliance > Images > Deployed
+    if args.mode in ['deployed', 'all']:
+        print('Getting Deployed Images ...')
+        package_index.add_images(pc_api.images_list_read(image_id=args.image_id, query_params={'filterBaseImage': 'true'}), 'deployed')
+        print('Done.')
+        print()
+    if args.index_file:
+        package_index.save(args.index_file)
+        print('Saved Package Index: (%s)' % args.index_file)
+        print()
 
-# Monitor > Vulnerabilities/Compliance > Images > Registries
-if args.mode in ['registry', 'all']:
-    print('Getting Registry Images ...')
-    registry_images = pc_api.registry_list_read(args.image_id)
-    registry_images_with_package = parse_images(registry_images, search_all_packages, args.package_type, args.exact_match_name, search_package_name, args.version_comparison, search_package_version)
-    print('Done.')
-    print()
-
-# Monitor > Vulnerabilities/Compliance > Images > Deployed
-if args.mode in ['deployed', 'all']:
-    print('Getting Deployed Images ...')
-
-    deployed_images = pc_api.images_list_read(image_id=args.image_id, query_params={'filterBaseImage': 'true'})
-
-    deployed_images_with_package = parse_images(deployed_images, search_all_packages, args.package_type, args.exact_match_name, search_package_name, args.version_comparison, search_package_version)
-    print('Done.')
-    print()
+for this_kind in ['ci', 'registry', 'deployed']:
+    if args.mode not in [this_kind, 'all']:
+        continue
+    if search_all_packages:
+        print_images(this_kind)
+    elif this_kind == 'ci':
+        ci_images_with_package = search_images(this_kind)
+    elif this_kind == 'registry':
+        registry_images_with_package = search_images(this_kind)
+    else:
+        deployed_images_with_package = search_images(this_kind)
 
 # Output images with the specified package, when a package is specified.
 if search_package_name:
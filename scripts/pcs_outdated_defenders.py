@@ -31,6 +31,12 @@ parser.add_argument(
     action="store_true",
     help="(Optional) - Only Print summary information"
 )
+parser.add_argument(
+    '--collection',
+    type=str,
+    nargs='+',
+    help="(Optional) - Only Print Defenders in these Collections"
+)
 
 args = parser.parse_args()
 
@@ -62,12 +68,11 @@ current_version = pc_api.execute_compute('GET', 'api/v1/version')
 
 output('Current Console Version: %s' % current_version)
 
-if args.disconnected:
-    status="false"
-else:
-    status="true"
+defender_filters = {'connected': not args.disconnected}
+if args.collection:
+    defender_filters['collections'] = args.collection
 
-defenders = pc_api.defenders_list_read(query_params={'connected': status })
+defenders = pc_api.defenders_list_read(filters=defender_filters)
 
 output('Total Defenders in Console: %s ' % len(defenders))
 if not args.summary:
@@ -6,7 +6,7 @@ import time
 import requests
 
 # pylint: disable=import-error
-from prismacloud.api import pc_api, pc_utility
+from prismacloud.api import pc_api, pc_utility, IndexedCollection
 
 # --Configuration-- #
 
@@ -59,7 +59,7 @@ search_object_original = import_file_data['search_object_original']
 
 # For duplicate policy name check.
 print('API - Getting the current list of Policies ...', end='')
-policy_list_current = pc_api.policy_v2_list_read()
+policy_list_current = IndexedCollection(pc_api.policy_v2_list_read())
 print(' done.')
 print()
 
@@ -70,12 +70,7 @@ except (ValueError, FileNotFoundError):
     custom_policy_id_map = {}
 
 for policy_id, policy_object in policy_object_original.items():
-    duplicate_found = False
-    for policy_current in policy_list_current:
-        if policy_object['name'].lower() == policy_current['name'].lower():
-            duplicate_found = True
-            break
-    if duplicate_found:
+    if pc_utility.search_list_object_lower(policy_list_current, 'name', policy_object['name']):
         print('Skipping Duplicate (by name) Policy: %s' % policy_object['name'])
     else:
         if not args.maintain_status:
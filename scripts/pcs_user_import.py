@@ -1,7 +1,7 @@
 """ Import Users from a CSV file """
 
 # pylint: disable=import-error
-from prismacloud.api import pc_api, pc_utility
+from prismacloud.api import pc_api, pc_utility, IndexedCollection
 
 # --Configuration-- #
 
@@ -30,7 +30,7 @@ pc_api.configure(settings)
 # --Main-- #
 
 print('API - Getting the current list of Users ...', end='')
-user_list_current = pc_api.user_list_read()
+user_list_current = IndexedCollection(pc_api.user_list_read())
 print(' done.')
 print()
 
@@ -40,11 +40,7 @@ print('API - Getting the Roles list ...', end='')
 user_role_list = pc_api.user_role_list_read()
 print(' done.')
 
-user_role_id = None
-for user_role in user_role_list:
-    if user_role['name'].lower() == args.role_name.lower():
-        user_role_id = user_role['id']
-        break
+user_role_id = pc_utility.search_list_value_lower(user_role_list, 'name', 'id', args.role_name)
 if user_role_id is None:
     pc_utility.error_and_exit(400, 'Role not found. Please verify the Role name.')
 
@@ -52,22 +48,19 @@ users_duplicate_current_count = 0
 users_duplicate_file_count = 0
 
 users_to_import = []
+user_emails_to_import = set()
 for user_to_import in user_list_to_import:
     user_duplicate = False
-    if len(user_list_to_import) > 1:
-        # Remove duplicates from the import file list.
-        for user_to_import_inner in user_list_to_import:
-            if user_to_import['email'].lower() == user_to_import_inner['email'].lower():
-                users_duplicate_file_count = users_duplicate_file_count + 1
-                user_duplicate = True
-                break
+    # Remove duplicates from the import file list.
+    if user_to_import['email'].lower() in user_emails_to_import:
+        users_duplicate_file_count = users_duplicate_file_count + 1
+        user_duplicate = True
+    user_emails_to_import.add(user_to_import['email'].lower())
     if not user_duplicate:
         # Remove duplicates based upon the current user list.
-        for user_current in user_list_current:
-            if user_to_import['email'].lower() == user_current['email'].lower():
-                users_duplicate_current_count = users_duplicate_current_count + 1
-                user_duplicate = True
-                break
+        if pc_utility.search_list_object_lower(user_list_current, 'email', user_to_import['email']):
+            users_duplicate_current_count = users_duplicate_current_count + 1
+            user_duplicate = True
         if not user_duplicate:
             user = {}
             user['defaultRoleId'] = user_role_id
@@ -1,7 +1,8 @@
-""" Get a list of vulnerable containers and their clusters """
+""" Get a list of vulnerable images, containers, hosts, and clusters """
 
 # pylint: disable=import-error
 from prismacloud.api import pc_api, pc_utility
+from prismacloud.api.pc_lib_join import key_index
 
 # --Configuration-- #
 
@@ -9,8 +10,9 @@ parser = pc_utility.get_arg_parser()
 parser.add_argument(
     '--cve',
     type=str,
+    nargs='+',
     required=True,
-    help='(Required) - ID of the CVE.')
+    help='(Required) - ID of the CVE, or IDs of CVEs.')
 parser.add_argument(
     '--image_id',
     type=str,
@@ -38,69 +40,47 @@ intelligence = pc_api.statuses_intelligence()
 print(' done.')
 print()
 
-print('Searching for CVE: (%s) Limiting Search to Image ID: (%s)' % (args.cve, args.image_id))
+print('Searching for CVE(s): (%s) Limiting Search to Image ID: (%s)' % (', '.join(args.cve), args.image_id))
 print()
 
-# Monitor > Vulnerabilities/Compliance > Images > Registries
-if args.mode in ['registry', 'all']:
-    registry_images = pc_api.registry_list_read(args.image_id)
-    print('Getting Registry Images ...', end='')
-    print(' done.')
-    print('Found %s Registry Images' % len(registry_images))
-    print()
-    for image in registry_images:
-        image_id = image['_id']
-        vulnerabilities = image['vulnerabilities']
-        if not vulnerabilities:
-            # print('No vulnerabilities for Image ID: %s' % image_id)
-            continue
-        vulnerable = False
-        for vulnerability in vulnerabilities:
-            if args.cve and vulnerability['cve'] == args.cve:
-                vulnerable = True
-                # print('Image ID: %s is vulnerable to CVE: %s' % (image_id, args.cve))
-                break
-        if not vulnerable:
-            # print('Excluding Image ID: %s is not vulnerable to CVE: %s' % (image_id, args.cve))
-            continue
-        print('Locations for vulnerable Registry Image ID: %s ' % image_id)
-        print('\tRegistry: %s' % image['repoTag']['registry'])
-        print('\tRepo: %s' % image['repoTag']['repo'])
-        print('\tTag: %s' % image['repoTag']['tag'])
-        print()
-    print()
+print('Getting Images and Containers ...', end='')
+cve_locations = pc_api.cve_locations_read(args.cve, mode=args.mode, image_id=args.image_id)
+print(' done.')
+print()
 
-# Monitor > Vulnerabilities/Compliance > Images > Deployed
-if args.mode in ['deployed', 'all']:
-    print('Getting Deployed Images ...', end='')
-    deployed_images = pc_api.images_list_read(image_id=args.image_id, query_params={'filterBaseImage': 'true'})
-    print(' done.')
-    print('Found %s Deployed Images' % len(deployed_images))
+for cve in args.cve:
+    locations = cve_locations[cve]
+    print('CVE: %s' % cve)
     print()
-    for image in deployed_images:
-        image_id = image['_id']
-        vulnerabilities = image['vulnerabilities']
-        if not vulnerabilities:
-            # print('No vulnerabilities for Image ID: %s' % image_id)
-            continue
-        vulnerable = False
-        for vulnerability in vulnerabilities:
-            if args.cve and vulnerability['cve'] == args.cve:
-                vulnerable = True
-                # print('Image ID: %s is vulnerable to CVE: %s' % (image_id, args.cve))
-                break
-        if not vulnerable:
-            # print('Excluding Image ID: %s is not vulnerable to CVE: %s' % (image_id, args.cve))
-            continue
-        print('Locations for vulnerable Deployed Image ID: %s ' % image_id)
-        containers = pc_api.containers_list_read(image_id=image_id)
-        if not containers:
-            print('\tNo containers found for this image')
-            continue
-        for container in containers:
-            print('\tImage Name: %s' % container['info']['imageName'])
-            if 'cluster' in container['info']:
-                print('\tCluster:    %s' % container['info']['cluster'])
-            else:
-                print('\tHostname:   %s' % container['hostname'])
+    # Monitor > Vulnerabilities/Compliance > Images > Registries
+    if args.mode in ['registry', 'all']:
+        print('Found %s vulnerable Registry Images' % len(locations['registry_images']))
+        print()
+        for image in locations['registry_images']:
+            print('Locations for vulnerable Registry Image ID: %s ' % image['_id'])
+            print('\tRegistry: %s' % image['repoTag']['registry'])
+            print('\tRepo: %s' % image['repoTag']['repo'])
+            print('\tTag: %s' % image['repoTag']['tag'])
+            print()
+        print()
+    # Monitor > Vulnerabilities/Compliance > Images > Deployed
+    if args.mode in ['deployed', 'all']:
+        print('Found %s vulnerable Deployed Images' % len(locations['deployed_images']))
+        print()
+        containers_by_image = key_index(locations['containers'], 'info.imageID')
+        for image in locations['deployed_images']:
+            print('Locations for vulnerable Deployed Image ID: %s ' % image['_id'])
+            containers = containers_by_image.get(image['_id'], [])
+            if not containers:
+                print('\tNo containers found for this image')
+                continue
+            for container in containers:
+                print('\tImage Name: %s' % container['info']['imageName'])
+                if 'cluster' in container['info']:
+                    print('\tCluster:    %s' % container['info']['cluster'])
+                else:
+                    print('\tHostname:   %s' % container['hostname'])
+            print()
+        print('Hosts:    %s' % ', '.join(locations['hosts']))
+        print('Clusters: %s' % ', '.join(locations['clusters']))
         print()
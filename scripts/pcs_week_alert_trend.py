@@ -1,7 +1,7 @@
 """ Get Resources """
 
 # pylint: disable=import-error
-from prismacloud.api import pc_api, pc_utility
+from prismacloud.api import pc_api, pc_utility, PrismaCloudReportJobs
 from tabulate import tabulate
 
 import pandas as pd
@@ -38,9 +38,12 @@ N = 5
 # generating random strings
 res = ''.join(random.choices(string.ascii_uppercase + string.digits, k=N))
 
+# Create the weekly reports concurrently, and process each report when it is ready.
+report_jobs = PrismaCloudReportJobs(pc_api, max_workers=4, initial_wait=2.5)
+report_time = time.strftime("%Y%m%d")
+
 for x in range(args.week):
     end_ts = time.mktime((datetime.datetime.today() - datetime.timedelta(weeks = x)).timetuple())*1000
-    print('API - Gernerate new CSV Report ...', end='')
     body_params = {
         "detailed": True,
         "fields":[
@@ -79,41 +82,28 @@ for x in range(args.week):
             }
         }
     }
-
-    print()
-    print('Creating the Alert Report...', end='')
-    print()
-    alert_report = pc_api.alert_csv_create(body_params)
-    print('Report Created with Report ID: %s' % alert_report['id'])
-    report_time = time.strftime("%Y%m%d")
     report_filename = "./customer-report-" + report_time + "-" + res + "-" + str(x) + ".csv"
-    column_name = str(x) + ' Week ago'
-    print()
-
-    report_ready = False
-    report_dir = '.'
+    report_jobs.add_alert_csv(body_params, name=x, file_name=report_filename)
 
-    while(not report_ready):
-        alert_report_update = pc_api.alert_csv_status(alert_report['id'])
-        # print('Getting the Alert Report Status...', alert_report_update['status'])
-        time.sleep(2.5)    
-        if (alert_report_update['status'] == 'READY_TO_DOWNLOAD'):
-            csv_report = pc_api.alert_csv_download(alert_report['id'])
-            # Write Download Report File to Current Report Directory
-            file = open(report_filename, "w")
-            file.write(csv_report)
-            file.close()
-            # print("Alert Report Downloaded...")
-            break
-
-    df = pd.read_csv(report_filename, usecols=['Policy Severity'])
+print()
+print('Creating the Alert Reports...', end='')
+print()
+severity_counts = {}
+for report_job in report_jobs.run():
+    if report_job['error']:
+        pc_utility.error_and_exit(500, 'Alert Report (%s weeks ago) failed: %s' % (report_job['name'], report_job['error']))
+    print('Report Downloaded with Report ID: %s' % report_job['id'])
+    df = pd.read_csv(report_job['file_name'], usecols=['Policy Severity'])
     df_severity = df.groupby(['Policy Severity'])['Policy Severity'].count().to_frame()
-    df_severity.columns = [column_name]
-    df_severity = df_severity.reset_index()
+    df_severity.columns = [str(report_job['name']) + ' Week ago']
+    severity_counts[report_job['name']] = df_severity.reset_index()
+    os.remove(report_job['file_name'])
+
+for x in range(args.week):
+    column_name = str(x) + ' Week ago'
     # df_trend = df_trend.merge(df_severity,left_on='Policy Severity',right_on='Policy Severity')
-    df_trend = df_trend.merge(df_severity, on='Policy Severity', how='left')
+    df_trend = df_trend.merge(severity_counts[x], on='Policy Severity', how='left')
     df_trend[column_name].fillna(0, inplace=True)
-    os.remove(report_filename)
 
 df_trend = df_trend.set_index('Policy Severity').transpose()
-print(tabulate(df_trend, headers='keys', tablefmt='psql'))
\ No newline at end of file
+print(tabulate(df_trend, headers='keys', tablefmt='psql'))
@@ -35,6 +35,8 @@ setuptools.setup(
         'update_checker'
     ],
     extras_require={
+        'analytics': ['numpy'],
+        'columnar': ['pyarrow'],
         'test': ['coverage==7.6.10', 'responses==0.25.3']
     },
     python_requires='>=3.6'
@@ -1,11 +1,19 @@
 
+import os
+import tempfile
+
+# Log errors of configured instances to a temporary file, rather than to 'error.log' in the working directory.
+
+ERROR_LOG = os.path.join(tempfile.gettempdir(), 'prismacloud-api-tests-error.log')
+
 SETTINGS = {
     'name':     'Example Tenant',
     'identity': 'abc',
     'secret':   'def',
     'url':      'example.prismacloud.io',
     'verify':   False,
-    'debug':    False
+    'debug':    False,
+    'error_log': ERROR_LOG
 }
 
 META_INFO = {
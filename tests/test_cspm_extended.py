@@ -0,0 +1,90 @@
+""" Unit Tests for ExtendedPrismaCloudAPIMixin """
+
+import unittest
+
+from unittest import mock
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_api import PrismaCloudAPI
+from prismacloud.api.pc_lib_rql import rql_shard_search_params
+
+DAY = 24 * 60 * 60 * 1000
+
+
+def mock_alert_v2(alerts_by_day):
+    """Return a mock 'execute' for the v2/alert endpoint, with alerts as a dictionary of alert ids by day"""
+    def execute(action, endpoint, query_params=None, body_params=None, paginated=False):
+        # pylint: disable=unused-argument
+        start = body_params['timeRange']['value']['startTime']
+        end = body_params['timeRange']['value']['endTime']
+        # Times are inclusive, so alerts at the boundary of two sub-windows are returned by both.
+        items = [{'id': alert_id, 'day': day} for day, alert_ids in alerts_by_day.items() if start <= day * DAY <= end for alert_id in alert_ids]
+        if paginated:
+            return items
+        return {'totalRows': len(items), 'items': items[:body_params['limit']]}
+    return execute
+
+
+class TestExtendedPrismaCloudAPIMixin(unittest.TestCase):
+    """ Unit Tests for sharded requests """
+
+    def setUp(self):
+        self.pc_api = PrismaCloudAPI()
+
+    def test_alert_v2_list_read_sharded_without_duplicates(self):
+        alerts_by_day = {day: ['A-%s-%s' % (day, alert) for alert in range(3)] for day in range(10)}
+        # A dense day.
+        alerts_by_day[7] = ['A-7-%s' % alert for alert in range(50)]
+        body_params = {'timeRange': {'type': 'absolute', 'value': {'startTime': 0, 'endTime': 9 * DAY}}, 'limit': 5}
+        with mock.patch.object(self.pc_api, 'execute', side_effect=mock_alert_v2(alerts_by_day)) as pc_api_execute:
+            alerts = self.pc_api.alert_v2_list_read(body_params=body_params, shards=3)
+            alert_ids = [alert['id'] for alert in alerts]
+            self.assertEqual(len(alert_ids), len(set(alert_ids)))
+            self.assertEqual(set(alert_ids), {alert_id for alert_ids in alerts_by_day.values() for alert_id in alert_ids})
+            # The sub-window with the dense day was split.
+            paginated_calls = [call for call in pc_api_execute.call_args_list if call.kwargs.get('paginated')]
+            self.assertGreater(len(paginated_calls), 3)
+
+    def test_alert_v2_list_read_stream_without_time_range(self):
+        with mock.patch.object(self.pc_api, 'execute', return_value=[{'id': 'A-1'}]) as pc_api_execute:
+            self.assertEqual(list(self.pc_api.alert_v2_list_read_stream(body_params={'timeRange': {'type': 'to_now', 'value': 'week'}})), [{'id': 'A-1'}])
+            self.assertEqual(pc_api_execute.call_count, 1)
+
+    def test_search_read_sharded_by_account(self):
+        accounts = {'account-a': 3, 'account-b': 2500}
+        pages = {}
+
+        def execute(action, endpoint, body_params=None):
+            # pylint: disable=unused-argument
+            if endpoint == 'search/config':
+                self.assertIn("where cloud.account = '", body_params['query'])
+                self.assertFalse(body_params['withResourceJson'])
+                account = body_params['query'].split("'")[1]
+                items = [{'accountId': account, 'assetId': '%s-%s' % (account, asset)} for asset in range(accounts[account])]
+                pages[account] = [items[offset:offset + 1000] for offset in range(1000, len(items), 1000)]
+                return {'data': {'items': items[:1000], 'nextPageToken': account if pages[account] else None}}
+            self.assertEqual(body_params['withResourceJson'], 'false')
+            page = pages[body_params['pageToken']].pop(0)
+            return {'items': page, 'nextPageToken': body_params['pageToken'] if pages[body_params['pageToken']] else None}
+
+        with mock.patch.object(self.pc_api, 'execute', side_effect=execute), \
+             mock.patch.object(self.pc_api, 'cloud_accounts_list_read', return_value=[{'name': account} for account in accounts]):
+            search_params = {'query': "config from cloud.resource where api.name = 'aws-ec2-describe-instances'"}
+            resources = list(self.pc_api.search_read_sharded('config', search_params, shard_by='account', resource_json=False))
+            self.assertEqual(len(resources), sum(accounts.values()))
+
+    def test_rql_shard_search_params_with_or_conditions(self):
+        search_params = {'query': "config from cloud.resource where api.name = 'a' OR api.name = 'b' addcolumn tags"}
+        shards = rql_shard_search_params(search_params, shard_by='account', shard_values=['x', 'y'])
+        self.assertEqual([shard['query'] for shard in shards], [
+            "config from cloud.resource where cloud.account = 'x' AND ( api.name = 'a' OR api.name = 'b' ) addcolumn tags",
+            "config from cloud.resource where cloud.account = 'y' AND ( api.name = 'a' OR api.name = 'b' ) addcolumn tags",
+        ])
+        # A 'where' in a quoted string (or in parentheses) is not a where clause.
+        search_params = {'query': "config from cloud.resource where api.name = 'a' AND json.rule = name contains 'where x'"}
+        self.assertEqual(rql_shard_search_params(search_params, shard_by='region', shard_values=['z'])[0]['query'],
+                         "config from cloud.resource where cloud.region = 'z' AND ( api.name = 'a' AND json.rule = name contains 'where x' )")
+        with self.assertRaises(ValueError):
+            rql_shard_search_params({'query': "config from cloud.resource addcolumn 'where' (where)"}, shard_by='account', shard_values=['x'])
+        with self.assertRaises(ValueError):
+            list(self.pc_api.search_read_sharded('iam', {'query': "config from iam where dest.cloud.type = 'AWS'"}, shard_by='region', shard_values=['us-east-1']))
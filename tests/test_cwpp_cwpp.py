@@ -1,14 +1,26 @@
 """Unit test for PrismaCloudAPICWPPMixin class
 """
+import gzip
+import os
+import tempfile
 import unittest
 import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
 import responses
 from responses import registries, matchers
 from prismacloud.api.pc_lib_api import PrismaCloudAPI
+from prismacloud.api.pc_lib_filter import compile_compute_filters, filter_records
 from tests.data import SETTINGS, META_INFO, CREDENTIALS, ONE_HOST
 
 
+def hostnames_transform(page):
+    """Module-level (picklable) transform for execute_compute_offload tests"""
+    return [json.loads(host)['hostname'] for host in page]
+
+
 class TestCasePrismaCloudAPICWPPMixin(unittest.TestCase):
     """Unit test on execute_compute method
     """
@@ -306,3 +318,278 @@ API: (https://example.prismacloud.io/api/v1/credentials) with query params: (Non
             "GET", "api/v1/cloud/discovery/download")
         self.assertEqual(discovery.call_count, 1)
         self.assertEqual(download, "discovery_download")
+
+    @responses.activate
+    def test_execute_compute_concurrent_callers_share_headers_and_token(self):
+        """Concurrent calls from many threads, with a shared request_headers dictionary and an expired token
+        We expect a single re-login, and the shared dictionary to be left unmodified
+        """
+        self.pc_api.token_timer = 0.0
+        login = responses.post(
+            "https://example.prismacloud.io/login",
+            body=json.dumps({"token": "token"}),
+            status=200
+        )
+        get_creds = responses.get(
+            "https://example.prismacloud.io/api/v1/credentials",
+            body=json.dumps(CREDENTIALS),
+            status=200
+        )
+        shared_headers = {'Content-Type': 'application/json'}
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(self.pc_api.execute_compute, 'GET', 'api/v1/credentials', request_headers=shared_headers) for _ in range(16)]
+            results = [future.result() for future in futures]
+        self.assertEqual(shared_headers, {'Content-Type': 'application/json'})
+        self.assertEqual(login.call_count, 1)
+        self.assertEqual(get_creds.call_count, 16)
+        self.assertTrue(all(len(result) == 1 for result in results))
+
+    @responses.activate(registry=registries.OrderedRegistry)
+    def test_execute_compute_offload_for_hosts_list(self):
+        """Nominal test on the mock hosts list route, decoding and transforming pages in worker processes
+        We expect 52 compact results, in offset order
+        """
+        get_host_1 = responses.get(
+            "https://example.prismacloud.io/api/v1/hosts?limit=50&offset=0",
+            body=json.dumps([json.dumps(ONE_HOST) for _ in range(0, 50)]),
+            status=200,
+            headers={"Total-Count": "52"}
+        )
+        get_host_2 = responses.get(
+            "https://example.prismacloud.io/api/v1/hosts?limit=50&offset=50",
+            body=json.dumps([json.dumps(dict(ONE_HOST, hostname='last')) for _ in range(0, 2)]),
+            status=200,
+            headers={"Total-Count": "52"}
+        )
+        hostnames = self.pc_api.execute_compute_offload('GET', 'api/v1/hosts', transform=hostnames_transform, process_workers=2)
+        self.assertEqual(len(hostnames), 52)
+        self.assertEqual(hostnames[50:], ['last', 'last'])
+        self.assertEqual(get_host_1.call_count, 1)
+        self.assertEqual(get_host_2.call_count, 1)
+
+    @responses.activate(registry=registries.OrderedRegistry)
+    def test_execute_compute_offload_force_skips_undecodable_first_page(self):
+        """Test on the mock hosts list route, with a first page that cannot be decoded and force=True
+        We expect the results of the remaining pages
+        """
+        responses.get(
+            "https://example.prismacloud.io/api/v1/hosts?limit=50&offset=0",
+            body="not json",
+            status=200,
+            headers={"Total-Count": "52"}
+        )
+        responses.get(
+            "https://example.prismacloud.io/api/v1/hosts?limit=50&offset=50",
+            body=json.dumps([json.dumps(dict(ONE_HOST, hostname='last')) for _ in range(0, 2)]),
+            status=200,
+            headers={"Total-Count": "52"}
+        )
+        hostnames = self.pc_api.execute_compute_offload('GET', 'api/v1/hosts', transform=hostnames_transform, force=True, process_workers=2)
+        self.assertEqual(hostnames, ['last', 'last'])
+
+    @responses.activate
+    def test_execute_compute_compression_and_transfer_stats(self):
+        """Nominal test on the mock malware feed route, with a request body larger than the compression threshold
+        We expect a gzip request body, compression negotiation, and bytes recorded for the endpoint
+        """
+        self.pc_api.request_compression_threshold = 16
+        body_params = {'feed': [{'name': 'example_%s' % i, 'md5': 'cdb55ac14abdf2b868a06f90e939fba6', 'allowed': False} for i in range(100)]}
+        put_feed = responses.put(
+            "https://example.prismacloud.io/api/v1/feeds/custom/malware",
+            body=json.dumps({}),
+            status=200,
+        )
+        self.pc_api.feeds_malware_write(body_params)
+        request = put_feed.calls[0].request
+        self.assertEqual(request.headers['Content-Encoding'], 'gzip')
+        self.assertIn('gzip', request.headers['Accept-Encoding'])
+        self.assertEqual(json.loads(gzip.decompress(request.body)), body_params)
+        stats = self.pc_api.transfer_stats['api/v1/feeds/custom/malware']
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['bytes_sent'], len(request.body))
+        self.assertEqual(stats['bytes_received_decoded'], 2)
+
+    @responses.activate(registry=registries.OrderedRegistry)
+    def test_execute_transfer_stats_with_retries(self):
+        """Test on a mock CSPM route that responds with a 429 and then a 200
+        We expect both attempts, and the body sent with each attempt, to be recorded for the endpoint
+        """
+        self.pc_api.retry_waits = [0]
+        body_params = {'query': 'config from cloud.resource where api.name = \'aws-ec2-describe-instances\''}
+        responses.post("https://example.prismacloud.io/search/config", body=json.dumps({}), status=429)
+        responses.post("https://example.prismacloud.io/search/config", body=json.dumps({}), status=200)
+        self.pc_api.execute('POST', 'search/config', body_params=body_params)
+        stats = self.pc_api.transfer_stats['search/config']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['bytes_sent'], 2 * len(json.dumps(body_params)))
+
+    @responses.activate
+    def test_execute_download_removes_partial_file(self):
+        """Test on a mock CSPM download route, with a download that fails mid-stream
+        We expect the exception, and no file (or temporary file) left on disk
+        """
+        responses.get("https://example.prismacloud.io/report/download", body="partial", status=200)
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, 'report.csv')
+            with mock.patch('requests.Response.iter_content', side_effect=IOError('connection reset')):
+                with self.assertRaises(IOError):
+                    self.pc_api.execute_download('report/download', file_name=file_name)
+            self.assertEqual(os.listdir(temporary_directory), [])
+
+    @responses.activate
+    def test_execute_compute_pages_in_offset_order_with_bounded_window(self):
+        """Nominal test on the mock hosts list route, with five pages, consumed via the concurrent pager
+        We expect pages in offset order, with no more than the window of pages requested ahead of the consumer
+        """
+        for offset in range(0, 10, 2):
+            responses.get(
+                "https://example.prismacloud.io/api/v1/hosts?limit=2&offset=%s" % offset,
+                body=json.dumps([offset, offset + 1]),
+                status=200,
+                headers={"Total-Count": "10"}
+            )
+        pages = self.pc_api.execute_compute_pages('GET', 'api/v1/hosts', max_workers=2, window=2, limit=2)
+        self.assertEqual(next(pages), (0, 10, [0, 1]))
+        self.assertEqual(next(pages), (2, 10, [2, 3]))
+        self.assertLessEqual(len(responses.calls), 4)
+        remaining_pages = list(pages)
+        self.assertEqual([offset for offset, _, _ in remaining_pages], [4, 6, 8])
+        self.assertEqual([record for _, _, page in remaining_pages for record in page], list(range(4, 10)))
+        self.assertEqual(len(responses.calls), 5)
+
+    @responses.activate
+    def test_execute_compute_concurrent_requests_first_page_once(self):
+        """Nominal test on the mock hosts list route, with concurrent pagination
+        We expect exactly one request per page (including the first page), and records in offset order
+        """
+        def hosts_page(request):
+            query = parse_qs(urlparse(request.url).query)
+            offset, limit = int(query['offset'][0]), int(query['limit'][0])
+            return (200, {'Total-Count': '230'}, json.dumps(list(range(offset, min(offset + limit, 230)))))
+        responses.add_callback(responses.GET, "https://example.prismacloud.io/api/v1/hosts", callback=hosts_page)
+        hosts = self.pc_api.execute_compute('GET', 'api/v1/hosts', paginated=True, concurrent=True, max_workers=2)
+        self.assertEqual(hosts, list(range(230)))
+        offsets = [parse_qs(urlparse(call.request.url).query)['offset'][0] for call in responses.calls]
+        self.assertEqual(len(offsets), len(set(offsets)))
+        self.assertEqual(offsets.count('0'), 1)
+
+    @responses.activate
+    def test_execute_compute_response_total_count(self):
+        """Nominal test on the mock hosts list route, reading the Total-Count header with the decoded body
+        """
+        responses.get(
+            "https://example.prismacloud.io/api/v1/hosts?limit=1&offset=0",
+            body=json.dumps([ONE_HOST]),
+            status=200,
+            headers={"Total-Count": "52"}
+        )
+        response = self.pc_api.execute_compute_response('GET', 'api/v1/hosts?limit=1&offset=0')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.total_count, 52)
+        self.assertEqual(response.body, [ONE_HOST])
+
+    @responses.activate
+    def test_count_compute_and_list_read_count(self):
+        """Nominal test on counts, requesting a single record and returning the Total-Count header
+        """
+        defenders = responses.get(
+            "https://example.prismacloud.io/api/v1/defenders?limit=1&offset=0",
+            body=json.dumps([{"hostname": "one"}]),
+            status=200,
+            headers={"Total-Count": "1234"}
+        )
+        responses.get(
+            "https://example.prismacloud.io/api/v1/containers?limit=1&offset=0",
+            body=json.dumps([{"_id": "one"}]),
+            status=200,
+            headers={"Total-Count": "5678"}
+        )
+        self.assertEqual(self.pc_api.defenders_list_read(count=True), 1234)
+        self.assertEqual(self.pc_api.counts_compute({'defenders': 'api/v1/defenders', 'containers': ('api/v1/containers?', None)}),
+                         {'defenders': 1234, 'containers': 5678})
+        self.assertEqual(defenders.call_count, 2)
+
+    @responses.activate
+    def test_audits_bulk_read_sharded_by_total_count(self):
+        """Nominal test on bulk audits, with a high-volume audit type split into sub-windows by its Total-Count
+        """
+        audits = {
+            'runtime/container': [{'_id': 'c-%s' % minute, 'time': '2024-01-31T%02d:%02d:00.000Z' % (minute // 60, minute % 60)} for minute in range(120)],
+            'incidents': [{'_id': 'i-1', 'time': '2024-01-31T00:30:00.000Z'}],
+        }
+
+        def audits_callback(request):
+            query = parse_qs(urlparse(request.url).query)
+            audit_type = urlparse(request.url).path[len('/api/v1/audits/'):]
+            matching = [audit for audit in audits[audit_type] if query['from'][0] <= audit['time'] <= query['to'][0]]
+            offset, limit = int(query['offset'][0]), int(query['limit'][0])
+            return (200, {'Total-Count': str(len(matching))}, json.dumps(matching[offset:offset + limit]))
+
+        for audit_type in audits:
+            responses.add_callback(responses.GET, 'https://example.prismacloud.io/api/v1/audits/%s' % audit_type, callback=audits_callback)
+        results = list(self.pc_api.audits_bulk_read(list(audits), start='2024-01-31T00:00:00Z', end='2024-01-31T01:59:00Z', shard_records=40, min_window=60))
+        container_audits = [audit['_id'] for audit_type, shard in results if audit_type == 'runtime/container' for audit in shard]
+        self.assertEqual(sorted(container_audits), sorted(audit['_id'] for audit in audits['runtime/container']))
+        self.assertGreater(len([audit_type for audit_type, _ in results if audit_type == 'runtime/container']), 2)
+        self.assertEqual([shard for audit_type, shard in results if audit_type == 'incidents'], [audits['incidents']])
+
+    @responses.activate
+    def test_cve_locations_read_reads_containers_once(self):
+        """Nominal test on CVE locations, reading containers once (rather than once per vulnerable image)
+        """
+        log4shell = {"cve": "CVE-2021-44228"}
+        responses.get(
+            "https://example.prismacloud.io/api/v1/images",
+            body=json.dumps([
+                {"_id": "sha256:a", "vulnerabilities": [log4shell], "hosts": {"host-3": {}}},
+                {"_id": "sha256:b", "vulnerabilities": [{"cve": "CVE-2022-0001"}]},
+                {"_id": "sha256:c", "vulnerabilities": [log4shell, log4shell], "clusters": ["cluster-2"]},
+            ]),
+            status=200,
+            headers={"Total-Count": "3"}
+        )
+        containers = responses.get(
+            "https://example.prismacloud.io/api/v1/containers",
+            body=json.dumps([
+                {"hostname": "host-1", "info": {"imageID": "sha256:a", "cluster": "cluster-1"}},
+                {"hostname": "host-2", "info": {"imageID": "sha256:b"}},
+                {"hostname": "host-2", "info": {"imageID": "sha256:c"}},
+            ]),
+            status=200,
+            headers={"Total-Count": "3"}
+        )
+        locations = self.pc_api.cve_locations_read(['CVE-2021-44228', 'CVE-2023-0000'], mode='deployed')
+        self.assertEqual([image['_id'] for image in locations['CVE-2021-44228']['deployed_images']], ['sha256:a', 'sha256:c'])
+        self.assertEqual(len(locations['CVE-2021-44228']['containers']), 2)
+        self.assertEqual(locations['CVE-2021-44228']['hosts'], ['host-1', 'host-2', 'host-3'])
+        self.assertEqual(locations['CVE-2021-44228']['clusters'], ['cluster-1', 'cluster-2'])
+        self.assertEqual(locations['CVE-2023-0000']['deployed_images'], [])
+        self.assertEqual(containers.call_count, 1)
+
+    @responses.activate
+    def test_defenders_list_read_filters_pushed_down(self):
+        """Nominal test on filters, compiled into query parameters where supported, and applied to records otherwise
+        """
+        defenders = responses.get(
+            "https://example.prismacloud.io/api/v1/defenders",
+            body=json.dumps([
+                {"hostname": "host-1", "version": "31.02.133", "connected": True, "collections": ["All", "Production"]},
+                {"hostname": "host-2", "version": "32.03.100", "connected": True, "collections": ["All", "Production"]},
+                {"hostname": "host-3", "version": "30.00.001", "connected": True, "collections": ["All", "Production"]},
+            ]),
+            status=200,
+            headers={"Total-Count": "3"}
+        )
+        filters = [('connected', 'eq', True), ('collections', 'in', ['Production', 'Staging']), ('version', 'lt', '32.03'), ('hostname', 'ne', 'host-3')]
+        self.assertEqual([defender['hostname'] for defender in self.pc_api.defenders_list_read(filters=filters)], ['host-1'])
+        query = parse_qs(urlparse(defenders.calls[0].request.url).query)
+        self.assertEqual(query['connected'], ['true'])
+        self.assertEqual(query['collections'], ['Production,Staging'])
+        self.assertNotIn('version', query)
+        self.assertEqual(self.pc_api.defenders_list_read(filters=filters, count=True), 1)
+        with self.assertRaises(ValueError):
+            self.pc_api.defenders_list_read(filters=[('version', 'like', '32')])
+        # Audit times are sent as RFC 3339 timestamps, and 'startswith' (as 'contains') is case-insensitive.
+        query_params, remaining = compile_compute_filters('api/v1/audits/incidents', [('time', 'ge', 1704067200), ('hostname', 'startswith', 'HOST')])
+        self.assertEqual(query_params, {'from': '2024-01-01T00:00:00.000Z'})
+        self.assertEqual(list(filter_records([[{'hostname': 'host-1', 'time': '2024-01-01T00:00:01Z'}]], remaining)), [{'hostname': 'host-1', 'time': '2024-01-01T00:00:01Z'}])
@@ -0,0 +1,58 @@
+""" Unit Tests for ResultCache """
+
+import unittest
+
+from unittest import mock
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_api import PrismaCloudAPI
+from prismacloud.api.pc_lib_cache import ResultCache
+from prismacloud.api.pc_lib_rql import rql_cache_key
+
+
+class TestResultCache(unittest.TestCase):
+    """ Unit Tests for RQL result caching """
+
+    def test_result_cache_eviction(self):
+        cache = ResultCache(ttl=60, max_entries=2, max_items=5)
+        cache.set('a', [1, 2])
+        cache.set('b', [3])
+        cache.get('a')
+        cache.set('c', [4])
+        # The least recently used entry is evicted.
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), [1, 2])
+        cache.set('d', [5, 6, 7, 8])
+        self.assertEqual(cache.items, 4)
+        self.assertEqual(len(cache), 1)
+
+    def test_rql_cache_key(self):
+        relative = {'type': 'relative', 'value': {'amount': 24, 'unit': 'hour'}}
+        key = rql_cache_key('search/config', {'query': "config from cloud.resource where api.name = 'a  b'", 'timeRange': relative}, bucket=60, now=125)
+        self.assertEqual(key, rql_cache_key('search/config', {'query': "Config  FROM cloud.resource\nWHERE api.name = 'a  b'", 'timeRange': relative}, bucket=60, now=170))
+        self.assertNotEqual(key, rql_cache_key('search/config', {'query': "config from cloud.resource where api.name = 'a b'", 'timeRange': relative}, bucket=60, now=125))
+        self.assertNotEqual(key, rql_cache_key('search/config', {'query': "config from cloud.resource where api.name = 'a  b'", 'timeRange': relative}, bucket=60, now=185))
+
+    def test_search_config_read_cached(self):
+        pc_api = PrismaCloudAPI()
+        pc_api.rql_cache = ResultCache(ttl=60)
+        search_params = {'query': "config from cloud.resource where api.name = 'aws-organizations-account'"}
+        with mock.patch.object(pc_api, 'execute', return_value={'data': {'items': [{'id': 'one'}]}}) as pc_api_execute:
+            pc_api.search_config_read(search_params)[0]['id'] = 'modified'
+            self.assertEqual(pc_api.search_config_read(search_params), [{'id': 'one'}])
+            self.assertEqual(pc_api.search_config_read({'query': "CONFIG FROM cloud.resource  WHERE api.name = 'aws-organizations-account'"}), [{'id': 'one'}])
+            self.assertEqual(pc_api_execute.call_count, 1)
+            # Different resource JSON settings do not share results.
+            pc_api.search_config_read(search_params, resource_json=False)
+            self.assertEqual(pc_api_execute.call_count, 2)
+            pc_api.search_config_read(search_params, cache=False)
+            self.assertEqual(pc_api_execute.call_count, 3)
+
+    def test_search_network_read_cached_copy(self):
+        pc_api = PrismaCloudAPI()
+        pc_api.rql_cache = ResultCache(ttl=60)
+        search_params = {'query': "network from vpc.flow_record where bytes > 0"}
+        with mock.patch.object(pc_api, 'execute', return_value={'data': {'nodes': [{'id': 'one'}]}}) as pc_api_execute:
+            pc_api.search_network_read(search_params)['data']['nodes'].clear()
+            self.assertEqual(pc_api.search_network_read(search_params), {'data': {'nodes': [{'id': 'one'}]}})
+            self.assertEqual(pc_api_execute.call_count, 1)
@@ -0,0 +1,63 @@
+""" Unit Tests for CheckpointStore """
+
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_api import PrismaCloudAPI
+from prismacloud.api.pc_lib_checkpoint import CheckpointStore
+
+
+class TestCheckpointStore(unittest.TestCase):
+    """ Unit Tests for incremental collection """
+
+    def test_compute_incremental_read(self):
+        pc_api = PrismaCloudAPI()
+        first_audits = [
+            {'_id': 'a-1', 'time': '2024-01-31T12:00:00.000Z'},
+            {'_id': 'a-2', 'time': '2024-01-31T12:30:00.500Z'},
+            {'_id': 'a-3', 'time': '2024-01-31T12:30:00.500Z'},
+        ]
+        # The overlap returns the last records again, with a late record that shares their timestamp, and new records.
+        second_audits = first_audits[1:] + [
+            {'_id': 'a-4', 'time': '2024-01-31T12:30:00.500Z'},
+            {'_id': 'a-5', 'time': '2024-01-31T13:00:00.000Z'},
+        ]
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, 'checkpoints.json')
+            checkpoint_store = CheckpointStore(file_name)
+            with mock.patch.object(pc_api, 'audits_list_read', side_effect=[first_audits, second_audits]) as audits_list_read:
+                records, checkpoint = pc_api.compute_incremental_read('audits/incidents', checkpoint_store, start='2024-01-31T00:00:00Z')
+                self.assertEqual([record['_id'] for record in records], ['a-1', 'a-2', 'a-3'])
+                self.assertEqual(audits_list_read.call_args.kwargs['query_params'], {'from': '2024-01-31T00:00:00Z'})
+                # Without a commit (for example, a crash before the records are processed) the records are collected again.
+                self.assertIsNone(CheckpointStore(file_name).get('audits/incidents'))
+                checkpoint_store.commit('audits/incidents', checkpoint)
+                checkpoint_store = CheckpointStore(file_name)
+                records, checkpoint = pc_api.compute_incremental_read('audits/incidents', checkpoint_store, commit=True)
+                self.assertEqual([record['_id'] for record in records], ['a-4', 'a-5'])
+                self.assertEqual(audits_list_read.call_args.kwargs['query_params'], {'from': '2024-01-31T12:29:00.500Z'})
+            self.assertEqual(CheckpointStore(file_name).get('audits/incidents')['time'], '2024-01-31T13:00:00.000Z')
+            self.assertEqual(os.listdir(temporary_directory), ['checkpoints.json'])
+
+    def test_console_logs_follow(self):
+        pc_api = PrismaCloudAPI()
+        logs = [{'time': '2024-01-31T12:%02d:00.000Z' % minute, 'msg': 'log %s' % minute} for minute in range(60)]
+        # Each poll returns the last 'lines' lines, newest first; logs 60 to 99 are written between polls.
+        newer_logs = logs + [{'time': '2024-01-31T13:00:00.000Z', 'msg': 'log %s' % minute} for minute in range(60, 100)]
+        polls = [logs, newer_logs]
+        def console_logs_list_read(query_params=None):
+            return polls[0][-query_params['lines']:][::-1]
+        with mock.patch.object(pc_api, 'console_logs_list_read', side_effect=console_logs_list_read) as list_read:
+            follower = pc_api.console_logs_follow(since='2024-01-31T12:30:00Z', interval=0, lines=16, max_lines=1024)
+            records, checkpoint = next(follower)
+            self.assertEqual([record['msg'] for record in records], ['log %s' % minute for minute in range(30, 60)])
+            polls.pop(0)
+            records, checkpoint = next(follower)
+        # Each poll doubles the lines requested until the logs reach back to 'since', or to the previous logs.
+        self.assertEqual([call.kwargs['query_params']['lines'] for call in list_read.call_args_list], [16, 32, 32, 64])
+        self.assertEqual([record['msg'] for record in records], ['log %s' % minute for minute in range(60, 100)])
+        self.assertEqual(checkpoint['time'], '2024-01-31T13:00:00.000Z')
@@ -0,0 +1,42 @@
+""" Unit Tests for the Columnar Export """
+
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_api import PrismaCloudAPI
+from prismacloud.api.pc_lib_columnar import columnar_table, dataset_pages, export_parquet, pyarrow, record_batches
+
+
+@unittest.skipIf(pyarrow is None, 'Requires PyArrow')
+class TestPrismaCloudColumnar(unittest.TestCase):
+    """ Unit Tests for Arrow tables and Parquet export """
+
+    def test_export_parquet_from_pages(self):
+        pc_api = PrismaCloudAPI()
+        defenders = [{'hostname': 'host-%s' % index, 'version': '32.0%s' % (index % 2), 'connected': index % 3 != 0,
+                      'cloudMetadata': {'provider': 'aws'}, 'lastModified': '2024-01-31T12:00:00.5Z', 'collections': ['All']} for index in range(25)]
+        pages = [(0, 25, defenders[:10]), (10, 25, defenders[10:20]), (20, 25, defenders[20:])]
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, 'defenders.parquet')
+            with mock.patch.object(pc_api, 'execute_compute_pages', return_value=iter(pages)) as execute_compute_pages:
+                rows = export_parquet(pc_api, 'defenders', file_name, batch_rows=8, query_params={'connected': 'true'})
+            self.assertEqual(execute_compute_pages.call_args.args, ('GET', 'api/v1/defenders'))
+            self.assertEqual(rows, 25)
+            self.assertEqual(os.listdir(temporary_directory), ['defenders.parquet'])
+            table = pyarrow.parquet.read_table(file_name)
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(str(table.schema.field('version').type), 'dictionary<values=string, indices=int32, ordered=0>')
+        self.assertEqual(table.column('hostname')[24].as_py(), 'host-24')
+        self.assertEqual(table.column('collections')[0].as_py(), '["All"]')
+        self.assertEqual(table.column('last_modified')[0].value, 1706702400500)
+        # Custom schemas: paths (string columns), or (name, path, type) columns.
+        table = columnar_table(defenders[:3], ['hostname', ('provider', 'cloudMetadata.provider', 'dictionary'), ('connected', 'connected', 'bool')])
+        self.assertEqual(table.to_pydict(), {'hostname': ['host-0', 'host-1', 'host-2'], 'provider': ['aws', 'aws', 'aws'], 'connected': [False, True, True]})
+        # Batches of 'batch_rows' rows, across pages.
+        self.assertEqual([batch.num_rows for batch in record_batches([defenders[:7], defenders[7:25]], 'defenders', batch_rows=5)], [5, 5, 5, 5, 5])
+        with self.assertRaises(ValueError):
+            list(dataset_pages(pc_api, 'resources'))
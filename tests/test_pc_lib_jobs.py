@@ -0,0 +1,64 @@
+""" Unit Tests for PrismaCloudReportJobs """
+
+import json
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+import responses
+
+# pylint: disable=import-error
+from prismacloud.api import PrismaCloudReportJobs
+from prismacloud.api.pc_lib_api import PrismaCloudAPI
+from tests.data import META_INFO, SETTINGS
+
+
+class TestPrismaCloudReportJobs(unittest.TestCase):
+    """ Unit Tests for report jobs """
+
+    def test_report_jobs_poll_until_ready(self):
+        pc_api = mock.Mock()
+        pc_api.alert_csv_create.side_effect = [{'id': 'report-1'}, {'id': 'report-2'}]
+        statuses = {'report-1': ['IN_PROGRESS', 'READY_TO_DOWNLOAD'], 'report-2': ['FAILED']}
+        pc_api.alert_csv_status.side_effect = lambda report_id: {'status': statuses[report_id].pop(0)}
+        pc_api.alert_csv_download.return_value = 'Alert ID,Policy Severity\nP-1,high\nP-2,low\n'
+        pc_api.compliance_report_create.return_value = {'id': 'report-3'}
+        pc_api.compliance_report_download.side_effect = [None, None, b'Standard,Result\nCIS,pass\n']
+        report_jobs = PrismaCloudReportJobs(pc_api, initial_wait=0.01, max_wait=0.02)
+        report_jobs.add_alert_csv({'timeRange': {}}, name='week-1')
+        report_jobs.add_alert_csv({'timeRange': {}}, name='week-2')
+        report_jobs.add_compliance_report({'name': 'cis'}, name='cis')
+        jobs = {job['name']: job for job in report_jobs.run()}
+        self.assertEqual(jobs['week-1']['status'], 'DONE')
+        self.assertEqual([row['Policy Severity'] for row in PrismaCloudReportJobs.rows(jobs['week-1'])], ['high', 'low'])
+        self.assertEqual(jobs['week-2']['status'], 'FAILED')
+        self.assertEqual(jobs['cis']['polls'], 3)
+        self.assertEqual(list(PrismaCloudReportJobs.rows(jobs['cis'])), [{'Standard': 'CIS', 'Result': 'pass'}])
+
+    def test_report_jobs_deadline(self):
+        pc_api = mock.Mock()
+        pc_api.compliance_report_create.return_value = {'id': 'report-1'}
+        pc_api.compliance_report_download.return_value = None
+        report_jobs = PrismaCloudReportJobs(pc_api, deadline=0.05, initial_wait=0.01, max_wait=0.01)
+        report_jobs.add_compliance_report({'name': 'cis'})
+        job = report_jobs.run_all()[0]
+        self.assertEqual(job['status'], 'TIMEOUT')
+        self.assertIsInstance(job['error'], TimeoutError)
+
+    @responses.activate
+    def test_compliance_report_download_to_file(self):
+        responses.post('https://example.prismacloud.io/login', body=json.dumps({'token': 'token'}), status=200)
+        responses.get('https://example.prismacloud.io/meta_info', body=json.dumps(META_INFO), status=200)
+        pc_api = PrismaCloudAPI()
+        pc_api.configure(SETTINGS)
+        responses.get('https://example.prismacloud.io/report/report-1/download', status=204)
+        responses.get('https://example.prismacloud.io/report/report-1/download', body=b'%PDF-1.4 report', status=200, content_type='application/pdf')
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, 'report.pdf')
+            self.assertIsNone(pc_api.compliance_report_download('report-1', file_name=file_name))
+            self.assertEqual(pc_api.compliance_report_download('report-1', file_name=file_name), file_name)
+            with open(file_name, 'rb') as report_file:
+                self.assertEqual(report_file.read(), b'%PDF-1.4 report')
+            self.assertEqual(os.listdir(temporary_directory), ['report.pdf'])
@@ -0,0 +1,28 @@
+""" Unit Tests for the Join Helpers """
+
+import unittest
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_join import hash_join, join_containers
+
+
+class TestPrismaCloudJoin(unittest.TestCase):
+    """ Unit Tests for hash joins """
+
+    def test_join_containers(self):
+        images = [{'_id': 'sha256:a', 'vulnerabilities': [{'cve': 'CVE-2021-44228'}]}, {'_id': 'sha256:b'}]
+        hosts = [{'_id': 'host-1', 'hostname': 'host-1'}]
+        # Containers are streamed (a generator).
+        containers = ({'hostname': hostname, 'info': {'name': name, 'imageID': image_id}} for name, image_id, hostname in [
+            ('c-1', 'sha256:a', 'host-1'),
+            ('c-2', 'sha256:a', 'host-2'),
+            ('c-3', 'sha256:c', 'host-1'),
+        ])
+        joined = list(join_containers(containers, images, hosts))
+        self.assertEqual([row['image']['_id'] if row['image'] else None for row in joined], ['sha256:a', 'sha256:a', None])
+        self.assertEqual([row['host']['_id'] if row['host'] else None for row in joined], ['host-1', None, 'host-1'])
+        # One-to-many: each image, with each of its containers.
+        pairs = list(hash_join(images, [row['container'] for row in joined], left_key='_id', right_key='info.imageID', how='left'))
+        self.assertEqual([(image['_id'], container['info']['name'] if container else None) for image, container in pairs], [('sha256:a', 'c-1'), ('sha256:a', 'c-2'), ('sha256:b', None)])
+        with self.assertRaises(ValueError):
+            list(hash_join(images, images, how='outer'))
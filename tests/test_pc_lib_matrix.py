@@ -0,0 +1,34 @@
+""" Unit Tests for PrismaCloudVulnerabilityMatrix """
+
+import unittest
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_matrix import PrismaCloudVulnerabilityMatrix, numpy
+
+
+@unittest.skipIf(numpy is None, 'Requires NumPy')
+class TestPrismaCloudVulnerabilityMatrix(unittest.TestCase):
+    """ Unit Tests for vulnerability summaries """
+
+    def test_vulnerability_matrix_counts_and_top(self):
+        log4shell = {'cve': 'CVE-2021-44228', 'severity': 'critical'}
+        images = [
+            {'_id': 'sha256:a', 'collections': ['All', 'Production'], 'clusters': ['cluster-1'],
+             'vulnerabilities': [log4shell, {'cve': 'CVE-2021-44228', 'severity': 'high'}, {'cve': 'CVE-2022-0001', 'severity': 'low'}]},
+            {'_id': 'sha256:b', 'collections': ['All'], 'clusters': ['cluster-2'], 'vulnerabilities': [log4shell]},
+            {'_id': 'sha256:c', 'collections': ['All'], 'vulnerabilities': None},
+        ]
+        hosts = [{'_id': 'host-1', 'collections': ['All', 'Production'], 'vulnerabilities': [{'cve': 'CVE-2022-0001', 'severity': 'Low'}]}]
+        matrix = PrismaCloudVulnerabilityMatrix().add_workloads(images, 'deployed').add_workloads(hosts, 'host')
+        # One entry per workload and CVE, with the highest severity.
+        self.assertEqual(matrix.counts_by('severity'), {'critical': 2, 'low': 2})
+        self.assertEqual(matrix.counts_by('kind'), {'deployed': 3, 'host': 1})
+        self.assertEqual(matrix.counts_by('collection'), {'All': 4, 'Production': 3})
+        self.assertEqual(matrix.counts_by('cluster', severities=['critical']), {'cluster-1': 1, 'cluster-2': 1})
+        self.assertEqual(matrix.counts_by('severity', collections=['Production'], kinds=['deployed']), {'critical': 1, 'low': 1})
+        self.assertEqual(matrix.top_workloads(2), [(('deployed', 'sha256:a'), 2), (('deployed', 'sha256:b'), 1)])
+        self.assertEqual(matrix.top_cves(1, clusters=['cluster-2']), [('CVE-2021-44228', 1)])
+        self.assertEqual(matrix.top_cves(5, collections=['Missing']), [])
+        # Adding a workload again does not add its memberships again, and severity filters are case-insensitive.
+        matrix.add_workloads(images[1:2], 'deployed')
+        self.assertEqual(matrix.counts_by('collection', severities=['Critical']), {'All': 2, 'Production': 1})
@@ -0,0 +1,39 @@
+""" Unit Tests for PrismaCloudPackageIndex """
+
+import os
+import tempfile
+import unittest
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_packages import PrismaCloudPackageIndex, sort_versions
+
+
+class TestPrismaCloudPackageIndex(unittest.TestCase):
+    """ Unit Tests for package searches """
+
+    def test_package_index_search_and_save(self):
+        deployed_images = [
+            {'_id': 'sha256:a', 'instances': [{'image': 'app:1', 'host': 'host-1'}], 'binaries': [{'name': 'log4j-cli', 'path': '/bin/log4j-cli'}],
+             'packages': [{'pkgsType': 'jar', 'pkgs': [{'name': 'log4j-core', 'version': '2.14.1', 'path': '/app/log4j-core.jar'}]},
+                          {'pkgsType': 'package', 'pkgs': [{'name': 'grep', 'version': '2.27-2ubuntu1', 'cveCount': 12}]}]},
+            {'_id': 'sha256:b', 'instances': [], 'binaries': [],
+             'packages': [{'pkgsType': 'jar', 'pkgs': [{'name': 'log4j-core', 'version': '2.17.1'}]}]},
+        ]
+        ci_images = [{'_id': 'sha256:c', 'entityInfo': {'instances': [{'image': 'ci:1', 'host': 'ci'}], 'binaries': [],
+                      'packages': [{'pkgsType': 'jar', 'pkgs': [{'name': 'log4j-core', 'version': '2.9.0'}]}]}}]
+        package_index = PrismaCloudPackageIndex().add_images(deployed_images, 'deployed').add_images(ci_images, 'ci')
+        # Versions are compared by version, rather than as strings ('2.9.0' < '2.17').
+        self.assertEqual(sorted(result['image'] for result in package_index.search('log4j-core', version='2.17', comparison='lt')), ['sha256:a', 'sha256:c'])
+        self.assertEqual([result['image'] for result in package_index.search('log4j-core', version='2.17', comparison='lt', kinds=['deployed'])], ['sha256:a'])
+        self.assertEqual(package_index.package_names('log4j', match='prefix'), ['log4j-cli', 'log4j-core'])
+        self.assertEqual(package_index.package_names('4j-c', match='substring'), ['log4j-cli', 'log4j-core'])
+        self.assertEqual(package_index.package_versions('log4j-core'), ['2.9.0', '2.14.1', '2.17.1'])
+        # Versions that are not valid (PEP 440) versions are compared by their numeric and alphabetic parts.
+        self.assertEqual([result['cves'] for result in package_index.search('grep', version='2.27-10ubuntu1', comparison='lt')], [12])
+        # A set of versions is sorted by one scheme: by parts, when any version is not a valid (PEP 440) version.
+        self.assertEqual(sort_versions(['1.10', '1.9-ubuntu2', '1.9']), ['1.9', '1.9-ubuntu2', '1.10'])
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, 'packages.json.gz')
+            package_index.save(file_name)
+            loaded_package_index = PrismaCloudPackageIndex.load(file_name)
+        self.assertEqual(loaded_package_index.search('log4j', match='prefix'), package_index.search('log4j', match='prefix'))
@@ -0,0 +1,51 @@
+""" Unit Tests for PrismaCloudAPIPool """
+
+import json
+import unittest
+
+import responses
+
+# pylint: disable=import-error
+from prismacloud.api import PrismaCloudAPIPool
+from tests.data import CREDENTIALS, ERROR_LOG
+
+
+TENANT_SETTINGS = [
+    {'name': 'tenant-a', 'url': 'console-a.example.com', 'identity': 'abc', 'secret': 'def', 'verify': False, 'error_log': ERROR_LOG},
+    {'name': 'tenant-b', 'url': 'console-b.example.com', 'identity': 'abc', 'secret': 'def', 'verify': False, 'error_log': ERROR_LOG},
+]
+
+
+class TestPrismaCloudAPIPool(unittest.TestCase):
+    """ Unit Tests for the multi-tenant client pool """
+
+    def setUp(self):
+        self.pool = PrismaCloudAPIPool(TENANT_SETTINGS, max_workers=2)
+        for client in self.pool.clients.values():
+            client._retry_config['max_retries'] = 0
+
+    def test_pool_configure(self):
+        self.assertEqual(list(self.pool.clients), ['tenant-a', 'tenant-b'])
+        self.assertIsNot(self.pool['tenant-a'], self.pool['tenant-b'])
+        self.assertIsNot(self.pool['tenant-a'].logger, self.pool['tenant-b'].logger)
+        with self.assertRaises(ValueError):
+            self.pool.add(TENANT_SETTINGS[0])
+
+    @responses.activate
+    def test_pool_fan_out_isolates_failures(self):
+        for console in ['console-a.example.com', 'console-b.example.com']:
+            responses.post('https://%s/api/v1/authenticate' % console, body=json.dumps({'token': 'token'}), status=200)
+        responses.get('https://console-a.example.com/api/v1/credentials', body=json.dumps(CREDENTIALS), status=200)
+        responses.get('https://console-b.example.com/api/v1/credentials', body=json.dumps({}), status=404)
+        results = self.pool.fan_out('credential_list_read')
+        self.assertEqual(list(results), ['tenant-a', 'tenant-b'])
+        self.assertEqual(PrismaCloudAPIPool.successful_results(results), {'tenant-a': CREDENTIALS})
+        self.assertIsInstance(PrismaCloudAPIPool.failed_results(results)['tenant-b'], SystemExit)
+        self.assertEqual(self.pool['tenant-a'].logger.error.counter, 0)
+        self.assertEqual(self.pool['tenant-b'].logger.error.counter, 1)
+
+    @responses.activate
+    def test_pool_fan_out_callable_for_selected_tenants(self):
+        results = self.pool.fan_out(lambda client, suffix: client.api_compute + suffix, '/ok', tenants=['tenant-b'])
+        self.assertEqual(results['tenant-b']['result'], 'console-b.example.com/ok')
+        self.assertNotIn('tenant-a', results)
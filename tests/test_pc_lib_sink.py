@@ -0,0 +1,46 @@
+""" Unit Tests for PrismaCloudBatchSink """
+
+import gzip
+import json
+import unittest
+
+import responses
+from responses import registries
+
+# pylint: disable=import-error
+from prismacloud.api import PrismaCloudBatchSink
+
+
+class TestPrismaCloudBatchSink(unittest.TestCase):
+    """ Unit Tests for batched forwarding """
+
+    @responses.activate(registry=registries.OrderedRegistry)
+    def test_batch_sink_ndjson_gzip_with_retry(self):
+        responses.post('https://siem.example.com/collector', status=503)
+        for _ in range(3):
+            responses.post('https://siem.example.com/collector', status=200)
+        with PrismaCloudBatchSink('https://siem.example.com/collector', compress=True, batch_records=500, workers=1, retry_waits=[0]) as sink:
+            sink.put_many({'_id': record, 'event': 'runtime/container'} for record in range(1200))
+            self.assertTrue(sink.flush(timeout=10))
+            self.assertEqual(sink.metrics['records_sent'], 1200)
+        self.assertEqual(sink.metrics['records_sent'], 1200)
+        self.assertEqual(sink.metrics['batches_sent'], 3)
+        self.assertEqual(sink.metrics['retries'], 1)
+        request = responses.calls[1].request
+        self.assertEqual(request.headers['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(request.body).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 500)
+        self.assertEqual(json.loads(lines[0]), {'_id': 0, 'event': 'runtime/container'})
+
+    @responses.activate
+    def test_batch_sink_json_array_by_size_and_failures(self):
+        responses.post('https://siem.example.com/collector', status=400)
+        failures = []
+        sink = PrismaCloudBatchSink('https://siem.example.com/collector', body_format='json', batch_bytes=100, retry_waits=[0], on_failure=lambda batch, error: failures.append(len(batch)))
+        sink.put_many({'message': 'x' * 30} for _ in range(4))
+        metrics = sink.close()
+        # Each batch of (two) records is within 100 bytes, and a 400 is not retried.
+        self.assertEqual(metrics['batches_failed'], 2)
+        self.assertEqual(metrics['retries'], 0)
+        self.assertEqual(failures, [2, 2])
+        self.assertEqual(len(json.loads(responses.calls[0].request.body)), 2)
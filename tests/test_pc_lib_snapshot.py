@@ -0,0 +1,57 @@
+""" Unit Tests for PrismaCloudSnapshotStore """
+
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_api import PrismaCloudAPI
+from prismacloud.api.pc_lib_snapshot import PrismaCloudSnapshotStore
+
+
+class TestPrismaCloudSnapshotStore(unittest.TestCase):
+    """ Unit Tests for snapshots, incremental refreshes, and queries """
+
+    def test_snapshot_refresh_and_query(self):
+        pc_api = PrismaCloudAPI()
+        defenders = [
+            {'hostname': 'host-1', 'version': '32.02.1', 'connected': True, 'collections': ['All', 'Production']},
+            {'hostname': 'host-2', 'version': '32.10.0', 'connected': True, 'collections': ['All', 'Production']},
+            {'hostname': 'host-3', 'version': '31.00.0', 'connected': False, 'collections': ['All']},
+        ]
+        refreshed_defenders = [dict(defenders[0], version='32.11.0'), defenders[1]]
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, 'snapshot.db')
+            with PrismaCloudSnapshotStore(pc_api, file_name) as store:
+                with mock.patch.object(pc_api, 'execute_compute_pages', side_effect=[iter([(0, 3, defenders[:2]), (2, 3, defenders[2:])]), iter([(0, 2, refreshed_defenders)])]):
+                    snapshot = store.refresh('defenders')['defenders']
+                    self.assertEqual((snapshot['records'], snapshot['written'], snapshot['deleted']), (3, 3, 0))
+                    # Versions are compared as versions ('32.02.1' < '32.10.0'), and lists are queried via json_each().
+                    outdated = store.query("SELECT d.hostname FROM defenders d, json_each(d.collections) c WHERE c.value = ? AND compare_versions(d.version, ?) < 0 ORDER BY d.hostname", ['Production', '32.10'])
+                    self.assertEqual(outdated, [{'hostname': 'host-1'}])
+                    # Not refreshed within max_age.
+                    self.assertEqual(store.refresh('defenders', max_age=3600)['defenders'], snapshot)
+                    snapshot = store.refresh('defenders')['defenders']
+                    self.assertEqual((snapshot['records'], snapshot['written'], snapshot['deleted']), (2, 1, 1))
+            # The snapshot is persisted.
+            with PrismaCloudSnapshotStore(pc_api, file_name) as store:
+                self.assertEqual(store.documents('defenders', 'connected = ? ORDER BY hostname', [1]), refreshed_defenders)
+                self.assertEqual(store.query("SELECT count(*) AS outdated FROM defenders WHERE compare_versions(version, '32.10') < 0"), [{'outdated': 0}])
+                # Query parameters are per source, and a filtered refresh does not delete the records excluded by the filter.
+                with self.assertRaises(ValueError):
+                    store.refresh(query_params={'users': {'enabled': 'true'}})
+                with mock.patch.object(pc_api, 'execute_compute_pages', return_value=iter([(0, 1, [dict(defenders[1], version='32.12.0')])])) as execute_compute_pages:
+                    snapshot = store.refresh('defenders', query_params={'defenders': {'hostname': 'host-2'}})['defenders']
+                self.assertEqual(execute_compute_pages.call_args.kwargs['query_params'], {'hostname': 'host-2'})
+                self.assertEqual((snapshot['records'], snapshot['written'], snapshot['deleted']), (2, 1, 0))
+                # A filtered refresh does not update the time of the last (unfiltered) refresh, so 'max_age' refreshes an outdated snapshot.
+                store.connection.execute('UPDATE snapshots SET refreshed = refreshed - 7200')
+                with mock.patch.object(pc_api, 'execute_compute_pages', return_value=iter([(0, 1, [dict(defenders[1], version='32.13.0')])])):
+                    filtered_snapshot = store.refresh('defenders', query_params={'defenders': {'hostname': 'host-2'}})['defenders']
+                self.assertLess(filtered_snapshot['refreshed'], snapshot['refreshed'] - 3600)
+                with mock.patch.object(pc_api, 'execute_compute_pages', return_value=iter([(0, 1, [dict(defenders[1], version='32.13.0')])])) as execute_compute_pages:
+                    snapshot = store.refresh('defenders', max_age=3600)['defenders']
+                self.assertEqual(execute_compute_pages.call_count, 1)
+                self.assertEqual((snapshot['records'], snapshot['written'], snapshot['deleted']), (1, 0, 1))
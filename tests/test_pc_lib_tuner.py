@@ -0,0 +1,50 @@
+""" Unit Tests for PageSizeTuner """
+
+import atexit
+import os
+import tempfile
+import unittest
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_api import PrismaCloudAPI
+from prismacloud.api.pc_lib_tuner import PageSizeTuner, shared_page_size_tuner
+
+
+class TestPageSizeTuner(unittest.TestCase):
+    """ Unit Tests for page size configuration and tuning """
+
+    def test_page_size_tuner_converges_and_persists(self):
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, 'page_limits.json')
+            tuner = PageSizeTuner(file_name, samples=2, save_at_exit=False)
+            # Simulate a console that responds faster (in records per second) to pages of 25.
+            seconds_per_page = {50: 1.0, 25: 0.25, 12: 0.2}
+            for _ in range(10):
+                limit = tuner.choose('api/v1/images', 50)
+                tuner.record('api/v1/images', limit, limit, seconds_per_page[limit])
+            self.assertEqual(tuner.choose('api/v1/images', 50), 25)
+            # Short (final) pages are not measured.
+            tuner.record('api/v1/images', 50, 3, 0.001)
+            self.assertEqual(tuner.learned_limits(), {'api/v1/images': 25})
+            tuner.save()
+            self.assertEqual(PageSizeTuner(file_name, save_at_exit=False).choose('api/v1/images', 50), 25)
+
+    def test_page_limit_configuration(self):
+        pc_api = PrismaCloudAPI()
+        self.assertEqual(pc_api.page_limit('api/v1/hosts'), 50)
+        self.assertEqual(pc_api.page_limit('search/config/page', 'rql'), 1000)
+        pc_api.page_limits = {'api/v1/defenders': 10, 'compute': 500}
+        self.assertEqual(pc_api.page_limit('api/v1/defenders?'), 10)
+        # Configured page sizes do not exceed the server maximum.
+        self.assertEqual(pc_api.page_limit('api/v1/hosts'), 50)
+
+    def test_page_size_tuner_shared_per_file_and_keyed_by_console(self):
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, 'page_limits.json')
+            pc_api_a, pc_api_b = PrismaCloudAPI(), PrismaCloudAPI()
+            pc_api_a.page_size_tuner = pc_api_b.page_size_tuner = shared_page_size_tuner(file_name)
+            self.assertIs(shared_page_size_tuner(file_name), pc_api_a.page_size_tuner)
+            pc_api_a.api_compute, pc_api_b.api_compute = 'console-a', 'console-b'
+            pc_api_a.record_page('api/v1/hosts?', 50, 50, 1.0)
+            self.assertEqual(list(pc_api_a.page_size_tuner.stats), ['console-a/api/v1/hosts'])
+            atexit.unregister(pc_api_a.page_size_tuner.save)
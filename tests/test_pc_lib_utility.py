@@ -0,0 +1,101 @@
+""" Unit Tests for PrismaCloudUtility """
+
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from unittest import mock
+
+# pylint: disable=import-error
+from prismacloud.api.pc_lib_collection import IndexedCollection
+from prismacloud.api.pc_lib_utility import PrismaCloudUtility
+from prismacloud.api.version import version as api_version
+
+
+class TestPrismaCloudUtilityVersionCheck(unittest.TestCase):
+    """ Unit Tests for the cached, background package version check """
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.temporary_directory.name, 'version_check.json')
+        patchers = [
+            mock.patch.object(PrismaCloudUtility, 'CONFIG_DIRECTORY', self.temporary_directory.name),
+            mock.patch.object(PrismaCloudUtility, 'DEFAULT_CONFIG_FILE', os.path.join(self.temporary_directory.name, 'credentials.json')),
+            mock.patch.object(PrismaCloudUtility, 'VERSION_CHECK_CACHE_FILE', self.cache_file),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.temporary_directory.cleanup)
+
+    def write_cache(self, available_version, checked):
+        with open(self.cache_file, 'w') as cache_file:
+            json.dump({'package_name': 'prismacloud-api', 'running_version': api_version, 'available_version': available_version, 'checked': checked}, cache_file)
+
+    @mock.patch('prismacloud.api.pc_lib_utility.UpdateChecker')
+    def test_package_version_check_uses_fresh_cache(self, update_checker):
+        self.write_cache('99.0.0', time.time())
+        message = PrismaCloudUtility.package_version_check()
+        self.assertIn('99.0.0', message)
+        update_checker.assert_not_called()
+
+    @mock.patch('prismacloud.api.pc_lib_utility.UpdateChecker')
+    def test_package_version_check_refreshes_expired_cache(self, update_checker):
+        self.write_cache('99.0.0', 0)
+        update_checker.return_value.check.return_value = None
+        message = PrismaCloudUtility.package_version_check()
+        self.assertEqual(message, 'version: %s' % api_version)
+        update_checker.return_value.check.assert_called_once()
+        with open(self.cache_file, 'r') as cache_file:
+            self.assertIsNone(json.load(cache_file)['available_version'])
+
+    @mock.patch('prismacloud.api.pc_lib_utility.UpdateChecker')
+    def test_package_version_check_disabled_by_environment(self, update_checker):
+        with mock.patch.dict(os.environ, {'PC_VERSION_CHECK': 'false'}):
+            message = PrismaCloudUtility.package_version_check()
+        self.assertEqual(message, 'version: %s' % api_version)
+        update_checker.assert_not_called()
+
+    @mock.patch('prismacloud.api.pc_lib_utility.UpdateChecker')
+    def test_package_version_check_disabled_by_settings(self, update_checker):
+        with open(PrismaCloudUtility.DEFAULT_CONFIG_FILE, 'w') as settings_file:
+            json.dump({'version_check': False}, settings_file)
+        PrismaCloudUtility.package_version_check()
+        update_checker.assert_not_called()
+
+
+    @mock.patch('prismacloud.api.pc_lib_utility.UpdateChecker')
+    def test_package_version_check_settings_from_environment(self, update_checker):
+        self.write_cache('99.0.0', time.time() - 120)
+        with mock.patch.dict(os.environ, {'PC_VERSION_CHECK_TTL': 'one day', 'PC_VERSION_CHECK_DEADLINE': '-1'}):
+            self.assertIn('99.0.0', PrismaCloudUtility.package_version_check())
+            self.assertEqual(PrismaCloudUtility.version_check_setting('PC_VERSION_CHECK_DEADLINE', 0.25), 0.25)
+        update_checker.assert_not_called()
+        update_checker.return_value.check.return_value = None
+        with mock.patch.dict(os.environ, {'PC_VERSION_CHECK_TTL': '60'}):
+            self.assertEqual(PrismaCloudUtility.package_version_check(), 'version: %s' % api_version)
+        update_checker.return_value.check.assert_called_once()
+
+class TestPrismaCloudUtilitySearchList(unittest.TestCase):
+    """ Unit Tests for searches of lists and IndexedCollections """
+
+    def test_search_list_with_indexed_collection(self):
+        roles = [
+            {'id': 'r-1', 'name': 'System Admin', 'accountGroupIds': ['ag-1', 'ag-2']},
+            {'id': 'r-2', 'name': 'Auditor',      'accountGroupIds': ['ag-2']},
+            {'id': 'r-3', 'name': 'auditor',      'accountGroupIds': {'unhashable': True}},
+        ]
+        indexed_roles = IndexedCollection(roles, indexes=['name'])
+        for role_list in [roles, indexed_roles]:
+            self.assertEqual(PrismaCloudUtility.search_list_value(role_list, 'name', 'id', 'Auditor'), 'r-2')
+            self.assertEqual(PrismaCloudUtility.search_list_value_lower(role_list, 'name', 'id', 'SYSTEM ADMIN'), 'r-1')
+            self.assertIsNone(PrismaCloudUtility.search_list_object(role_list, 'name', 'Missing'))
+            # All matches, rather than the first match.
+            self.assertEqual([role['id'] for role in PrismaCloudUtility.search_list_list_lower(role_list, 'name', 'AUDITOR')], ['r-2', 'r-3'])
+        self.assertEqual([role['id'] for role in indexed_roles.find_all('accountGroupIds', 'ag-2', multi_value=True)], ['r-1', 'r-2'])
+        self.assertEqual(indexed_roles.find('accountGroupIds', {'unhashable': True})['id'], 'r-3')
+        # Modifying the collection rebuilds the indexes.
+        indexed_roles.append({'id': 'r-4', 'name': 'Auditor'})
+        self.assertEqual(len(PrismaCloudUtility.search_list_list(indexed_roles, 'name', 'Auditor')), 2)